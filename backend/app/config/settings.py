@@ -1,7 +1,7 @@
 """
 Application Settings and Configuration
 """
-from typing import List
+from typing import List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,6 +21,19 @@ class Settings(BaseSettings):
     mongodb_url: str = "mongodb://localhost:27017"
     mongodb_database: str = "prescribeme"
     
+    # MongoDB Command Stats
+    # Per-request command counts; totals are sent as Server-Timing /
+    # X-DB-Queries headers in debug. A request running one query shape at
+    # least db_n_plus_one_threshold times is logged as N+1 (0 disables).
+    db_query_stats_enabled: bool = True
+    db_n_plus_one_threshold: int = 5
+    
+    # List Pagination
+    # Keyset pagination of list endpoints (?limit=&cursor=); the cursor of the
+    # next page is returned in the X-Next-Cursor response header
+    page_size_default: int = 50
+    page_size_max: int = 200
+    
     # JWT Configuration
     # SECURITY: JWT secret key MUST be set via JWT_SECRET_KEY environment variable
     # Server will fail to start if this variable is missing
@@ -29,12 +42,80 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30  # 30 minutes
     refresh_token_expire_days: int = 7  # 7 days
+    # Cache verified access token payloads (per worker) until they expire
+    jwt_cache_enabled: bool = True
+    jwt_cache_max_size: int = 10000
+    
+    # Password Hashing Pool
+    # bcrypt runs on a dedicated thread pool so it never blocks the event loop.
+    # Requests beyond max_queue waiting hashes are rejected with 503.
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 100
+    # bcrypt cost factor; hashes with a different cost are rehashed on next login
+    password_bcrypt_rounds: int = 12
+    
+    # Authenticated User Cache
+    # get_current_user keeps a per-worker LRU of user snapshots. Entries are
+    # dropped when the user document is saved; the TTL bounds staleness for
+    # changes made by other workers or directly in the database. 0 disables it.
+    user_cache_ttl_seconds: int = 30
+    user_cache_max_size: int = 10000
+    
+    # Stateless Access Tokens
+    # When enabled, get_current_user trusts the signed token claims and checks
+    # an in-process revocation filter instead of loading the user. The filter
+    # is refreshed from MongoDB every auth_revocation_refresh_seconds, which
+    # bounds how long a deactivated user keeps access.
+    auth_stateless_tokens: bool = False
+    auth_revocation_refresh_seconds: int = 10
+    
+    # Credential Endpoint Rate Limits (login, forgot-password)
+    # Token buckets per client IP and per email, checked before any database
+    # or bcrypt work; rejected requests get 429 with Retry-After. Email buckets
+    # are only charged for failed logins (and for every reset request).
+    auth_rate_limit_enabled: bool = True
+    auth_rate_limit_ip_burst: int = 20
+    auth_rate_limit_ip_per_minute: float = 20
+    auth_rate_limit_email_burst: int = 5
+    auth_rate_limit_email_per_minute: float = 5
+    auth_rate_limit_max_keys: int = 100000  # buckets kept per worker
+    # Reverse proxies trusted to report the client address in X-Forwarded-For
+    # (comma-separated IPs or CIDRs, "*" = any). Empty: the peer address is
+    # used, so behind a proxy every client would share one IP bucket.
+    trusted_proxies: str = ""
     
     # Database Seeder Configuration
     # SECURITY: Seeder password MUST be set via SEEDER_PASSWORD environment variable
     # Server will fail to start if this variable is missing
     # This password is used for all test users created during database seeding
     seeder_password: str  # Required - no default, must be set in .env file
+    # Seed test data on startup; disable in production to skip the seed check
+    seed_on_startup: bool = True
+    
+    # Care relationship backfill from prescriptions (incremental, runs in the
+    # background after startup; also available as python -m app.database.care_sync)
+    care_sync_on_startup: bool = True
+    # Per-doctor sets of accessible patient ids used by doctor access checks
+    care_access_cache_ttl_seconds: int = 300
+    care_access_cache_max_doctors: int = 1000
+    
+    # Patient typeahead key backfill (patients without keys only, runs in the
+    # background after startup; also available as python -m app.database.search_keys)
+    search_key_backfill_on_startup: bool = True
+    
+    # In-process doctor directory index (GET /patients/doctors). Local writes
+    # apply immediately; every worker reloads it this often (0 = never) to
+    # pick up writes made elsewhere
+    doctor_directory_refresh_seconds: int = 60
+    
+    # Prescription history search: "auto" / "ngram" match word prefixes as the
+    # doctor types; "text" uses a MongoDB text index (whole words) when the
+    # server supports it and falls back to word prefixes otherwise
+    prescription_search_mode: Literal["auto", "text", "ngram"] = "auto"
+    
+    # Conditional GETs: ETags derived from per-scope data versions, so an
+    # unchanged poll gets 304 Not Modified after one small version lookup
+    conditional_get_enabled: bool = True
     
     # CORS Configuration
     # Comma-separated list of allowed origins (e.g., "http://localhost:5173,http://localhost:3000")
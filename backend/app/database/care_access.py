@@ -0,0 +1,124 @@
+"""
+Per-doctor cache of accessible patients
+
+Doctor routes check the (doctor, patient) care relationship on every
+patient-detail request. ``CareAccessCache`` keeps, per doctor, the set of
+patient ids they have a relationship with, so access checks for a warm
+doctor are set lookups. Only grants are trusted from memory: a patient
+missing from the set is re-checked against MongoDB (one indexed point query)
+and added if found, so relationships created on another worker are seen
+immediately. Entries expire after a TTL and are dropped when this worker
+creates a relationship for the doctor.
+
+Cached sets are immutable (a grant swaps in a copy). The roster is listed
+from MongoDB by ``care_patient_ids`` instead, so its pages are never up to
+a TTL stale.
+"""
+from typing import Any, FrozenSet, List, Optional
+from pydantic import BaseModel
+from beanie import Link
+from app.config.settings import settings
+from app.models import CareRelationship, Patient
+from app.utils.cache import TTLCache
+from .loaders import link_id
+
+
+class _PatientLink(BaseModel):
+    patient: Link[Patient]
+
+
+async def care_patient_ids(doctor_id: Any, after: Any = None, limit: Optional[int] = None) -> List[Any]:
+    """
+    Ids of the doctor's patients in id order, read from MongoDB
+
+    Served by the unique (doctor, patient) index.
+
+    Args:
+        doctor_id: Doctor document id
+        after: Only ids greater than this one (keyset paging)
+        limit: Maximum ids to return
+    """
+    query = CareRelationship.find(CareRelationship.doctor.id == doctor_id)
+    if after is not None:
+        query = query.find(CareRelationship.patient.id > after)
+    query = query.sort("+patient.$id")
+    if limit is not None:
+        query = query.limit(limit)
+    rows = await query.project(_PatientLink).to_list()
+    return [link_id(row.patient) for row in rows]
+
+
+class CareAccessCache:
+    """
+    Doctor id -> set of accessible patient ids
+
+    Args:
+        max_doctors: Doctors kept in memory (least recently used are evicted)
+        ttl: Seconds before a doctor's set is reloaded
+    """
+
+    def __init__(self, max_doctors: int, ttl: float) -> None:
+        self._patients: TTLCache = TTLCache(maxsize=max_doctors, ttl=ttl)
+
+    async def patient_ids(self, doctor_id: Any) -> FrozenSet[Any]:
+        """
+        Return the ids of every patient the doctor has a care relationship with
+
+        Args:
+            doctor_id: Doctor document id
+
+        Returns:
+            Set of patient ids (cached, up to the TTL stale)
+        """
+        patient_ids = self._patients.get(doctor_id)
+        if patient_ids is None:
+            patient_ids = frozenset(await care_patient_ids(doctor_id))
+            self._patients.set(doctor_id, patient_ids)
+        return patient_ids
+
+    async def has_access(self, doctor_id: Any, patient_id: Any) -> bool:
+        """
+        Check whether the doctor may access the patient
+
+        Args:
+            doctor_id: Doctor document id
+            patient_id: Patient document id
+
+        Returns:
+            True if a care relationship exists
+        """
+        patient_ids = None
+        if self._patients.enabled:
+            patient_ids = await self.patient_ids(doctor_id)
+            if patient_id in patient_ids:
+                return True
+
+        # Not known locally: the relationship may be newer than the cached set
+        rel = await CareRelationship.find_one(
+            CareRelationship.doctor.id == doctor_id,
+            CareRelationship.patient.id == patient_id,
+        )
+        if rel is None:
+            return False
+        if patient_ids is not None:
+            # Copy on write: readers may still hold the previous set
+            self._patients.replace(doctor_id, patient_ids | {patient_id})
+        return True
+
+    def invalidate(self, doctor_id: Any) -> None:
+        """Drop the doctor's cached set (after creating a relationship)"""
+        self._patients.invalidate(doctor_id)
+
+    def clear(self) -> None:
+        """Drop every cached set (after bulk relationship changes)"""
+        self._patients.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters of the per-doctor sets"""
+        return self._patients.stats()
+
+
+care_access = CareAccessCache(
+    max_doctors=settings.care_access_cache_max_doctors,
+    ttl=settings.care_access_cache_ttl_seconds,
+)
@@ -1,18 +1,124 @@
-"""Ensure CareRelationship rows exist for every prescription (idempotent)."""
-from app.models import Prescription, CareRelationship
+"""
+Ensure CareRelationship rows exist for every prescription (idempotent).
 
+One aggregation groups prescriptions into distinct (doctor, patient) pairs
+and each batch of pairs is applied with a single unordered ``bulk_write`` of
+upserts against the unique pair index. The highest prescription id seen is
+stored in a SyncCheckpoint, so later runs only scan newer prescriptions.
 
-async def sync_care_relationships_from_prescriptions() -> None:
-    prescriptions = await Prescription.find().to_list()
-    for presc in prescriptions:
-        await presc.fetch_all_links()
-        doc = presc.doctor
-        pat = presc.patient
-        if doc is None or pat is None:
+Runs in the background after startup, or from the command line:
+
+    python -m app.database.care_sync [--full]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from app.models import Prescription, CareRelationship, DataVersion, SyncCheckpoint
+from .care_access import care_access
+
+
+CHECKPOINT_NAME = "care_relationships_from_prescriptions"
+
+# Pairs applied per bulk_write
+BATCH_SIZE = 1000
+
+# Rescan this far behind the checkpoint: ObjectIds come from client clocks,
+# so a prescription inserted just before the last run may sort before it
+_OVERLAP = timedelta(minutes=5)
+
+
+async def sync_care_relationships_from_prescriptions(full: bool = False) -> int:
+    """
+    Upsert a CareRelationship for every (doctor, patient) prescription pair
+
+    Args:
+        full: Ignore the checkpoint and scan every prescription
+
+    Returns:
+        Number of care relationships created
+    """
+    checkpoint = await SyncCheckpoint.find_one(SyncCheckpoint.name == CHECKPOINT_NAME)
+    if checkpoint is None:
+        checkpoint = SyncCheckpoint(name=CHECKPOINT_NAME)
+
+    match: dict = {}
+    if checkpoint.last_id and not full:
+        since = checkpoint.last_id.generation_time - _OVERLAP
+        match["_id"] = {"$gt": ObjectId.from_datetime(since)}
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"doctor": "$doctor.$id", "patient": "$patient.$id"},
+            "last_id": {"$max": "$_id"},
+        }},
+    ]
+
+    collection = CareRelationship.get_pymongo_collection()
+    now = datetime.utcnow()
+    created = 0
+    last_id: Optional[ObjectId] = checkpoint.last_id
+    batch = []
+    doctor_ids = []
+
+    async def flush() -> None:
+        nonlocal created
+        if batch:
+            result = await collection.bulk_write(batch, ordered=False)
+            created += result.upserted_count
+            # Rosters of doctors with new relationships changed
+            await DataVersion.bump(*{doctor_ids[index] for index in result.upserted_ids})
+            batch.clear()
+            doctor_ids.clear()
+
+    async for row in Prescription.aggregate(pipeline):
+        pair = row["_id"]
+        if pair.get("doctor") is None or pair.get("patient") is None:
             continue
-        existing = await CareRelationship.find_one(
-            CareRelationship.doctor.id == doc.id,
-            CareRelationship.patient.id == pat.id,
-        )
-        if not existing:
-            await CareRelationship(doctor=doc, patient=pat).insert()
+        batch.append(CareRelationship.upsert_pair(pair["doctor"], pair["patient"], now))
+        doctor_ids.append(pair["doctor"])
+        if last_id is None or row["last_id"] > last_id:
+            last_id = row["last_id"]
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+    await flush()
+    if created:
+        care_access.clear()
+
+    # Persist the high-water mark only after every batch was applied
+    if last_id is not None and last_id != checkpoint.last_id:
+        checkpoint.last_id = last_id
+        checkpoint.updated_at = datetime.utcnow()
+        await checkpoint.save()
+    return created
+
+
+async def run_care_sync() -> None:
+    """Background wrapper for startup: never lets a failure reach the server"""
+    try:
+        created = await sync_care_relationships_from_prescriptions()
+        if created:
+            print(f"✅ Care sync created {created} care relationships")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Care sync failed: {e}")
+
+
+async def _main(full: bool) -> None:
+    from app.database.connection import init_beanie, close_database
+
+    await init_beanie()
+    try:
+        created = await sync_care_relationships_from_prescriptions(full=full)
+        print(f"✅ Care sync created {created} care relationships")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create care relationships from prescriptions")
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint and rescan all prescriptions")
+    asyncio.run(_main(parser.parse_args().full))
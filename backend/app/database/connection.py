@@ -1,9 +1,14 @@
 """
 Beanie Database Connection Setup
 """
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Optional, Sequence
+from pymongo import AsyncMongoClient
+from pymongo.monitoring import CommandListener
 from beanie import init_beanie as beanie_init
 from app.config.settings import settings
+from app.models.care_relationship import UNIQUE_PAIR_INDEX
+from app.database.query_stats import query_stats_listener
+from app.database.prescription_search import ensure_prescription_text_index
 from app.models import (
     User,
     Doctor,
@@ -20,33 +25,95 @@ from app.models import (
     RefreshToken,
     CareRelationship,
     PasswordResetToken,
+    TokenRevocation,
+    SyncCheckpoint,
+    DataVersion,
 )  # Import document models for Beanie initialization
 
 
 # Global client instance to manage connection lifecycle
-_client: AsyncIOMotorClient | None = None
+_client: AsyncMongoClient | None = None
 
 
-async def init_beanie():
+async def _ensure_refresh_token_ttl(database) -> None:
+    """
+    Turn an existing plain ``expires_at`` index on refresh_tokens into a TTL index
+    
+    Beanie cannot change the options of an index that already exists, so
+    databases created before the TTL index was introduced are migrated in
+    place with collMod.
+    """
+    collection = database[RefreshToken.Settings.name]
+    indexes = await collection.index_information()
+    index = indexes.get("expires_at_1")
+    if index and "expireAfterSeconds" not in index:
+        await database.command(
+            "collMod",
+            RefreshToken.Settings.name,
+            index={"keyPattern": {"expires_at": 1}, "expireAfterSeconds": 0},
+        )
+        print("✅ Converted refresh_tokens.expires_at index to TTL")
+
+
+async def _dedupe_care_relationships(database) -> None:
+    """
+    Remove duplicate (doctor, patient) care relationships
+    
+    Older versions could insert the same pair twice, which would stop the
+    unique pair index from being built. Runs only until that index exists.
+    """
+    collection = database[CareRelationship.Settings.name]
+    indexes = await collection.index_information()
+    if UNIQUE_PAIR_INDEX in indexes:
+        return
+    
+    cursor = await collection.aggregate([
+        {"$group": {
+            "_id": {"doctor": "$doctor.$id", "patient": "$patient.$id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ])
+    duplicate_ids = []
+    async for group in cursor:
+        duplicate_ids.extend(sorted(group["ids"])[1:])
+    if duplicate_ids:
+        await collection.delete_many({"_id": {"$in": duplicate_ids}})
+        print(f"✅ Removed {len(duplicate_ids)} duplicate care relationships")
+
+
+async def init_beanie(event_listeners: Optional[Sequence[CommandListener]] = None):
     """
     Initialize Beanie ODM with MongoDB connection
     
     This function:
-    1. Creates a Motor async client connection to MongoDB
+    1. Creates a PyMongo async client connection to MongoDB
     2. Initializes Beanie with the database and all document models
+    
+    Args:
+        event_listeners: Extra PyMongo command listeners for the client
+            (e.g. the benchmark suite's command counter)
     """
     global _client
     
     try:        
-        # Create Motor client
-        _client = AsyncIOMotorClient(settings.mongodb_url)
+        # Create PyMongo async client (Beanie 2 runs aggregations on it natively)
+        listeners = list(event_listeners or [])
+        if settings.db_query_stats_enabled:
+            listeners.append(query_stats_listener)
+        _client = AsyncMongoClient(settings.mongodb_url, event_listeners=listeners)
         
         # Test the connection by pinging the database
         await _client.admin.command('ping')
         
+        database = _client[settings.mongodb_database]
+        await _ensure_refresh_token_ttl(database)
+        await _dedupe_care_relationships(database)
+        
         # Initialize Beanie with the database and document models
         await beanie_init(
-            database=_client[settings.mongodb_database],
+            database=database,
             document_models=[
                 User,
                 Doctor,
@@ -63,8 +130,12 @@ async def init_beanie():
                 RefreshToken,
                 CareRelationship,
                 PasswordResetToken,
+                TokenRevocation,
+                SyncCheckpoint,
+                DataVersion,
             ]
         )        
+        await ensure_prescription_text_index(database)
         print("✅ Database connection ready")
         
     except Exception as e:
@@ -79,13 +150,13 @@ async def close_database():
     """
     Close MongoDB connection
     
-    This function closes the Motor client connection to MongoDB
+    This function closes the PyMongo async client connection to MongoDB
     """
     global _client
     
     try:
         if _client:
-            _client.close()
+            await _client.close()
             print("✅ Database connection closed successfully")
         else:
             print("⚠️  No active database connection to close")
@@ -0,0 +1,98 @@
+"""
+Loading and refreshing the in-process doctor directory index
+
+Every worker reads the listed doctors (accepting new patients) and their
+users' names with two queries and swaps them into ``doctor_directory`` (see
+app.utils.doctor_index). Local Doctor and User writes update the index
+immediately; a background task reloads it every
+``doctor_directory_refresh_seconds`` so writes made on other workers show up.
+"""
+import asyncio
+from typing import Optional
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, Field
+from app.config.settings import settings
+from app.models import Doctor, User
+from app.utils.doctor_index import DoctorDirectoryIndex, doctor_directory
+from .loaders import link_id
+
+
+class _UserNameRow(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    full_name: str
+
+
+_task: Optional[asyncio.Task] = None
+_load_lock = asyncio.Lock()
+
+
+async def load_doctor_directory() -> int:
+    """
+    Replace the index with the listed doctors currently in MongoDB
+
+    Returns:
+        Number of doctors indexed
+    """
+    doctor_directory.begin_reload()
+    try:
+        doctors = await Doctor.find(
+            Doctor.accepting_new_patients == True  # noqa: E712
+        ).sort(+Doctor.id).to_list()
+        user_ids = list({link_id(doctor.user) for doctor in doctors})
+        users = await User.find(In(User.id, user_ids)).project(_UserNameRow).to_list() if user_ids else []
+    except BaseException:
+        doctor_directory.abort_reload()
+        raise
+    names = {user.id: user.full_name for user in users}
+    doctor_directory.replace_all(
+        doctor.directory_entry(link_id(doctor.user), names[link_id(doctor.user)])
+        for doctor in doctors
+        if link_id(doctor.user) in names
+    )
+    return len(doctor_directory)
+
+
+async def get_doctor_directory() -> DoctorDirectoryIndex:
+    """
+    Return the directory index, loading it on first use
+
+    Startup loads the index already; this covers processes that serve
+    requests without running the lifespan (scripts, benchmarks).
+    """
+    if not doctor_directory.loaded:
+        async with _load_lock:
+            if not doctor_directory.loaded:
+                await load_doctor_directory()
+    return doctor_directory
+
+
+async def _refresh_forever(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load_doctor_directory()
+        except Exception as e:
+            # Keep serving the last good index
+            print(f"⚠️ Doctor directory refresh failed: {e}")
+
+
+async def start_doctor_directory_sync() -> None:
+    """Load the index and keep it refreshed in the background"""
+    global _task
+    count = await load_doctor_directory()
+    if settings.doctor_directory_refresh_seconds > 0:
+        _task = asyncio.create_task(_refresh_forever(settings.doctor_directory_refresh_seconds))
+    print(f"✅ Doctor directory index loaded ({count} doctors)")
+
+
+async def stop_doctor_directory_sync() -> None:
+    """Cancel the background refresh task"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,516 @@
+"""
+Synthetic Dataset Generator
+Bulk-loads a large, realistic dataset for load tests and benchmarks
+
+Counts scale from a full-size profile (5k doctors, 500k patients, 5M
+prescriptions, ...). Popularity is skewed: patients pick their primary doctor
+with Zipf-like weights, so the lowest-numbered doctors have huge panels
+(``<prefix>-doctor-0`` has the largest), and active patients have many more
+prescriptions, lab results and appointments than most.
+
+Field values are deterministic for a given --seed and --reference-date;
+document ids are fresh ObjectIds. Documents are generated lazily and written
+with ``insert_many`` in batches (the next batch is built while the previous
+one is written), so memory is bounded by the batch size plus one id per
+doctor, patient and user. Patient names are derived from the patient index
+rather than stored, so the patient and prescription documents that repeat them
+for search need no extra state. Generated accounts use SEEDER_PASSWORD.
+
+Run from backend/:
+
+    python -m app.database.generator --scale 0.1
+    python -m app.database.generator --doctors 5000 --patients 500000 --prescriptions 5000000
+"""
+import argparse
+import asyncio
+import bisect
+import random
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from itertools import accumulate, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Type
+from bson import DBRef, ObjectId
+from beanie import Document
+from app.models import (
+    User,
+    Doctor,
+    Patient,
+    Prescription,
+    LabResult,
+    Appointment,
+    Notification,
+    Pharmacy,
+)
+from app.utils.auth import hash_password_async
+from app.config.settings import settings
+from .seeder import insert_all
+
+
+# Counts at --scale 1
+FULL_SCALE: Dict[str, int] = {
+    "pharmacies": 500,
+    "doctors": 5_000,
+    "patients": 500_000,
+    "prescriptions": 5_000_000,
+    "notifications": 2_000_000,
+    "lab_results": 1_000_000,
+    "appointments": 1_000_000,
+}
+
+DEFAULT_SCALE = 0.01
+DEFAULT_BATCH_SIZE = 1000
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+    "David", "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Carlos", "Karen", "Wei", "Priya", "Ahmed", "Fatima",
+    "Hiroshi", "Yuki", "Olga", "Ivan", "Amara", "Kwame", "Sofia", "Mateo",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor",
+    "Moore", "Jackson", "Martin", "Lee", "Chen", "Patel", "Khan", "Nguyen",
+    "Kim", "Tanaka", "Ivanova", "Okafor", "Mensah", "Rossi", "Silva", "Cohen",
+]
+STREETS = ["Main St", "Market St", "Oak Ave", "Park Ave", "Pine St", "Cedar Rd", "Elm St", "Lake Dr"]
+CITIES = [
+    ("San Francisco", "CA"), ("Oakland", "CA"), ("Seattle", "WA"), ("Austin", "TX"),
+    ("Chicago", "IL"), ("Boston", "MA"), ("Denver", "CO"), ("Atlanta", "GA"),
+]
+
+SPECIALTIES = [
+    "Internal Medicine", "Family Medicine", "Cardiology", "Dermatology", "Pediatrics",
+    "Endocrinology", "Neurology", "Orthopedics", "Psychiatry", "Gastroenterology",
+]
+HOSPITAL_KINDS = ["Medical Center", "General Hospital", "Health Clinic", "Specialty Care", "Family Practice"]
+LANGUAGES = ["Spanish", "Mandarin", "Hindi", "French", "Arabic", "Vietnamese", "Korean", "Russian"]
+AVAILABILITY = ["Available Today", "Available Tomorrow", "Next available: in 1 week", "Waitlist"]
+
+PHARMACY_CHAINS = ["CVS Pharmacy", "Walgreens", "Rite Aid", "Walmart Pharmacy", "Costco Pharmacy", "Community Pharmacy"]
+
+# (medication, generic name, dosages, frequency, warnings, side effects)
+MEDICATIONS = [
+    ("Lisinopril", "Lisinopril", ["5mg", "10mg", "20mg"], "Once daily", ["May cause dizziness"], ["Dizziness", "Cough"]),
+    ("Metformin", "Metformin", ["500mg", "850mg", "1000mg"], "Twice daily", ["Take with food"], ["Nausea", "Diarrhea"]),
+    ("Lipitor", "Atorvastatin", ["10mg", "20mg", "40mg"], "Once daily at bedtime", ["Avoid grapefruit juice"], ["Muscle pain"]),
+    ("Norvasc", "Amlodipine", ["2.5mg", "5mg", "10mg"], "Once daily", ["May cause ankle swelling"], ["Swelling", "Flushing"]),
+    ("Synthroid", "Levothyroxine", ["25mcg", "50mcg", "100mcg"], "Once daily before breakfast", ["Take on an empty stomach"], ["Palpitations"]),
+    ("Prilosec", "Omeprazole", ["20mg", "40mg"], "Once daily", ["Long-term use may lower magnesium"], ["Headache"]),
+    ("Zoloft", "Sertraline", ["25mg", "50mg", "100mg"], "Once daily", ["Do not stop abruptly"], ["Insomnia", "Nausea"]),
+    ("Amoxil", "Amoxicillin", ["250mg", "500mg"], "Three times daily", ["Finish the full course"], ["Rash", "Nausea"]),
+    ("Ventolin", "Albuterol", ["90mcg"], "As needed", ["Seek care if used more than twice weekly"], ["Tremor"]),
+    ("Neurontin", "Gabapentin", ["100mg", "300mg"], "Three times daily", ["May cause drowsiness"], ["Drowsiness", "Dizziness"]),
+    ("Cozaar", "Losartan", ["25mg", "50mg", "100mg"], "Once daily", ["Monitor potassium"], ["Dizziness"]),
+    ("Deltasone", "Prednisone", ["5mg", "10mg", "20mg"], "Once daily", ["Take with food"], ["Insomnia", "Increased appetite"]),
+]
+DURATIONS = ["7 days", "14 days", "30 days", "90 days", "180 days"]
+PRESCRIPTION_STATUSES = ["active", "completed", "discontinued", "expired", "pending"]
+PRESCRIPTION_STATUS_WEIGHTS = [35, 40, 10, 10, 5]
+
+LAB_TESTS = [
+    ("Complete Blood Count (CBC)", "All values within normal range", "Hemoglobin slightly low"),
+    ("Lipid Panel", "Total cholesterol: 180 mg/dL", "Total cholesterol: 240 mg/dL (Elevated)"),
+    ("HbA1c (Diabetes)", "5.4% (Normal)", "7.8% (Elevated)"),
+    ("Thyroid Function", "TSH within normal range", "TSH elevated"),
+    ("Basic Metabolic Panel", "All values within normal range", "Potassium slightly high"),
+    ("Vitamin D", "32 ng/mL (Normal)", "14 ng/mL (Deficient)"),
+]
+APPOINTMENT_TYPES = ["Follow-up", "Consultation", "Check-up", "Annual Physical", "Telehealth"]
+NOTIFICATION_KINDS = [
+    ("prescription", "Prescription Refill Ready", "Your prescription is ready for pickup.", "high"),
+    ("appointment", "Appointment Reminder", "You have an upcoming appointment.", "high"),
+    ("system", "Profile Updated", "Your profile information was updated.", "low"),
+    ("message", "New Message", "You have a new message from your care team.", "medium"),
+]
+BLOOD_TYPES = ["O+", "A+", "B+", "O-", "A-", "AB+", "B-", "AB-"]
+BLOOD_TYPE_WEIGHTS = [37, 36, 9, 7, 6, 3, 1, 1]
+
+
+class _SkewedPicker:
+    """
+    Draw indexes 0..n-1 with Zipf-like weights (index i has weight 1 / (i + 1) ** skew)
+
+    Args:
+        n: Number of items
+        skew: Exponent; 0 is uniform, larger values concentrate picks on low indexes
+        rng: Random source
+    """
+
+    def __init__(self, n: int, skew: float, rng: random.Random) -> None:
+        self._cumulative = list(accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+        self._rng = rng
+
+    def pick(self) -> int:
+        return bisect.bisect_right(self._cumulative, self._rng.random() * self._cumulative[-1])
+
+
+def _batched(documents: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    iterator = iter(documents)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+async def _stream(model: Type[Document], documents: Iterable[Document], batch_size: int) -> int:
+    """
+    Insert documents with one insert_many per batch
+
+    At most two batches are alive: the one being written and the one being built.
+
+    Returns:
+        Number of documents inserted
+    """
+    label = model.get_collection_name()
+    started = time.monotonic()
+    pending: Optional[asyncio.Task] = None
+    count = 0
+    for batch in _batched(documents, batch_size):
+        if pending is not None:
+            await pending
+        pending = asyncio.create_task(insert_all(model, batch))
+        # Let the insert send its batch before building the next one
+        await asyncio.sleep(0)
+        count += len(batch)
+    if pending is not None:
+        await pending
+    print(f"✅ Inserted {count} {label} in {time.monotonic() - started:.1f}s")
+    return count
+
+
+class DatasetGenerator:
+    """
+    Deterministic synthetic dataset
+
+    Args:
+        counts: Documents per collection (keys of FULL_SCALE)
+        seed: Random seed; the same seed and reference date give the same field values
+        skew: Popularity exponent for doctors (patient panel sizes)
+        patient_skew: Popularity exponent for patients (records per patient)
+        prefix: Email/username prefix of generated accounts
+        reference_date: "Today" of the dataset; generated dates fall around it
+        batch_size: Documents per insert_many
+    """
+
+    def __init__(
+        self,
+        counts: Dict[str, int],
+        seed: int = 42,
+        skew: float = 1.0,
+        patient_skew: float = 0.5,
+        prefix: str = "gen",
+        reference_date: Optional[date] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.counts = counts
+        self.skew = skew
+        self.patient_skew = patient_skew
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.seed = seed
+        self.rng = random.Random(seed)
+        reference_date = reference_date or datetime.utcnow().date()
+        self.now = datetime(reference_date.year, reference_date.month, reference_date.day)
+
+        # One id per referenced document; everything else is streamed
+        self.pharmacies: List[Pharmacy] = []
+        self.doctor_ids: List[ObjectId] = []
+        self.doctor_user_ids: List[ObjectId] = []
+        self.patient_ids: List[ObjectId] = []
+        self.patient_user_ids: List[ObjectId] = []
+        self.primary_doctor = array("I")
+
+    def _past(self, max_days: int) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def _full_name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _patient_name(self, index: int) -> str:
+        """Name of the index-th patient, recomputed wherever it is needed"""
+        mixed = ((index + 1) * 2654435761 + self.seed * 40503) & 0xFFFFFFFF
+        first, last = divmod(mixed, len(LAST_NAMES))
+        return f"{FIRST_NAMES[first % len(FIRST_NAMES)]} {LAST_NAMES[last]}"
+
+    def _address(self) -> str:
+        city, state = self.rng.choice(CITIES)
+        return (
+            f"{self.rng.randint(1, 9999)} {self.rng.choice(STREETS)}, "
+            f"{city}, {state} {self.rng.randint(10000, 99999)}"
+        )
+
+    def _phone(self) -> str:
+        return f"+1 (555) {self.rng.randint(100, 999)}-{self.rng.randint(1000, 9999)}"
+
+    def _users(self, role: str, ids: List[ObjectId], password_hash: str) -> Iterator[User]:
+        for i, user_id in enumerate(ids):
+            name = self._patient_name(i) if role == "patient" else self._full_name()
+            created_at = self._past(3 * 365)
+            yield User(
+                id=user_id,
+                email=f"{self.prefix}-{role}-{i}@example.com",
+                username=f"{self.prefix}-{role}-{i}",
+                full_name=f"Dr. {name}" if role == "doctor" else name,
+                password_hash=password_hash,
+                role=role,
+                is_active=True,
+                is_verified=True,
+                created_at=created_at,
+                updated_at=created_at,
+            )
+
+    def _pharmacy_documents(self) -> Iterator[Pharmacy]:
+        for i in range(self.counts["pharmacies"]):
+            yield Pharmacy(
+                name=f"{self.rng.choice(PHARMACY_CHAINS)} #{i + 1}",
+                address=self._address(),
+                phone=self._phone(),
+                hours="Mon-Fri: 8AM-9PM, Sat-Sun: 9AM-6PM",
+                latitude=round(self.rng.uniform(25.0, 48.0), 5),
+                longitude=round(self.rng.uniform(-123.0, -71.0), 5),
+            )
+
+    def _doctor_documents(self) -> Iterator[Doctor]:
+        for i, (doctor_id, user_id) in enumerate(zip(self.doctor_ids, self.doctor_user_ids)):
+            created_at = self._past(3 * 365)
+            yield Doctor(
+                id=doctor_id,
+                user=DBRef(User.get_collection_name(), user_id),
+                specialty=self.rng.choice(SPECIALTIES),
+                hospital=f"{self.rng.choice(CITIES)[0]} {self.rng.choice(HOSPITAL_KINDS)}",
+                experience_years=self.rng.randint(1, 40),
+                license_number=f"MD-{100000 + i}",
+                phone=self._phone(),
+                practice_address=self._address(),
+                accepting_new_patients=self.rng.random() < 0.7,
+                availability=self.rng.choice(AVAILABILITY),
+                languages=["English"] + self.rng.sample(LANGUAGES, self.rng.randint(0, 2)),
+                rating=round(self.rng.uniform(3.0, 5.0), 1),
+                review_count=int(self.rng.paretovariate(1.2) * 10),
+                created_at=created_at,
+                updated_at=created_at,
+            )
+
+    def _patient_documents(self) -> Iterator[Patient]:
+        for i, (patient_id, user_id) in enumerate(zip(self.patient_ids, self.patient_user_ids)):
+            age = self.rng.randint(1, 95)
+            born = self.now.date() - timedelta(days=age * 365 + self.rng.randrange(365))
+            created_at = self._past(3 * 365)
+            patient = Patient(
+                id=patient_id,
+                user=DBRef(User.get_collection_name(), user_id),
+                age=age,
+                gender=self.rng.choice(["Female", "Male"]),
+                phone=self._phone(),
+                address=self._address(),
+                date_of_birth=born,
+                blood_type=self.rng.choices(BLOOD_TYPES, BLOOD_TYPE_WEIGHTS)[0],
+                height=f"{self.rng.randint(4, 6)}'{self.rng.randint(0, 11)}\"",
+                weight=f"{self.rng.randint(90, 260)} lbs",
+                status="active" if self.rng.random() < 0.9 else "inactive",
+                last_visit=self._past(365),
+                created_at=created_at,
+                updated_at=created_at,
+            )
+            patient.set_search_keys(self._patient_name(i), f"{self.prefix}-patient-{i}@example.com")
+            yield patient
+
+    def _treating_doctor(self, patient: int, doctors: _SkewedPicker, loyalty: float) -> ObjectId:
+        """The patient's primary doctor most of the time, otherwise a (skewed) random one"""
+        if self.rng.random() < loyalty:
+            return self.doctor_ids[self.primary_doctor[patient]]
+        return self.doctor_ids[doctors.pick()]
+
+    def _prescription_documents(self, patients: _SkewedPicker, doctors: _SkewedPicker) -> Iterator[Prescription]:
+        for _ in range(self.counts["prescriptions"]):
+            patient = patients.pick()
+            medication, generic, dosages, frequency, warnings, side_effects = self.rng.choice(MEDICATIONS)
+            prescribed = self._past(3 * 365)
+            duration = self.rng.choice(DURATIONS)
+            refills = self.rng.randint(0, 5)
+            pharmacy = self.rng.choice(self.pharmacies) if self.pharmacies else None
+            prescription = Prescription(
+                patient=DBRef(Patient.get_collection_name(), self.patient_ids[patient]),
+                doctor=DBRef(Doctor.get_collection_name(), self._treating_doctor(patient, doctors, 0.85)),
+                medication=medication,
+                generic_name=generic,
+                dosage=self.rng.choice(dosages),
+                frequency=frequency,
+                duration=duration,
+                prescribed_date=prescribed,
+                expiry_date=prescribed + timedelta(days=int(duration.split()[0])),
+                status=self.rng.choices(PRESCRIPTION_STATUSES, PRESCRIPTION_STATUS_WEIGHTS)[0],
+                instructions="Take as directed",
+                refills=refills,
+                refills_remaining=self.rng.randint(0, refills),
+                pharmacy_name=pharmacy.name if pharmacy else None,
+                pharmacy_address=pharmacy.address if pharmacy else None,
+                pharmacy_phone=pharmacy.phone if pharmacy else None,
+                warnings=list(warnings),
+                side_effects=list(side_effects),
+                created_at=prescribed,
+                updated_at=prescribed,
+            )
+            prescription.set_search_fields(self._patient_name(patient))
+            yield prescription
+
+    def _lab_result_documents(self, patients: _SkewedPicker, doctors: _SkewedPicker) -> Iterator[LabResult]:
+        for _ in range(self.counts["lab_results"]):
+            patient = patients.pick()
+            test, normal, abnormal = self.rng.choice(LAB_TESTS)
+            status = self.rng.choices(["normal", "abnormal", "pending"], [70, 20, 10])[0]
+            taken = self._past(2 * 365)
+            yield LabResult(
+                patient=DBRef(Patient.get_collection_name(), self.patient_ids[patient]),
+                ordered_by=DBRef(Doctor.get_collection_name(), self._treating_doctor(patient, doctors, 0.9)),
+                test=test,
+                date=taken,
+                result={"normal": normal, "abnormal": abnormal}.get(status, "Pending"),
+                status=status,
+                created_at=taken,
+                updated_at=taken,
+            )
+
+    def _appointment_documents(self, patients: _SkewedPicker, doctors: _SkewedPicker) -> Iterator[Appointment]:
+        for _ in range(self.counts["appointments"]):
+            patient = patients.pick()
+            # Mostly past visits, some booked up to 60 days ahead
+            when = self.now + timedelta(minutes=30 * self.rng.randrange(-365 * 48, 60 * 48))
+            if when < self.now:
+                status = "completed" if self.rng.random() < 0.9 else "cancelled"
+            else:
+                status = "confirmed" if self.rng.random() < 0.5 else "upcoming"
+            booked = min(when, self.now) - timedelta(days=self.rng.randint(1, 60))
+            yield Appointment(
+                patient=DBRef(Patient.get_collection_name(), self.patient_ids[patient]),
+                doctor=DBRef(Doctor.get_collection_name(), self._treating_doctor(patient, doctors, 0.8)),
+                date=when,
+                type=self.rng.choice(APPOINTMENT_TYPES),
+                status=status,
+                duration_minutes=self.rng.choice([15, 30, 30, 45, 60]),
+                created_at=booked,
+                updated_at=booked,
+            )
+
+    def _notification_documents(self, patients: _SkewedPicker, doctors: _SkewedPicker) -> Iterator[Notification]:
+        for _ in range(self.counts["notifications"]):
+            if self.doctor_user_ids and (not self.patient_user_ids or self.rng.random() < 0.15):
+                user_id = self.doctor_user_ids[doctors.pick()]
+            else:
+                user_id = self.patient_user_ids[patients.pick()]
+            kind, title, description, priority = self.rng.choice(NOTIFICATION_KINDS)
+            sent = self._past(180)
+            yield Notification(
+                user=DBRef(User.get_collection_name(), user_id),
+                type=kind,
+                title=title,
+                description=description,
+                read=self.rng.random() < 0.7,
+                priority=priority,
+                timestamp=sent,
+                created_at=sent,
+                updated_at=sent,
+            )
+
+    async def run(self) -> Dict[str, int]:
+        """
+        Generate and insert the whole dataset
+
+        Returns:
+            Documents inserted per collection
+        """
+        n_doctors = self.counts["doctors"]
+        n_patients = self.counts["patients"]
+        self.doctor_ids = [ObjectId() for _ in range(n_doctors)]
+        self.doctor_user_ids = [ObjectId() for _ in range(n_doctors)]
+        self.patient_ids = [ObjectId() for _ in range(n_patients)]
+        self.patient_user_ids = [ObjectId() for _ in range(n_patients)]
+
+        doctors = _SkewedPicker(n_doctors, self.skew, self.rng) if n_doctors else None
+        patients = _SkewedPicker(n_patients, self.patient_skew, self.rng) if n_patients else None
+        if doctors is not None:
+            self.primary_doctor = array("I", (doctors.pick() for _ in range(n_patients)))
+
+        password_hash = await hash_password_async(settings.seeder_password)
+        inserted: Dict[str, int] = {}
+
+        self.pharmacies = list(self._pharmacy_documents())
+        inserted["pharmacies"] = len(await insert_all(Pharmacy, self.pharmacies))
+        inserted["users"] = await _stream(User, self._users("doctor", self.doctor_user_ids, password_hash), self.batch_size)
+        inserted["users"] += await _stream(User, self._users("patient", self.patient_user_ids, password_hash), self.batch_size)
+        inserted["doctors"] = await _stream(Doctor, self._doctor_documents(), self.batch_size)
+        inserted["patients"] = await _stream(Patient, self._patient_documents(), self.batch_size)
+
+        # Records need at least one doctor and one patient to point at
+        if doctors is None or patients is None:
+            return inserted
+        inserted["prescriptions"] = await _stream(
+            Prescription, self._prescription_documents(patients, doctors), self.batch_size
+        )
+        inserted["lab_results"] = await _stream(LabResult, self._lab_result_documents(patients, doctors), self.batch_size)
+        inserted["appointments"] = await _stream(
+            Appointment, self._appointment_documents(patients, doctors), self.batch_size
+        )
+        inserted["notifications"] = await _stream(
+            Notification, self._notification_documents(patients, doctors), self.batch_size
+        )
+        return inserted
+
+
+def scaled_counts(scale: float, overrides: Optional[Dict[str, Optional[int]]] = None) -> Dict[str, int]:
+    """
+    Per-collection counts for a scale factor of FULL_SCALE
+
+    Args:
+        scale: Multiplier applied to every FULL_SCALE count
+        overrides: Explicit counts that replace the scaled ones (None values are ignored)
+    """
+    counts = {name: max(1, round(full * scale)) for name, full in FULL_SCALE.items()}
+    for name, value in (overrides or {}).items():
+        if value is not None:
+            counts[name] = value
+    return counts
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.database.connection import init_beanie, close_database
+    from app.database.care_sync import sync_care_relationships_from_prescriptions
+
+    counts = scaled_counts(args.scale, {name: getattr(args, name) for name in FULL_SCALE})
+    await init_beanie()
+    try:
+        if await User.find_one(User.email == f"{args.prefix}-doctor-0@example.com"):
+            print(f"⚠️ A dataset with prefix '{args.prefix}' already exists. Use another --prefix.")
+            return
+
+        print(f"🌱 Generating dataset: {counts}")
+        generator = DatasetGenerator(
+            counts,
+            seed=args.seed,
+            skew=args.skew,
+            patient_skew=args.patient_skew,
+            prefix=args.prefix,
+            reference_date=args.reference_date,
+            batch_size=args.batch_size,
+        )
+        await generator.run()
+
+        if not args.skip_care_sync:
+            created = await sync_care_relationships_from_prescriptions()
+            print(f"✅ Care sync created {created} care relationships")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset at scale")
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE, help=f"fraction of the full-size profile (default {DEFAULT_SCALE})")
+    for name, full in FULL_SCALE.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, help=f"{name} to create (full size {full})")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default 42)")
+    parser.add_argument("--skew", type=float, default=1.0, help="doctor popularity skew, 0 for uniform (default 1.0)")
+    parser.add_argument("--patient-skew", type=float, default=0.5, help="patient activity skew, 0 for uniform (default 0.5)")
+    parser.add_argument("--prefix", default="gen", help="email/username prefix of generated accounts (default 'gen')")
+    parser.add_argument("--reference-date", type=date.fromisoformat, help="date the dataset treats as today (default: today)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"documents per insert_many (default {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--skip-care-sync", action="store_true", help="do not create care relationships afterwards")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,125 @@
+"""
+Request-scoped identity map for Beanie documents
+
+Within one request the same User/Doctor/Patient is often needed several
+times (auth dependency, profile lookup, link resolution). The identity map
+keeps every document loaded during the request keyed by (model, id), so
+repeated lookups are served from memory. It lives in a contextvar set by
+``IdentityMapMiddleware``; outside a request (seeder, scripts) lookups go
+straight to MongoDB.
+"""
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, Optional, Tuple, Type, TypeVar
+from beanie import Document, PydanticObjectId
+
+
+DocT = TypeVar("DocT", bound=Document)
+
+_identity_map: ContextVar[Optional["IdentityMap"]] = ContextVar("identity_map", default=None)
+
+
+class IdentityMap:
+    """
+    Per-request document cache keyed by (model, id)
+
+    Documents can also be registered under alternate keys (e.g. a profile
+    looked up by its user id) so non-id lookups are memoized too.
+    Hit/miss counters are kept for debugging.
+    """
+
+    def __init__(self) -> None:
+        self._documents: Dict[Tuple[Type[Document], Hashable], Document] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model: Type[DocT], key: Hashable) -> Optional[DocT]:
+        """Return the cached document for key, counting the hit or miss"""
+        doc = self._documents.get((model, key))
+        if doc is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return doc
+
+    def add(self, doc: Optional[Document], *aliases: Hashable) -> None:
+        """Register a document under its id and any alternate keys"""
+        if doc is None or doc.id is None:
+            return
+        model = type(doc)
+        self._documents[(model, doc.id)] = doc
+        for alias in aliases:
+            self._documents[(model, alias)] = doc
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and cache size for the current request"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._documents)}
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    """Return the identity map of the current request, if any"""
+    return _identity_map.get()
+
+
+def activate_identity_map(identity_map: IdentityMap):
+    """Bind identity_map to the current context; returns a reset token"""
+    return _identity_map.set(identity_map)
+
+
+def deactivate_identity_map(token) -> None:
+    """Restore the identity map that was active before activate_identity_map"""
+    _identity_map.reset(token)
+
+
+def remember(doc: Optional[Document], *aliases: Hashable) -> None:
+    """Register a document loaded by some other query in the current map"""
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        identity_map.add(doc, *aliases)
+
+
+async def get_document(model: Type[DocT], doc_id: Any) -> Optional[DocT]:
+    """
+    ``model.get(doc_id)`` that consults the identity map first
+
+    Args:
+        model: Document class
+        doc_id: Document id (ObjectId or its string form)
+
+    Returns:
+        The document, or None if it does not exist
+    """
+    if isinstance(doc_id, str):
+        doc_id = PydanticObjectId(doc_id)
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        doc = identity_map.get(model, doc_id)
+        if doc is not None:
+            return doc
+    doc = await model.get(doc_id)
+    remember(doc)
+    return doc
+
+
+async def find_one_cached(model: Type[DocT], key: Hashable, *criteria: Any) -> Optional[DocT]:
+    """
+    ``model.find_one(*criteria)`` memoized under an alternate key
+
+    Example:
+        doctor = await find_one_cached(Doctor, ("user", user.id), Doctor.user.id == user.id)
+
+    Args:
+        model: Document class
+        key: Alternate key identifying the lookup within the request
+        criteria: find_one query expressions
+
+    Returns:
+        The document, or None if no document matches
+    """
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        doc = identity_map.get(model, key)
+        if doc is not None:
+            return doc
+    doc = await model.find_one(*criteria)
+    remember(doc, key)
+    return doc
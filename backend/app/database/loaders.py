@@ -0,0 +1,149 @@
+"""
+Request-scoped batch loader for Beanie links
+
+Routes that render lists used to call ``fetch_all_links()`` and then
+``link.user.fetch()`` for every row, costing several round trips per row.
+``LinkLoader`` collects the ids referenced across a whole result set and
+resolves them with a single ``$in`` query per model. Documents are cached in
+the request's identity map, so they are shared with every other lookup made
+during the request.
+"""
+from typing import Any, Dict, Iterable, Optional, Type, TypeVar
+from beanie import Document, Link
+from beanie.operators import In
+from app.models import User
+from .identity_map import IdentityMap
+
+
+DocT = TypeVar("DocT", bound=Document)
+
+
+def link_id(value: Any) -> Any:
+    """
+    Return the id referenced by a link field
+
+    Works for unfetched ``Link`` objects as well as already fetched documents.
+
+    Args:
+        value: Link, Document or None
+
+    Returns:
+        The referenced document id, or None
+    """
+    if value is None:
+        return None
+    if isinstance(value, Link):
+        return value.ref.id
+    return value.id
+
+
+class LinkLoader:
+    """
+    DataLoader-style resolver for ``Link[Doctor]``, ``Link[Patient]`` and ``Link[User]``
+
+    One instance lives for a single request (see ``get_link_loader``).
+    Documents are cached in an identity map, so resolving the same id twice
+    only hits MongoDB once.
+    """
+
+    def __init__(self, identity_map: Optional[IdentityMap] = None) -> None:
+        self._identity_map = identity_map if identity_map is not None else IdentityMap()
+
+    def prime(self, *documents: Optional[Document]) -> None:
+        """Seed the cache with documents the request already holds"""
+        for doc in documents:
+            self._identity_map.add(doc)
+
+    async def load_many(self, model: Type[DocT], ids: Iterable[Any]) -> Dict[Any, DocT]:
+        """
+        Load documents by id with at most one ``$in`` query
+
+        Args:
+            model: Document class to load
+            ids: Document ids (None values are ignored)
+
+        Returns:
+            Mapping of id to document for every id that exists
+        """
+        found: Dict[Any, DocT] = {}
+        missing = []
+        for doc_id in {doc_id for doc_id in ids if doc_id is not None}:
+            doc = self._identity_map.get(model, doc_id)
+            if doc is None:
+                missing.append(doc_id)
+            else:
+                found[doc_id] = doc
+        if missing:
+            for doc in await model.find(In("_id", missing)).to_list():
+                self._identity_map.add(doc)
+                found[doc.id] = doc
+        return found
+
+    async def load(self, model: Type[DocT], doc_id: Any) -> Optional[DocT]:
+        """Load a single document by id through the cache"""
+        return (await self.load_many(model, [doc_id])).get(doc_id)
+
+    async def load_links(
+        self,
+        model: Type[DocT],
+        rows: Iterable[Any],
+        field: str,
+    ) -> Dict[Any, DocT]:
+        """
+        Resolve ``row.<field>`` for every row in one query
+
+        Args:
+            model: Document class the link points to
+            rows: Documents holding the link
+            field: Name of the link attribute
+
+        Returns:
+            Mapping of referenced id to document
+        """
+        return await self.load_many(model, (link_id(getattr(row, field)) for row in rows))
+
+    async def load_users_by_profile(
+        self,
+        model: Type[Document],
+        profile_ids: Iterable[Any],
+    ) -> Dict[Any, User]:
+        """
+        Resolve Doctor/Patient profile ids to their ``User``
+
+        Costs at most two queries (profiles, then users) for the whole set.
+
+        Args:
+            model: Profile document class (Doctor or Patient)
+            profile_ids: Profile document ids
+
+        Returns:
+            Mapping of profile id to the profile's User
+        """
+        profiles = await self.load_many(model, profile_ids)
+        users = await self.load_links(User, profiles.values(), "user")
+        return {
+            profile_id: users[link_id(profile.user)]
+            for profile_id, profile in profiles.items()
+            if link_id(profile.user) in users
+        }
+
+    async def load_users(
+        self,
+        model: Type[Document],
+        rows: Iterable[Any],
+        field: str,
+    ) -> Dict[Any, User]:
+        """
+        Resolve a ``Link[Doctor]``/``Link[Patient]`` through to its ``User``
+
+        Args:
+            model: Profile document class (Doctor or Patient)
+            rows: Documents holding the profile link
+            field: Name of the profile link attribute
+
+        Returns:
+            Mapping of profile id to the profile's User
+        """
+        return await self.load_users_by_profile(
+            model, (link_id(getattr(row, field)) for row in rows)
+        )
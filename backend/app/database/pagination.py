@@ -0,0 +1,102 @@
+"""
+Keyset (cursor) pagination
+
+List endpoints sort by one or more fields with ``_id`` as the final
+tiebreaker. The sort values of the last row on a page are encoded into an
+opaque cursor, and the next page only matches rows strictly after those
+values. Every page is then an index range scan of ``limit`` rows, however
+deep the client pages (no ``$skip``).
+
+Cursors come from clients, so each decoded value is checked against its
+sort field before it reaches a query: ``_id`` holds an ObjectId, relevance
+scores (``_score``, ``score``) a number, and every other sort field a date.
+"""
+import base64
+import binascii
+import math
+from datetime import datetime
+from typing import Any, List, Sequence, Tuple
+from bson import ObjectId, json_util
+from bson.errors import InvalidBSON
+
+
+# (field, direction) pairs, ending with ("_id", ...)
+SortSpec = Sequence[Tuple[str, int]]
+
+# Sort fields holding relevance scores rather than dates
+SCORE_FIELDS = {"_score", "score"}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded for the requested sort"""
+
+
+def _valid_value(field: str, value: Any) -> bool:
+    """Whether a cursor value has the type of its sort field"""
+    if field == "_id":
+        return isinstance(value, ObjectId)
+    if field in SCORE_FIELDS:
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+    return isinstance(value, datetime)
+
+
+def check_sort_values(sort: SortSpec, values: Sequence[Any]) -> None:
+    """
+    Check that values hold one value of the right type per sort field
+
+    Raises:
+        InvalidCursor: If they do not
+    """
+    if len(values) != len(sort):
+        raise InvalidCursor(values)
+    for (field, _), value in zip(sort, values):
+        if not _valid_value(field, value):
+            raise InvalidCursor(values)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort values of a row into an opaque, URL-safe cursor
+
+    Args:
+        values: One value per sort field (datetimes and ObjectIds allowed)
+    """
+    raw = json_util.dumps(list(values)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: SortSpec) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor for the given sort
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or does not match the sort
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json_util.loads(raw)
+    except (binascii.Error, ValueError, TypeError, InvalidBSON):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    check_sort_values(sort, values)
+    return values
+
+
+def keyset_filter(sort: SortSpec, after: Sequence[Any]) -> dict:
+    """
+    Query matching rows that sort strictly after the given values
+
+    For sort (a desc, _id desc) and values (A, ID) this is
+    ``{"$or": [{"a": {"$lt": A}}, {"a": A, "_id": {"$lt": ID}}]}``.
+
+    Raises:
+        InvalidCursor: If the values do not match the sort (see check_sort_values)
+    """
+    check_sort_values(sort, after)
+    clauses = []
+    for position, (field, direction) in enumerate(sort):
+        clause = {prefix: value for (prefix, _), value in zip(sort[:position], after)}
+        clause[field] = {"$gt" if direction > 0 else "$lt": after[position]}
+        clauses.append(clause)
+    return {"$or": clauses}
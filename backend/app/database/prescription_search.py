@@ -0,0 +1,194 @@
+"""
+Prescription search
+
+Doctors search their prescription history by medication, generic name or
+patient name (denormalized onto each prescription as ``patient_name``).
+Two strategies share one pipeline shape and are ranked by relevance, then
+newest first:
+
+- n-gram (default): ``search_keys`` word prefixes behind a ``(doctor.$id,
+  search_keys)`` index; every query term must prefix a word, so "met" finds
+  "Metformin" while it is still being typed. Rows are ranked by the field
+  weights of the matching words, whole-word matches counting double
+- text (``PRESCRIPTION_SEARCH_MODE=text``): a MongoDB text index
+  (``doctor.$id`` prefix, weighted fields), ranked by ``textScore``; every
+  query word must match a whole word
+
+The history page searches as the doctor types, so the last term is usually
+incomplete and only the n-gram strategy can answer it. The text strategy is
+used only when asked for, and falls back to n-grams when the server cannot
+run ``$text`` (for example under the Stable API in strict mode). Both only
+read the doctor's matching prescriptions, so latency follows the number of
+matches rather than the size of the history.
+"""
+import re
+from typing import Any, List, Optional, Sequence
+from pymongo.errors import OperationFailure
+from app.config.settings import settings
+from app.models import Prescription
+from app.utils.search import query_prefixes, search_terms
+from .pagination import keyset_filter
+
+
+TEXT_INDEX_NAME = "prescription_text"
+
+# Relevance weight per searchable field
+FIELD_WEIGHTS = {"medication": 3, "patient_name": 3, "generic_name": 1}
+
+# Keyset order of search results: relevance, then newest first
+SEARCH_ORDER = [("_score", -1), ("_id", -1)]
+
+# Error codes meaning "$text cannot run here": IndexNotFound, APIStrictError
+_TEXT_UNAVAILABLE_CODES = {27, 323}
+
+# None until the text index has been checked (at startup or first search)
+_text_available: Optional[bool] = None
+
+
+async def ensure_prescription_text_index(database) -> bool:
+    """
+    Create the prescription text index if text search is configured and the
+    server supports it
+
+    Beanie cannot declare this index without failing startup on servers
+    lacking text search, so it is created here, best effort.
+
+    Returns:
+        True if text search is available
+    """
+    global _text_available
+    if settings.prescription_search_mode != "text":
+        _text_available = False
+        return False
+    collection = database[Prescription.Settings.name]
+    try:
+        await collection.create_index(
+            [("doctor.$id", 1)] + [(field, "text") for field in FIELD_WEIGHTS],
+            name=TEXT_INDEX_NAME,
+            weights=FIELD_WEIGHTS,
+            default_language="none",
+        )
+        _text_available = True
+    except OperationFailure as e:
+        print(f"⚠️ Prescription text index unavailable, using n-gram search: {e}")
+        _text_available = False
+    return _text_available
+
+
+def _text_stages(query: str) -> Optional[List[dict]]:
+    terms = list(dict.fromkeys(search_terms(query)))
+    if not terms:
+        return None
+    # Quoted terms are ANDed; bare terms would be ORed
+    phrase = " ".join(f'"{term}"' for term in terms)
+    return [
+        {"$match": {"$text": {"$search": phrase}}},
+        {"$addFields": {"_score": {"$meta": "textScore"}}},
+    ]
+
+
+def _word_prefix(term: str) -> str:
+    return rf"(^|[^a-z0-9]){re.escape(term)}"
+
+
+def _whole_word(term: str) -> str:
+    return rf"{_word_prefix(term)}($|[^a-z0-9])"
+
+
+def _matches(field: str, regex: str) -> dict:
+    return {"$regexMatch": {"input": {"$ifNull": [f"${field}", ""]}, "regex": regex, "options": "i"}}
+
+
+def _ngram_stages(query: str) -> Optional[List[dict]]:
+    prefixes = query_prefixes(query)
+    if not prefixes:
+        return None
+    # A word the term completes outranks one it only starts
+    score = [
+        {"$cond": [
+            _matches(field, _word_prefix(term)),
+            {"$cond": [_matches(field, _whole_word(term)), 2 * weight, weight]},
+            0,
+        ]}
+        for term in prefixes
+        for field, weight in FIELD_WEIGHTS.items()
+    ]
+    return [
+        {"$match": {"search_keys": {"$all": prefixes}}},
+        {"$addFields": {"_score": {"$add": score}}},
+    ]
+
+
+def search_pipeline(
+    match: dict,
+    query: str,
+    after: Optional[Sequence[Any]],
+    limit: int,
+    text: bool,
+) -> Optional[List[dict]]:
+    """
+    Build the ranked search stages of a prescription list
+
+    Args:
+        match: Filters of the list; must include ``doctor.$id``
+        query: Search text
+        after: SEARCH_ORDER values of the last row of the previous page
+        limit: Maximum rows
+        text: Use the text index instead of n-gram keys
+
+    Returns:
+        Stages up to the page limit (rows keep ``_score``), or None when
+        the query has no searchable terms
+    """
+    stages = _text_stages(query) if text else _ngram_stages(query)
+    if stages is None:
+        return None
+    # The first stage is the search $match; the list filters join it
+    stages[0] = {"$match": {**match, **stages[0]["$match"]}}
+    if after is not None:
+        stages.append({"$match": keyset_filter(SEARCH_ORDER, after)})
+    stages += [
+        {"$sort": dict(SEARCH_ORDER)},
+        {"$limit": limit},
+    ]
+    return stages
+
+
+async def search_prescriptions(
+    match: dict,
+    query: str,
+    after: Optional[Sequence[Any]],
+    limit: int,
+    tail: Sequence[dict] = (),
+) -> List[dict]:
+    """
+    Run a ranked prescription search, falling back to n-grams if needed
+
+    Args:
+        match: Filters of the list; must include ``doctor.$id``
+        query: Search text
+        after: SEARCH_ORDER values of the last row of the previous page
+        limit: Maximum rows
+        tail: Stages appended after the page limit (joins, projection)
+
+    Returns:
+        Rows in SEARCH_ORDER, each with its ``_score``
+    """
+    global _text_available
+    use_text = settings.prescription_search_mode == "text" and _text_available is not False
+    if use_text:
+        stages = search_pipeline(match, query, after, limit, text=True)
+        if stages is None:
+            return []
+        try:
+            return await Prescription.aggregate(stages + list(tail)).to_list()
+        except OperationFailure as e:
+            if e.code not in _TEXT_UNAVAILABLE_CODES:
+                raise
+            print(f"⚠️ Prescription text search unavailable, using n-gram search: {e}")
+            _text_available = False
+
+    stages = search_pipeline(match, query, after, limit, text=False)
+    if stages is None:
+        return []
+    return await Prescription.aggregate(stages + list(tail)).to_list()
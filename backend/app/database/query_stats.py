@@ -0,0 +1,120 @@
+"""
+Per-request MongoDB command statistics
+
+``QueryStatsListener`` is registered on the PyMongo client and attributes
+every command to the ``QueryStats`` of the HTTP request that issued it (a
+contextvar set by ``QueryStatsMiddleware``). Besides counts, time and bytes
+it counts query shapes: the command, collection and filter with every value
+replaced by "?". A request that runs the same shape many times is usually
+loading related documents one by one (the N+1 pattern). Commands issued
+outside a request (startup, background sync) are ignored.
+"""
+import json
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, List, Mapping, Optional, Tuple
+import bson
+from pymongo import monitoring
+
+
+_query_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+# Cursor and connection housekeeping, never part of an N+1 pattern
+_UNSHAPED_COMMANDS = {"getMore", "killCursors", "endSessions", "ping", "hello", "isMaster", "ismaster"}
+
+
+class QueryStats:
+    """
+    MongoDB commands issued by one request
+
+    Args:
+        track_bytes: Also measure encoded command and reply sizes (costs an
+            extra BSON encode per command, so only enabled in debug)
+    """
+
+    def __init__(self, track_bytes: bool = False) -> None:
+        self.track_bytes = track_bytes
+        self.commands = 0
+        self.duration_ms = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.shapes: Counter = Counter()
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        """Query shapes issued at least threshold times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def _shape(value: Any) -> Any:
+    """Replace every value with "?"; arrays collapse to their first element"""
+    if isinstance(value, Mapping):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_shape(item) for item in value[:1]]
+    return "?"
+
+
+def query_shape(command_name: str, command: Mapping[str, Any]) -> Optional[str]:
+    """
+    Normalized form of a command: name, collection and filter shape
+
+    Returns:
+        The shape, or None for housekeeping commands
+    """
+    if command_name in _UNSHAPED_COMMANDS:
+        return None
+    collection = command.get(command_name)
+    if command_name == "aggregate":
+        query = [_shape(stage) for stage in command.get("pipeline", [])]
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        query = _shape(statements[0].get("q", {}))
+    else:
+        query = _shape(command.get("filter", command.get("query", {})))
+    return f"{command_name} {collection} {json.dumps(query, sort_keys=True)}"
+
+
+class QueryStatsListener(monitoring.CommandListener):
+    """PyMongo command listener feeding the current request's QueryStats"""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        stats = _query_stats.get()
+        if stats is None:
+            return
+        stats.commands += 1
+        shape = query_shape(event.command_name, event.command)
+        if shape is not None:
+            stats.shapes[shape] += 1
+        if stats.track_bytes:
+            stats.bytes_sent += len(bson.encode(event.command))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        stats = _query_stats.get()
+        if stats is None:
+            return
+        stats.duration_ms += event.duration_micros / 1000
+        if stats.track_bytes:
+            stats.bytes_received += len(bson.encode(event.reply))
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.duration_ms += event.duration_micros / 1000
+
+
+query_stats_listener = QueryStatsListener()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Return the command stats of the current request, if any"""
+    return _query_stats.get()
+
+
+def activate_query_stats(stats: QueryStats):
+    """Bind stats to the current context; returns a reset token"""
+    return _query_stats.set(stats)
+
+
+def deactivate_query_stats(token) -> None:
+    """Restore the stats that were active before activate_query_stats"""
+    _query_stats.reset(token)
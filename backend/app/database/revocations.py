@@ -0,0 +1,82 @@
+"""
+Background sync of the access token revocation filter
+
+In stateless token mode every worker polls the token_revocations collection
+and merges new entries into its in-process ``revocation_filter``. Polls are
+incremental (only entries newer than the last one seen, minus a small
+overlap for clock skew and late inserts), so each poll is a cheap indexed
+range query.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from app.config.settings import settings
+from app.models import TokenRevocation
+from app.utils.revocation import revocation_filter, to_timestamp
+
+
+# Re-read this much before the high-water mark on every poll
+_OVERLAP = timedelta(seconds=5)
+
+_high_water_mark: Optional[datetime] = None
+_task: Optional[asyncio.Task] = None
+
+
+async def refresh_revocation_filter() -> int:
+    """
+    Merge revocations recorded since the last poll into the filter
+
+    Returns:
+        Number of revocation entries read
+    """
+    global _high_water_mark
+
+    if _high_water_mark is None:
+        since = datetime.utcnow() - timedelta(minutes=settings.access_token_expire_minutes)
+    else:
+        since = _high_water_mark - _OVERLAP
+
+    revocations = await TokenRevocation.find(
+        TokenRevocation.revoked_at > since
+    ).sort(+TokenRevocation.revoked_at).to_list()
+
+    for revocation in revocations:
+        revocation_filter.revoke(revocation.user_id, to_timestamp(revocation.revoked_at))
+    if revocations:
+        _high_water_mark = max(_high_water_mark or since, revocations[-1].revoked_at)
+    elif _high_water_mark is None:
+        _high_water_mark = since
+
+    revocation_filter.mark_refreshed()
+    return len(revocations)
+
+
+async def _refresh_forever(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_revocation_filter()
+        except Exception as e:
+            # Keep the last good filter; get_current_user falls back to
+            # database checks once it is older than the allowed delay
+            print(f"⚠️ Token revocation refresh failed: {e}")
+
+
+async def start_revocation_sync() -> None:
+    """Load the filter and keep it refreshed in the background"""
+    global _task
+    await refresh_revocation_filter()
+    _task = asyncio.create_task(_refresh_forever(settings.auth_revocation_refresh_seconds))
+    print("✅ Stateless access tokens enabled (revocation filter loaded)")
+
+
+async def stop_revocation_sync() -> None:
+    """Cancel the background refresh task"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,152 @@
+"""
+Backfill patient typeahead keys and prescription search fields (idempotent).
+
+Instance writes keep ``Patient.search_keys`` and the prescription search
+fields (``patient_name``, ``search_keys``) current, but documents created
+before they existed (or written with ``insert_many`` / query-level updates)
+have none. Documents without keys are processed in ``_id`` order, one batch
+at a time: the names they need are loaded with ``$in`` queries and the
+fields are applied with one unordered ``bulk_write`` per batch.
+
+Runs in the background after startup, or from the command line:
+
+    python -m app.database.search_keys [--full]
+"""
+import argparse
+import asyncio
+from typing import Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.models import Patient, Prescription, User
+
+
+# Documents updated per bulk_write
+BATCH_SIZE = 1000
+
+
+async def backfill_patient_search_keys(full: bool = False) -> int:
+    """
+    Compute typeahead keys for patients that have none
+
+    Args:
+        full: Recompute the keys of every patient
+
+    Returns:
+        Number of patients updated
+    """
+    patients = Patient.get_pymongo_collection()
+    users = User.get_pymongo_collection()
+    match: dict = {} if full else {"search_keys": {"$exists": False}}
+    updated = 0
+    last_id: Optional[ObjectId] = None
+
+    while True:
+        query = dict(match)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        cursor = patients.find(query, {"user": 1, "phone": 1}).sort("_id", 1).limit(BATCH_SIZE)
+        batch = await cursor.to_list(length=BATCH_SIZE)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        user_ids = [row["user"].id for row in batch if row.get("user") is not None]
+        user_rows = users.find({"_id": {"$in": user_ids}}, {"full_name": 1, "email": 1})
+        by_id = {row["_id"]: row async for row in user_rows}
+
+        requests = []
+        for row in batch:
+            user = by_id.get(row["user"].id) if row.get("user") is not None else None
+            if user is None:
+                continue
+            fields = Patient.search_fields(user.get("full_name", ""), user.get("email", ""), row.get("phone"))
+            requests.append(UpdateOne({"_id": row["_id"]}, {"$set": fields}))
+        if requests:
+            result = await patients.bulk_write(requests, ordered=False)
+            updated += result.modified_count
+    return updated
+
+
+async def backfill_prescription_search_fields(full: bool = False) -> int:
+    """
+    Compute search fields for prescriptions that have none
+
+    Args:
+        full: Recompute the fields of every prescription
+
+    Returns:
+        Number of prescriptions updated
+    """
+    prescriptions = Prescription.get_pymongo_collection()
+    patients = Patient.get_pymongo_collection()
+    users = User.get_pymongo_collection()
+    match: dict = {} if full else {"search_keys": {"$exists": False}}
+    updated = 0
+    last_id: Optional[ObjectId] = None
+
+    while True:
+        query = dict(match)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        cursor = prescriptions.find(
+            query, {"patient": 1, "medication": 1, "generic_name": 1}
+        ).sort("_id", 1).limit(BATCH_SIZE)
+        batch = await cursor.to_list(length=BATCH_SIZE)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        patient_ids = list({row["patient"].id for row in batch if row.get("patient") is not None})
+        patient_users = {
+            row["_id"]: row["user"].id
+            async for row in patients.find({"_id": {"$in": patient_ids}}, {"user": 1})
+            if row.get("user") is not None
+        }
+        names = {
+            row["_id"]: row.get("full_name")
+            async for row in users.find({"_id": {"$in": list(set(patient_users.values()))}}, {"full_name": 1})
+        }
+
+        requests = []
+        for row in batch:
+            patient_id = row["patient"].id if row.get("patient") is not None else None
+            name = names.get(patient_users.get(patient_id))
+            fields = Prescription.search_fields(row.get("medication", ""), row.get("generic_name"), name)
+            requests.append(UpdateOne({"_id": row["_id"]}, {"$set": fields}))
+        result = await prescriptions.bulk_write(requests, ordered=False)
+        updated += result.modified_count
+    return updated
+
+
+async def run_search_key_backfill() -> None:
+    """Background wrapper for startup: never lets a failure reach the server"""
+    try:
+        updated = await backfill_patient_search_keys()
+        if updated:
+            print(f"✅ Search key backfill updated {updated} patients")
+        updated = await backfill_prescription_search_fields()
+        if updated:
+            print(f"✅ Search key backfill updated {updated} prescriptions")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Search key backfill failed: {e}")
+
+
+async def _main(full: bool) -> None:
+    from app.database.connection import init_beanie, close_database
+
+    await init_beanie()
+    try:
+        updated = await backfill_patient_search_keys(full=full)
+        print(f"✅ Search key backfill updated {updated} patients")
+        updated = await backfill_prescription_search_fields(full=full)
+        print(f"✅ Search key backfill updated {updated} prescriptions")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute patient typeahead keys and prescription search fields")
+    parser.add_argument("--full", action="store_true", help="recompute the keys of every patient and prescription")
+    asyncio.run(_main(parser.parse_args().full))
@@ -2,8 +2,11 @@
 Database Seeder
 Seeds test data into the database on server start/restart
 """
+import asyncio
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Type, TypeVar
+from beanie import Document, PydanticObjectId
+from beanie.operators import In
 from app.models import (
     User,
     Doctor,
@@ -18,30 +21,47 @@ from app.models import (
     Notification,
     Pharmacy,
 )
-from app.utils.auth import hash_password
+from app.utils.auth import hash_password_async
 from app.config.settings import settings
 
 
+DocT = TypeVar("DocT", bound=Document)
+
+# Accounts created by the seeder; their presence means seeding already ran
+SEED_MARKER_EMAILS = ["test-doctor-1@gmail.com", "test-patient-1@gmail.com"]
+
+
 async def check_if_seeded() -> bool:
     """
     Check if test data has already been seeded
     Returns True if test users exist, False otherwise
     """
-    # Check if any user with email starting with "test" exists
-    # Check for a specific test email we know will be created
-    test_user = await User.find_one(User.email == "test-doctor-1@gmail.com")
-    if test_user:
-        return True
-    
-    # Also check for a test patient email
-    test_patient = await User.find_one(User.email == "test-patient-1@gmail.com")
-    return test_patient is not None
+    test_user = await User.find_one(In(User.email, SEED_MARKER_EMAILS))
+    return test_user is not None
+
+
+async def insert_all(model: Type[DocT], documents: List[DocT]) -> List[DocT]:
+    """
+    Insert a collection's documents with a single insert_many
+
+    Ids are assigned client-side first so later collections can link to
+    the returned documents.
+    """
+    for doc in documents:
+        if doc.id is None:
+            doc.id = PydanticObjectId()
+    if documents:
+        await model.insert_many(documents)
+    return documents
 
 
 async def seed_database():
     """
     Seed the database with test data
     Only seeds if test data doesn't already exist
+    
+    Each collection is written with one insert_many; collections whose
+    dependencies already exist are written concurrently.
     """
     # Check if already seeded
     if await check_if_seeded():
@@ -50,58 +70,54 @@ async def seed_database():
 
     print("🌱 Starting database seeding...")
 
-    # Password hash for all test users
+    # Password hash for all test users (hashed while pharmacies are written)
     # SECURITY: Password is loaded from SEEDER_PASSWORD environment variable
-    password_hash = hash_password(settings.seeder_password)
-
-    # Create Pharmacies first (no dependencies)
-    pharmacies = await create_pharmacies()
+    pharmacies, password_hash = await asyncio.gather(
+        create_pharmacies(),
+        hash_password_async(settings.seeder_password),
+    )
     print(f"✅ Created {len(pharmacies)} pharmacies")
 
     # Create Users
     users = await create_users(password_hash)
     print(f"✅ Created {len(users)} users")
 
-    # Create Doctors
-    doctors = await create_doctors(users)
+    # Profiles and notifications only depend on users
+    doctors, patients, notifications = await asyncio.gather(
+        create_doctors(users),
+        create_patients(users),
+        create_notifications(users),
+    )
     print(f"✅ Created {len(doctors)} doctors")
-
-    # Create Patients
-    patients = await create_patients(users)
     print(f"✅ Created {len(patients)} patients")
+    print(f"✅ Created {len(notifications)} notifications")
 
-    # Create Prescriptions
-    prescriptions = await create_prescriptions(patients, doctors, pharmacies)
+    # Medical records only depend on profiles and pharmacies
+    (
+        prescriptions,
+        conditions,
+        allergies,
+        surgeries,
+        immunizations,
+        lab_results,
+        appointments,
+    ) = await asyncio.gather(
+        create_prescriptions(patients, doctors, pharmacies),
+        create_conditions(patients, doctors),
+        create_allergies(patients),
+        create_surgeries(patients),
+        create_immunizations(patients),
+        create_lab_results(patients, doctors),
+        create_appointments(patients, doctors),
+    )
     print(f"✅ Created {len(prescriptions)} prescriptions")
-
-    # Create Conditions
-    conditions = await create_conditions(patients, doctors)
     print(f"✅ Created {len(conditions)} conditions")
-
-    # Create Allergies
-    allergies = await create_allergies(patients)
     print(f"✅ Created {len(allergies)} allergies")
-
-    # Create Surgeries
-    surgeries = await create_surgeries(patients)
     print(f"✅ Created {len(surgeries)} surgeries")
-
-    # Create Immunizations
-    immunizations = await create_immunizations(patients)
     print(f"✅ Created {len(immunizations)} immunizations")
-
-    # Create Lab Results
-    lab_results = await create_lab_results(patients, doctors)
     print(f"✅ Created {len(lab_results)} lab results")
-
-    # Create Appointments
-    appointments = await create_appointments(patients, doctors)
     print(f"✅ Created {len(appointments)} appointments")
 
-    # Create Notifications
-    notifications = await create_notifications(users)
-    print(f"✅ Created {len(notifications)} notifications")
-
     print("✅ Database seeding completed successfully!")
 
 
@@ -128,13 +144,7 @@ async def create_pharmacies() -> List[Pharmacy]:
         },
     ]
 
-    pharmacies = []
-    for data in pharmacies_data:
-        pharmacy = Pharmacy(**data)
-        await pharmacy.insert()
-        pharmacies.append(pharmacy)
-
-    return pharmacies
+    return await insert_all(Pharmacy, [Pharmacy(**data) for data in pharmacies_data])
 
 
 async def create_users(password_hash: str) -> List[User]:
@@ -225,13 +235,7 @@ async def create_users(password_hash: str) -> List[User]:
         },
     ]
 
-    users = []
-    for data in users_data:
-        user = User(**data)
-        await user.insert()
-        users.append(user)
-
-    return users
+    return await insert_all(User, [User(**data) for data in users_data])
 
 
 async def create_doctors(users: List[User]) -> List[Doctor]:
@@ -304,13 +308,7 @@ async def create_doctors(users: List[User]) -> List[Doctor]:
         },
     ]
 
-    doctors = []
-    for data in doctors_data:
-        doctor = Doctor(**data)
-        await doctor.insert()
-        doctors.append(doctor)
-
-    return doctors
+    return await insert_all(Doctor, [Doctor(**data) for data in doctors_data])
 
 
 async def create_patients(users: List[User]) -> List[Patient]:
@@ -366,13 +364,11 @@ async def create_patients(users: List[User]) -> List[Patient]:
         },
     ]
 
-    patients = []
-    for data in patients_data:
-        patient = Patient(**data)
-        await patient.insert()
-        patients.append(patient)
-
-    return patients
+    patients = [Patient(**data) for data in patients_data]
+    for patient, data in zip(patients, patients_data):
+        # insert_many skips document hooks, so set the typeahead keys here
+        patient.set_search_keys(data["user"].full_name, data["user"].email)
+    return await insert_all(Patient, patients)
 
 
 async def create_prescriptions(
@@ -502,13 +498,11 @@ async def create_prescriptions(
         },
     ]
 
-    prescriptions = []
-    for data in prescriptions_data:
-        prescription = Prescription(**data)
-        await prescription.insert()
-        prescriptions.append(prescription)
-
-    return prescriptions
+    prescriptions = [Prescription(**data) for data in prescriptions_data]
+    for prescription, data in zip(prescriptions, prescriptions_data):
+        # insert_many skips document hooks, so set the search fields here
+        prescription.set_search_fields(data["patient"].user.full_name)
+    return await insert_all(Prescription, prescriptions)
 
 
 async def create_conditions(
@@ -568,13 +562,7 @@ async def create_conditions(
         },
     ]
 
-    conditions = []
-    for data in conditions_data:
-        condition = Condition(**data)
-        await condition.insert()
-        conditions.append(condition)
-
-    return conditions
+    return await insert_all(Condition, [Condition(**data) for data in conditions_data])
 
 
 async def create_allergies(patients: List[Patient]) -> List[Allergy]:
@@ -603,13 +591,7 @@ async def create_allergies(patients: List[Patient]) -> List[Allergy]:
         },
     ]
 
-    allergies = []
-    for data in allergies_data:
-        allergy = Allergy(**data)
-        await allergy.insert()
-        allergies.append(allergy)
-
-    return allergies
+    return await insert_all(Allergy, [Allergy(**data) for data in allergies_data])
 
 
 async def create_surgeries(patients: List[Patient]) -> List[Surgery]:
@@ -633,13 +615,7 @@ async def create_surgeries(patients: List[Patient]) -> List[Surgery]:
         },
     ]
 
-    surgeries = []
-    for data in surgeries_data:
-        surgery = Surgery(**data)
-        await surgery.insert()
-        surgeries.append(surgery)
-
-    return surgeries
+    return await insert_all(Surgery, [Surgery(**data) for data in surgeries_data])
 
 
 async def create_immunizations(patients: List[Patient]) -> List[Immunization]:
@@ -668,13 +644,7 @@ async def create_immunizations(patients: List[Patient]) -> List[Immunization]:
         },
     ]
 
-    immunizations = []
-    for data in immunizations_data:
-        immunization = Immunization(**data)
-        await immunization.insert()
-        immunizations.append(immunization)
-
-    return immunizations
+    return await insert_all(Immunization, [Immunization(**data) for data in immunizations_data])
 
 
 async def create_lab_results(
@@ -716,13 +686,7 @@ async def create_lab_results(
         },
     ]
 
-    lab_results = []
-    for data in lab_results_data:
-        lab_result = LabResult(**data)
-        await lab_result.insert()
-        lab_results.append(lab_result)
-
-    return lab_results
+    return await insert_all(LabResult, [LabResult(**data) for data in lab_results_data])
 
 
 async def create_appointments(
@@ -750,13 +714,7 @@ async def create_appointments(
         },
     ]
 
-    appointments = []
-    for data in appointments_data:
-        appointment = Appointment(**data)
-        await appointment.insert()
-        appointments.append(appointment)
-
-    return appointments
+    return await insert_all(Appointment, [Appointment(**data) for data in appointments_data])
 
 
 async def create_notifications(users: List[User]) -> List[Notification]:
@@ -836,11 +794,5 @@ async def create_notifications(users: List[User]) -> List[Notification]:
         },
     ]
 
-    notifications = []
-    for data in notifications_data:
-        notification = Notification(**data)
-        await notification.insert()
-        notifications.append(notification)
-
-    return notifications
+    return await insert_all(Notification, [Notification(**data) for data in notifications_data])
 
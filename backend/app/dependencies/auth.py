@@ -4,41 +4,125 @@ Authentication dependencies for protected routes
 This module provides FastAPI dependencies for:
 - Token verification and user authentication
 - Role-based access control (doctor, patient, admin)
+- Role profile references taken from the token (no profile lookup)
 - Shared access for routes accessible by multiple roles
 """
-from typing import Optional, List
+from typing import Generic, Optional, List, Type, TypeVar
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.models import User
+from beanie import Document, Link, PydanticObjectId
+from bson import DBRef
+from app.models import User, Doctor, Patient
+from app.database.identity_map import current_identity_map, find_one_cached, get_document, remember
 from app.utils.auth import decode_access_token
+from app.utils.cache import user_cache
+from app.utils.revocation import revocation_filter
+from app.config.settings import settings
 
 
 security = HTTPBearer()
 
+ProfileT = TypeVar("ProfileT", bound=Document)
 
-async def get_current_user(
+# Claims a token must carry for get_current_user to skip the user lookup
+_STATELESS_CLAIMS = ("sub", "email", "username", "full_name", "role")
+
+
+async def load_user(user_id: str) -> Optional[User]:
+    """
+    Load a user by id through the request identity map and the user cache
+    
+    Each caller gets its own copy of the cached snapshot, so handlers can
+    mutate and save it without touching the shared entry; saving the user
+    invalidates the entry (see ``User.invalidate_cached_user``).
+    
+    Args:
+        user_id: User id from the token subject
+        
+    Returns:
+        User or None if the user does not exist
+    """
+    try:
+        user_id = PydanticObjectId(user_id)
+    except Exception:
+        return None
+    
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        user = identity_map.get(User, user_id)
+        if user is not None:
+            return user
+    
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        user = cached.model_copy(deep=True)
+    else:
+        user = await User.get(user_id)
+        if user is not None:
+            user_cache.set(user_id, user.model_copy(deep=True))
+    remember(user)
+    return user
+
+
+def _user_from_claims(payload: dict) -> Optional[User]:
+    """
+    Build the current user from token claims (stateless token mode)
+    
+    Returns None when the mode is off, the revocation filter is too stale to
+    trust, or the token predates the claims it needs; the caller then loads
+    the user from the database as usual. The result only carries the claim
+    fields; saving it raises (see ``User.refuse_claims_user_write`` and
+    ``get_current_user_document``).
+    """
+    if not settings.auth_stateless_tokens:
+        return None
+    if not revocation_filter.is_fresh(3 * settings.auth_revocation_refresh_seconds):
+        return None
+    if not all(payload.get(claim) for claim in _STATELESS_CLAIMS):
+        return None
+    
+    if revocation_filter.is_revoked(payload["sub"], payload.get("iat")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    try:
+        user_id = PydanticObjectId(payload["sub"])
+    except Exception:
+        return None
+    user = User.model_construct(
+        id=user_id,
+        email=payload["email"],
+        username=payload["username"],
+        full_name=payload["full_name"],
+        role=payload["role"],
+        is_active=True,
+    )
+    user._from_token_claims = True
+    return user
+
+
+async def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
+) -> dict:
     """
-    Dependency to get the current authenticated user
+    Dependency returning the verified access token claims
     
-    Verifies the JWT access token, extracts user ID, and fetches the user
-    from the database. This ensures the user still exists and is active.
+    FastAPI caches it per request, so the token is decoded once even when
+    several dependencies need its claims.
     
     Args:
         credentials: HTTP Bearer token from Authorization header
         
     Returns:
-        User: The authenticated user object
+        dict: Decoded token payload
         
     Raises:
-        HTTPException: 
-            - 401 if token is invalid, expired, or user not found
-            - 403 if user account is inactive
+        HTTPException: 401 if token is invalid or expired
     """
-    # Decode access token
-    token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = decode_access_token(credentials.credentials)
     
     if not payload:
         raise HTTPException(
@@ -47,6 +131,29 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    return payload
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload)
+) -> User:
+    """
+    Dependency to get the current authenticated user
+    
+    Verifies the JWT access token, extracts user ID, and fetches the user
+    from the database. This ensures the user still exists and is active.
+    
+    Args:
+        payload: Verified access token claims
+        
+    Returns:
+        User: The authenticated user object
+        
+    Raises:
+        HTTPException: 
+            - 401 if token is invalid, expired, or user not found
+            - 403 if user account is inactive
+    """
     # Get user ID from token
     user_id = payload.get("sub")
     if not user_id:
@@ -56,8 +163,13 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Fetch user from database (ensures user still exists and role is current)
-    user = await User.get(user_id)
+    # Stateless mode: trust the signed claims unless the user was revoked
+    user = _user_from_claims(payload)
+    if user is not None:
+        return user
+    
+    # Load user (cached briefly; ensures user still exists and role is current)
+    user = await load_user(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -75,6 +187,46 @@ async def get_current_user(
     return user
 
 
+async def get_current_user_document(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """
+    Dependency to get the stored User document of the authenticated user
+    
+    Identical to get_current_user unless stateless token mode is on, where
+    get_current_user only carries token claims. Use this for handlers that
+    save the user or return their profile: claims such as ``full_name`` keep
+    their value until the token is refreshed.
+    
+    Args:
+        current_user: The authenticated user from get_current_user
+        
+    Returns:
+        User: The full user document
+        
+    Raises:
+        HTTPException: 
+            - 401 if the user no longer exists
+            - 403 if user account is inactive
+    """
+    if not current_user.from_token_claims:
+        return current_user
+    
+    user = await load_user(str(current_user.id))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive",
+        )
+    return user
+
+
 async def get_current_doctor(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -155,7 +307,7 @@ async def get_current_admin(
     return current_user
 
 
-def require_roles(allowed_roles: List[str]):
+def require_roles(allowed_roles: List[str], load_document: bool = False):
     """
     Factory function to create a dependency that allows multiple roles
     
@@ -164,6 +316,8 @@ def require_roles(allowed_roles: List[str]):
     
     Args:
         allowed_roles: List of role names that can access the route
+        load_document: Return the stored User document (see
+            get_current_user_document) instead of the token user
         
     Returns:
         Dependency function that checks if user role is in allowed_roles
@@ -175,8 +329,10 @@ def require_roles(allowed_roles: List[str]):
         ):
             ...
     """
+    user_dependency = get_current_user_document if load_document else get_current_user
+    
     async def role_checker(
-        current_user: User = Depends(get_current_user)
+        current_user: User = Depends(user_dependency)
     ) -> User:
         if current_user.role not in allowed_roles:
             raise HTTPException(
@@ -187,3 +343,108 @@ def require_roles(allowed_roles: List[str]):
     
     return role_checker
 
+
+
+class ProfileRef(Generic[ProfileT]):
+    """
+    Reference to the current user's Doctor or Patient profile
+    
+    ``id`` comes straight from the access token's ``profile_id`` claim, so
+    handlers that only filter by profile id never query the profile.
+    ``fetch()`` loads the full document on first use (through the request
+    identity map); ``as_link()`` references it from new documents without
+    loading it.
+    """
+    
+    def __init__(
+        self,
+        model: Type[ProfileT],
+        profile_id: PydanticObjectId,
+        document: Optional[ProfileT] = None,
+    ) -> None:
+        self.model = model
+        self.id = profile_id
+        self._document = document
+    
+    def as_link(self) -> Link:
+        """Return a Link to the profile, for assigning to Link fields"""
+        return Link(DBRef(self.model.get_collection_name(), self.id), self.model)
+    
+    async def fetch(self) -> ProfileT:
+        """
+        Load the profile document
+        
+        Returns:
+            The Doctor or Patient document
+            
+        Raises:
+            HTTPException: 404 if the profile no longer exists
+        """
+        if self._document is None:
+            self._document = await get_document(self.model, self.id)
+            if self._document is None:
+                raise _profile_not_found(self.model)
+        return self._document
+
+
+def _profile_not_found(model: Type[Document]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"{model.__name__} profile not found"
+    )
+
+
+async def _resolve_profile(model: Type[ProfileT], user: User, payload: dict) -> ProfileRef[ProfileT]:
+    """Build a ProfileRef from the token claim, looking the profile up for older tokens"""
+    profile_id = payload.get("profile_id")
+    if profile_id:
+        try:
+            return ProfileRef(model, PydanticObjectId(profile_id))
+        except Exception:
+            pass
+    
+    # Tokens issued before profile_id was added: fall back to a lookup
+    profile = await find_one_cached(model, ("user", user.id), model.user.id == user.id)
+    if not profile:
+        raise _profile_not_found(model)
+    return ProfileRef(model, profile.id, profile)
+
+
+async def get_current_doctor_profile(
+    current_user: User = Depends(get_current_doctor),
+    payload: dict = Depends(get_token_payload),
+) -> ProfileRef[Doctor]:
+    """
+    Dependency returning a reference to the current doctor's profile
+    
+    Args:
+        current_user: The authenticated doctor user
+        payload: Verified access token claims
+        
+    Returns:
+        ProfileRef[Doctor]: Profile id plus lazy loader for the Doctor document
+        
+    Raises:
+        HTTPException: 403 if user is not a doctor, 404 if the profile is missing
+    """
+    return await _resolve_profile(Doctor, current_user, payload)
+
+
+async def get_current_patient_profile(
+    current_user: User = Depends(get_current_patient),
+    payload: dict = Depends(get_token_payload),
+) -> ProfileRef[Patient]:
+    """
+    Dependency returning a reference to the current patient's profile
+    
+    Args:
+        current_user: The authenticated patient user
+        payload: Verified access token claims
+        
+    Returns:
+        ProfileRef[Patient]: Profile id plus lazy loader for the Patient document
+        
+    Raises:
+        HTTPException: 403 if user is not a patient, 404 if the profile is missing
+    """
+    return await _resolve_profile(Patient, current_user, payload)
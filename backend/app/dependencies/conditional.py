@@ -0,0 +1,130 @@
+"""
+Conditional GET dependencies
+
+``ConditionalGet`` gives a GET endpoint a strong ``ETag`` and answers a
+matching ``If-None-Match`` with ``304 Not Modified`` before the handler
+builds its response. Handlers call ``check()`` with the scopes their
+response shows (see app.models.data_version) once the request is known to
+be allowed: detail routes first run their 404 lookup and access checks, so
+a 304 never stands in for a 404 or 403. The ETag digests the URL, the
+caller and the current versions of those scopes, loaded with one ``$in``
+query. Endpoints served from memory pass a fingerprint of that data to
+``check_fingerprint()`` instead.
+
+Versions are read before the response is computed, so a concurrent write
+can only make an ETag older than its body (the next poll refetches), never
+newer. Tagged responses carry ``Cache-Control: private, no-cache``: browsers
+keep them and revalidate on every request, transparently to the SPA.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Set
+from fastapi import Depends, HTTPException, Request, Response, status
+from app.config.settings import settings
+from app.models import DataVersion
+from app.models.data_version import scope_key
+from .auth import get_token_payload
+
+
+ETAG_HEADER = "ETag"
+CACHE_CONTROL = "private, no-cache"
+
+
+def _if_none_match(request: Request) -> Set[str]:
+    """Entity tags listed in If-None-Match (weak tags compared as strong)"""
+    header = request.headers.get("if-none-match", "")
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+class ConditionalGet:
+    """
+    Dependency answering conditional GET requests
+
+    Args:
+        request: Request carrying ``If-None-Match``
+        response: Response the ``ETag`` header is added to
+        payload: Verified access token claims of the caller
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        payload: dict = Depends(get_token_payload),
+    ) -> None:
+        self.request = request
+        self.response = response
+        self.payload = payload
+
+    async def check(
+        self,
+        *scopes: Any,
+        settle_seconds: Optional[float] = None,
+        period: Optional[int] = None,
+    ) -> None:
+        """
+        Send 304 if the client's copy is current, otherwise tag the response
+
+        Args:
+            scopes: Scopes whose data the response shows (ids, Links or
+                documents)
+            settle_seconds: Send no ETag while a scope was written this
+                recently, since other workers may still answer from caches
+                filled before the write (default: the user cache TTL)
+            period: Seconds after which the response changes without any
+                write (relative times such as "2 days ago"); the ETag
+                expires with each period
+
+        Raises:
+            HTTPException: 304 Not Modified
+        """
+        if not settings.conditional_get_enabled:
+            return
+        keys = sorted({scope_key(scope) for scope in scopes} - {None})
+        versions = await DataVersion.current(keys)
+
+        if settle_seconds is None:
+            settle_seconds = settings.user_cache_ttl_seconds
+        settled_before = datetime.utcnow() - timedelta(seconds=settle_seconds)
+        if any(row["updated_at"] > settled_before for row in versions.values()):
+            return
+
+        parts = [f"{key}={versions[key]['version'] if key in versions else 0}" for key in keys]
+        if period:
+            parts.append(f"t={int(time.time() // period)}")
+        self._match(parts)
+
+    def check_fingerprint(self, fingerprint: str) -> None:
+        """
+        Like check(), for a response built from in-memory data
+
+        Args:
+            fingerprint: Digest of the data, equal on every worker holding it
+
+        Raises:
+            HTTPException: 304 Not Modified
+        """
+        if settings.conditional_get_enabled:
+            self._match([fingerprint])
+
+    def _caller(self) -> List[str]:
+        caller = [str(self.payload.get("sub"))]
+        if settings.auth_stateless_tokens:
+            # The user may come from the token's claims, which change on refresh
+            caller.append(str(self.payload.get("iat")))
+        return caller
+
+    def _match(self, parts: List[str]) -> None:
+        digest = hashlib.blake2b(digest_size=16)
+        url = self.request.url
+        for part in [settings.app_version, url.path, url.query, *self._caller(), *parts]:
+            digest.update(part.encode())
+            digest.update(b"\0")
+        etag = f'"{digest.hexdigest()}"'
+        headers = {ETAG_HEADER: etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
+
+        tags = _if_none_match(self.request)
+        if etag in tags:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        self.response.headers.update(headers)
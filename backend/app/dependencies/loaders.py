@@ -0,0 +1,22 @@
+"""
+Data loading dependencies
+
+Provides a per-request ``LinkLoader`` so handlers can batch link resolution.
+FastAPI caches dependencies per request, so every ``Depends(get_link_loader)``
+within one request shares the same loader and its cache.
+"""
+from app.database.identity_map import current_identity_map
+from app.database.loaders import LinkLoader
+
+
+async def get_link_loader() -> LinkLoader:
+    """
+    Dependency returning a request-scoped LinkLoader
+
+    The loader shares the request's identity map, so documents already
+    loaded by other dependencies (e.g. the current user) are not re-fetched.
+
+    Returns:
+        LinkLoader: Loader for the current request
+    """
+    return LinkLoader(current_identity_map())
@@ -0,0 +1,131 @@
+"""
+Pagination dependencies
+
+``PageParams`` adds ``limit`` and ``cursor`` query parameters to a list
+endpoint. Handlers fetch ``fetch_limit`` rows (one more than the page) after
+``after(sort)``, then pass them through ``page()``, which trims the extra row
+and sends the cursor of the next page in the ``X-Next-Cursor`` header
+(absent on the last page); ``find()`` does all of this for a Beanie query.
+Response bodies stay plain JSON arrays.
+"""
+from typing import Any, Callable, List, Optional, Sequence, TypeVar
+from beanie import Document
+from beanie.odm.queries.find import FindMany
+from fastapi import HTTPException, Query, Response, status
+from app.config.settings import settings
+from app.database.pagination import (
+    InvalidCursor,
+    SortSpec,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+RowT = TypeVar("RowT")
+DocT = TypeVar("DocT", bound=Document)
+
+
+class PageParams:
+    """
+    Dependency holding the requested page of a keyset-paginated list
+
+    Args:
+        response: Response the next cursor header is added to
+        limit: Maximum rows to return
+        cursor: ``X-Next-Cursor`` value from the previous page
+    """
+
+    def __init__(
+        self,
+        response: Response,
+        limit: int = Query(
+            settings.page_size_default,
+            ge=1,
+            le=settings.page_size_max,
+            description="Maximum number of items to return",
+        ),
+        cursor: Optional[str] = Query(
+            None,
+            description="X-Next-Cursor header of the previous page",
+        ),
+    ) -> None:
+        self.response = response
+        self.limit = limit
+        self.cursor = cursor
+
+    @property
+    def fetch_limit(self) -> int:
+        """Rows to fetch: one extra tells whether another page exists"""
+        return self.limit + 1
+
+    def after_values(self, sort: SortSpec) -> Optional[List[Any]]:
+        """
+        Sort values of the last row of the previous page
+
+        Args:
+            sort: Sort of the list, ending with ``_id``
+
+        Returns:
+            One value per sort field, or None on the first page
+
+        Raises:
+            HTTPException: If the cursor is invalid
+        """
+        if self.cursor is None:
+            return None
+        try:
+            return decode_cursor(self.cursor, sort)
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+    def after(self, sort: SortSpec) -> Optional[dict]:
+        """
+        Query selecting rows after the cursor
+
+        Returns:
+            A filter to combine with the list query, or None on the first page
+        """
+        values = self.after_values(sort)
+        return keyset_filter(sort, values) if values is not None else None
+
+    def page(self, rows: List[RowT], sort_values: Callable[[RowT], Sequence[Any]]) -> List[RowT]:
+        """
+        Trim rows fetched with fetch_limit to the page and set the next cursor
+
+        Args:
+            rows: Rows in list order, at most fetch_limit of them
+            sort_values: Returns a row's values for the sort fields
+
+        Returns:
+            At most limit rows
+        """
+        if len(rows) <= self.limit:
+            return rows
+        rows = rows[:self.limit]
+        self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort_values(rows[-1]))
+        return rows
+
+    async def find(self, query: FindMany[DocT], sort: SortSpec) -> List[DocT]:
+        """
+        Fetch this page of a Beanie query
+
+        Args:
+            query: Query with the list's filters applied
+            sort: Sort of the list, ending with ``_id``
+
+        Returns:
+            At most limit documents in sort order
+        """
+        after = self.after(sort)
+        if after is not None:
+            query = query.find(after)
+        docs = await query.sort(list(sort)).limit(self.fetch_limit).to_list()
+        return self.page(docs, lambda doc: [
+            doc.id if field == "_id" else getattr(doc, field) for field, _ in sort
+        ])
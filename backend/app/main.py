@@ -1,13 +1,24 @@
 """
 FastAPI Application Entry Point
 """
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from app.config.settings import settings
 from app.routes import home, auth, doctors, patients, shared
 from app.database import init_beanie, close_database, seed_database
-from app.database.care_sync import sync_care_relationships_from_prescriptions
+from app.database.care_sync import run_care_sync
+from app.database.search_keys import run_search_key_backfill
+from app.database.doctor_directory import start_doctor_directory_sync, stop_doctor_directory_sync
+from app.database.revocations import start_revocation_sync, stop_revocation_sync
+from app.middleware.identity_map import IdentityMapMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.dependencies.pagination import NEXT_CURSOR_HEADER
+from app.dependencies.conditional import ETAG_HEADER
+from app.utils.auth import PasswordHashingBusy, shutdown_password_hasher
 
 
 @asynccontextmanager
@@ -19,15 +30,39 @@ async def lifespan(app: FastAPI):
     # Initialize Beanie database connection
     await init_beanie()
     
-    # Seed database with test data (if not already seeded)
-    await seed_database()
-    await sync_care_relationships_from_prescriptions()
+    # Seed database with test data (if enabled and not already seeded)
+    if settings.seed_on_startup:
+        await seed_database()
+    
+    # Serve the doctor directory from memory
+    await start_doctor_directory_sync()
+    
+    # Backfill care relationships without delaying startup
+    care_sync_task = None
+    if settings.care_sync_on_startup:
+        care_sync_task = asyncio.create_task(run_care_sync())
+    
+    # Compute typeahead keys for patients created before they existed
+    search_key_task = None
+    if settings.search_key_backfill_on_startup:
+        search_key_task = asyncio.create_task(run_search_key_backfill())
+    
+    # Keep the access token revocation filter current (stateless token mode)
+    if settings.auth_stateless_tokens:
+        await start_revocation_sync()
 
     yield
     
     # Shutdown
     print(f"{settings.app_name} is shutting down...")
+    if care_sync_task is not None and not care_sync_task.done():
+        care_sync_task.cancel()
+    if search_key_task is not None and not search_key_task.done():
+        search_key_task.cancel()
+    await stop_revocation_sync()
+    await stop_doctor_directory_sync()
     await close_database()
+    shutdown_password_hasher()
 
 
 # Initialize FastAPI application
@@ -39,6 +74,26 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """Shed load when the bcrypt queue is full instead of queueing forever"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+# Per-request identity map for Beanie documents (hit/miss header in debug)
+app.add_middleware(IdentityMapMiddleware, expose_stats=settings.debug)
+
+# Per-request MongoDB command stats and N+1 warnings (headers in debug)
+if settings.db_query_stats_enabled:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        n_plus_one_threshold=settings.db_n_plus_one_threshold,
+        expose_stats=settings.debug,
+    )
+
 # Configure CORS - important for httpOnly cookies to work
 app.add_middleware(
     CORSMiddleware,
@@ -46,8 +101,14 @@ app.add_middleware(
     allow_credentials=True,  # Critical for cookies
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],  # Next page cursor, conditional GETs
 )
 
+# Client address from X-Forwarded-For behind trusted reverse proxies (used by
+# rate limits and refresh token records)
+if settings.trusted_proxies:
+    app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.trusted_proxies)
+
 # Include routers
 app.include_router(home.router)
 app.include_router(auth.router, prefix=settings.api_v1_prefix)
@@ -0,0 +1,51 @@
+"""
+Identity map middleware
+
+Opens a fresh IdentityMap for every HTTP request so Beanie lookups made by
+dependencies and handlers share one document cache.
+"""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.database.identity_map import (
+    IdentityMap,
+    activate_identity_map,
+    deactivate_identity_map,
+)
+
+
+class IdentityMapMiddleware:
+    """
+    Pure ASGI middleware binding a per-request identity map
+
+    Args:
+        app: Wrapped ASGI application
+        expose_stats: Add an ``X-Identity-Map`` header with hit/miss
+            counters to every response (debug only)
+    """
+
+    def __init__(self, app: ASGIApp, expose_stats: bool = False) -> None:
+        self.app = app
+        self.expose_stats = expose_stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        identity_map = IdentityMap()
+        token = activate_identity_map(identity_map)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stats = identity_map.stats()
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "X-Identity-Map",
+                    f"hits={stats['hits']}; misses={stats['misses']}; size={stats['size']}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats if self.expose_stats else send)
+        finally:
+            deactivate_identity_map(token)
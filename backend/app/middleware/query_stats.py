@@ -0,0 +1,59 @@
+"""
+Query stats middleware
+
+Collects the MongoDB commands each HTTP request issues (see
+``app.database.query_stats``), warns about repeated query shapes (N+1) and,
+in debug, reports the totals in response headers.
+"""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.database.query_stats import (
+    QueryStats,
+    activate_query_stats,
+    deactivate_query_stats,
+)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware binding per-request MongoDB command stats
+
+    Args:
+        app: Wrapped ASGI application
+        n_plus_one_threshold: Log a warning when one query shape runs at
+            least this many times in a request (0 disables the warning)
+        expose_stats: Add ``Server-Timing``, ``X-DB-Queries`` and
+            ``X-DB-Bytes`` headers to every response (debug only)
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 0, expose_stats: bool = False) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.expose_stats = expose_stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(track_bytes=self.expose_stats)
+        token = activate_query_stats(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration_ms:.1f};desc="{stats.commands} queries"',
+                )
+                headers.append("X-DB-Queries", str(stats.commands))
+                headers.append("X-DB-Bytes", f"sent={stats.bytes_sent}; received={stats.bytes_received}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats if self.expose_stats else send)
+        finally:
+            deactivate_query_stats(token)
+            if self.n_plus_one_threshold:
+                for shape, count in stats.repeated_shapes(self.n_plus_one_threshold):
+                    print(f"⚠️ N+1 query: {scope['method']} {scope['path']} ran {count}x {shape}")
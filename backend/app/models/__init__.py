@@ -16,6 +16,9 @@ from .pharmacy import Pharmacy
 from .refresh_token import RefreshToken
 from .care_relationship import CareRelationship
 from .password_reset_token import PasswordResetToken
+from .token_revocation import TokenRevocation
+from .sync_checkpoint import SyncCheckpoint
+from .data_version import DataVersion
 
 __all__ = [
     "User",
@@ -33,5 +36,8 @@ __all__ = [
     "RefreshToken",
     "CareRelationship",
     "PasswordResetToken",
+    "TokenRevocation",
+    "SyncCheckpoint",
+    "DataVersion",
 ]
 
@@ -3,8 +3,9 @@ Allergy Model
 """
 from datetime import datetime
 from typing import Optional
-from beanie import Document, Link
+from beanie import Delete, Document, Insert, Link, Replace, Update, after_event
 from pydantic import Field
+from .data_version import DataVersion
 from .patient import Patient
 
 
@@ -35,8 +36,15 @@ class Allergy(Document):
             "allergen",
             "severity",
             "diagnosed_date",
+            # Allergies per patient (link id lookups and keyset pages)
+            ("patient.$id", "diagnosed_date", "_id"),
         ]
         
+    @after_event(Insert, Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of pages showing the patient's records"""
+        await DataVersion.bump_patient(self.patient)
+
     def __repr__(self) -> str:
         return f"<Allergy {self.allergen} for {self.patient}>"
 
@@ -3,8 +3,9 @@ Appointment Model
 """
 from datetime import datetime
 from typing import Optional
-from beanie import Document, Link
+from beanie import Delete, Document, Insert, Link, Replace, Update, after_event
 from pydantic import Field
+from .data_version import DataVersion
 from .patient import Patient
 from .doctor import Doctor
 
@@ -45,6 +46,11 @@ class Appointment(Document):
             "status",
         ]
         
+    @after_event(Insert, Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of pages showing the patient's records"""
+        await DataVersion.bump_patient(self.patient)
+
     def __repr__(self) -> str:
         return f"<Appointment {self.date} - {self.patient} with {self.doctor}>"
 
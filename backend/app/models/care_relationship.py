@@ -2,12 +2,20 @@
 Doctor–patient care relationship (which patients a doctor may manage).
 """
 from datetime import datetime
+from typing import Optional, Tuple
 from beanie import Document, Link
+from bson import DBRef, ObjectId
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from .data_version import DataVersion
 from .doctor import Doctor
 from .patient import Patient
 
 
+UNIQUE_PAIR_INDEX = "doctor_patient_unique"
+
+
 class CareRelationship(Document):
     """Links a doctor to a patient they are allowed to treat (prescribe for)."""
 
@@ -17,4 +25,51 @@ class CareRelationship(Document):
 
     class Settings:
         name = "care_relationships"
-        indexes = ["doctor", "patient"]
+        indexes = [
+            # One relationship per pair; also serves lookups by doctor
+            IndexModel(
+                [("doctor.$id", ASCENDING), ("patient.$id", ASCENDING)],
+                unique=True,
+                name=UNIQUE_PAIR_INDEX,
+            ),
+            # Doctors of a patient (ETag expiry when the patient changes)
+            IndexModel([("patient.$id", ASCENDING)]),
+        ]
+
+    @staticmethod
+    def _pair_upsert(doctor_id: ObjectId, patient_id: ObjectId, now: Optional[datetime]) -> Tuple[dict, dict]:
+        """Filter and update creating the (doctor, patient) relationship if missing"""
+        return (
+            {"doctor.$id": doctor_id, "patient.$id": patient_id},
+            {"$setOnInsert": {
+                "doctor": DBRef(Doctor.get_collection_name(), doctor_id),
+                "patient": DBRef(Patient.get_collection_name(), patient_id),
+                "created_at": now or datetime.utcnow(),
+            }},
+        )
+
+    @classmethod
+    def upsert_pair(cls, doctor_id: ObjectId, patient_id: ObjectId, now: Optional[datetime] = None) -> UpdateOne:
+        """Bulk-write upsert operation for the (doctor, patient) pair"""
+        return UpdateOne(*cls._pair_upsert(doctor_id, patient_id, now), upsert=True)
+
+    @classmethod
+    async def ensure(cls, doctor_id: ObjectId, patient_id: ObjectId) -> bool:
+        """
+        Create the relationship unless it exists, in one round trip
+
+        Returns:
+            True if a relationship was created
+        """
+        try:
+            result = await cls.get_pymongo_collection().update_one(
+                *cls._pair_upsert(doctor_id, patient_id, None), upsert=True
+            )
+        except DuplicateKeyError:
+            # A concurrent upsert of the same pair won the race
+            return False
+        if result.upserted_id is None:
+            return False
+        # The doctor's roster changed
+        await DataVersion.bump(doctor_id)
+        return True
@@ -3,8 +3,9 @@ Medical Condition Model
 """
 from datetime import datetime
 from typing import Optional
-from beanie import Document, Link
+from beanie import Delete, Document, Insert, Link, Replace, Update, after_event
 from pydantic import Field
+from .data_version import DataVersion
 from .patient import Patient
 from .doctor import Doctor
 
@@ -41,8 +42,15 @@ class Condition(Document):
             "status",
             "diagnosed_date",
             "name",
+            ("patient.$id", "status"),  # Active conditions per patient
+            ("patient.$id", "diagnosed_date", "_id"),  # Keyset pages per patient
         ]
         
+    @after_event(Insert, Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of pages showing the patient's records"""
+        await DataVersion.bump_patient(self.patient)
+
     def __repr__(self) -> str:
         return f"<Condition {self.name} for {self.patient}>"
 
@@ -0,0 +1,115 @@
+"""
+Data Version Model
+Change markers behind the ETags of conditional GET requests
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from beanie import Document, Link, PydanticObjectId
+from bson import ObjectId
+from pydantic import Field
+from pymongo import UpdateOne
+
+
+def scope_key(scope: Any) -> Optional[str]:
+    """Key of a scope given as a string, an id, a Link or a document"""
+    if scope is None:
+        return None
+    if isinstance(scope, Link):
+        scope = scope.ref.id
+    elif isinstance(scope, Document):
+        scope = scope.id
+    return str(scope)
+
+
+class DataVersion(Document):
+    """
+    Data Version Document Model
+
+    One document per scope: a user or a Doctor / Patient profile (keyed by
+    id). ``version`` is replaced on every write to data shown in that
+    scope's responses, so an ETag can be derived from the
+    versions of a response's scopes with one query (see
+    app.dependencies.conditional). Missing documents mean "never written".
+    """
+
+    id: str
+    version: PydanticObjectId = Field(default_factory=PydanticObjectId)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        """Beanie Document Settings"""
+        name = "data_versions"
+
+    @classmethod
+    async def bump(cls, *scopes: Any) -> None:
+        """
+        Give each scope a new version
+
+        Args:
+            scopes: Scope keys, ids, Links or documents (None is ignored)
+        """
+        keys = sorted({key for key in map(scope_key, scopes) if key is not None})
+        if not keys:
+            return
+        now = datetime.utcnow()
+        await cls.get_pymongo_collection().bulk_write(
+            [
+                UpdateOne({"_id": key}, {"$set": {"version": ObjectId(), "updated_at": now}}, upsert=True)
+                for key in keys
+            ],
+            ordered=False,
+        )
+
+    @classmethod
+    async def bump_patient(cls, patient: Any, *scopes: Any) -> None:
+        """
+        Bump a patient's scope and those of the doctors caring for them
+
+        Doctors see their patients' details on their own pages (roster,
+        prescription history), so those pages expire too.
+
+        Args:
+            patient: Patient id, Link or document
+            scopes: Further scopes to bump in the same write
+        """
+        await cls._bump_related(patient, "patient", "doctor", scopes)
+
+    @classmethod
+    async def bump_doctor(cls, doctor: Any, *scopes: Any) -> None:
+        """
+        Bump a doctor's scope and those of the patients in their care
+
+        Patients see their doctors' names and details on their own pages
+        (prescriptions, dashboard), as do other doctors of those patients.
+
+        Args:
+            doctor: Doctor id, Link or document
+            scopes: Further scopes to bump in the same write
+        """
+        await cls._bump_related(doctor, "doctor", "patient", scopes)
+
+    @classmethod
+    async def _bump_related(cls, scope: Any, field: str, related: str, scopes: Iterable[Any]) -> None:
+        """Bump scope, the other side of its care relationships and scopes in one write"""
+        from .care_relationship import CareRelationship
+
+        key = scope_key(scope)
+        if key is None:
+            return
+        rows = CareRelationship.get_pymongo_collection().find(
+            {f"{field}.$id": ObjectId(key)}, {related: 1, "_id": 0}
+        )
+        related_ids = [row[related].id async for row in rows]
+        await cls.bump(key, *related_ids, *scopes)
+
+    @classmethod
+    async def current(cls, scopes: Iterable[Any]) -> Dict[str, dict]:
+        """
+        Load the versions of some scopes
+
+        Returns:
+            Scope key -> ``{"version", "updated_at"}`` for scopes written so far
+        """
+        keys = list({key for key in map(scope_key, scopes) if key is not None})
+        rows = cls.get_pymongo_collection().find({"_id": {"$in": keys}})
+        return {row["_id"]: row async for row in rows}
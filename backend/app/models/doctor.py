@@ -3,8 +3,10 @@ Doctor Model
 """
 from datetime import datetime
 from typing import Optional, List
-from beanie import Document, Link
+from beanie import Delete, Document, Insert, Link, Replace, Update, after_event
 from pydantic import Field
+from app.utils.doctor_index import DirectoryEntry, doctor_directory
+from .data_version import DataVersion
 from .user import User
 
 
@@ -48,12 +50,70 @@ class Doctor(Document):
         name = "doctors"  # Collection name in MongoDB
         indexes = [
             "user",
+            "user.$id",  # profile lookup by user (Doctor.user.id == ...)
             "specialty",
             "hospital",
             "accepting_new_patients",
             "rating",
+            ("accepting_new_patients", "_id"),  # Keyset pages of the directory
         ]
         
+    def directory_entry(self, user_id, name: str) -> DirectoryEntry:
+        """Directory index entry, with the row served by GET /patients/doctors"""
+        return DirectoryEntry(
+            id=self.id,
+            user_id=user_id,
+            name=name,
+            row={
+                "id": str(self.id),
+                "name": name,
+                "specialty": self.specialty,
+                "rating": self.rating,
+                "reviewCount": self.review_count,
+                "experience": self.experience_years,
+                "hospital": self.hospital,
+                "availability": self.availability,
+                "acceptingNewPatients": self.accepting_new_patients,
+                "languages": list(self.languages),
+                "distance": self.distance,
+            },
+        )
+
+    @after_event(Insert, Replace, Update)
+    async def refresh_directory_entry(self) -> None:
+        """
+        Keep this worker's doctor directory index current
+
+        Other workers pick the change up on their next periodic reload.
+        Query-level updates and ``insert_many`` bypass this hook.
+        """
+        if not doctor_directory.tracking:
+            return
+        if not self.accepting_new_patients:
+            doctor_directory.remove(self.id)
+            return
+        if isinstance(self.user, User):
+            user_id, name = self.user.id, self.user.full_name
+        else:
+            user_id = self.user.ref.id
+            name = doctor_directory.user_name(user_id)
+            if name is None:
+                user = await self.user.fetch()
+                if not isinstance(user, User):
+                    return
+                name = user.full_name
+        doctor_directory.upsert(self.directory_entry(user_id, name))
+
+    @after_event(Delete)
+    def remove_directory_entry(self) -> None:
+        """Drop a deleted doctor from this worker's directory index"""
+        doctor_directory.remove(self.id)
+
+    @after_event(Insert, Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of this doctor's pages (settings too) and of their patients' pages"""
+        await DataVersion.bump_doctor(self.id, self.user)
+
     def __repr__(self) -> str:
         return f"<Doctor {self.specialty}>"
 
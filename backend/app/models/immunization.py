@@ -3,8 +3,9 @@ Immunization Model
 """
 from datetime import datetime
 from typing import Optional
-from beanie import Document, Link
+from beanie import Delete, Document, Insert, Link, Replace, Update, after_event
 from pydantic import Field
+from .data_version import DataVersion
 from .patient import Patient
 
 
@@ -37,6 +38,11 @@ class Immunization(Document):
             "next_due",
         ]
         
+    @after_event(Insert, Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of pages showing the patient's records"""
+        await DataVersion.bump_patient(self.patient)
+
     def __repr__(self) -> str:
         return f"<Immunization {self.vaccine} for {self.patient}>"
 
@@ -3,8 +3,9 @@ Lab Result Model
 """
 from datetime import datetime
 from typing import Optional
-from beanie import Document, Link
+from beanie import Delete, Document, Insert, Link, Replace, Update, after_event
 from pydantic import Field
+from .data_version import DataVersion
 from .patient import Patient
 from .doctor import Doctor
 
@@ -43,6 +44,11 @@ class LabResult(Document):
             "test",
         ]
         
+    @after_event(Insert, Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of pages showing the patient's records"""
+        await DataVersion.bump_patient(self.patient)
+
     def __repr__(self) -> str:
         return f"<LabResult {self.test} for {self.patient}>"
 
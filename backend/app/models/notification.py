@@ -3,8 +3,9 @@ Notification Model
 """
 from datetime import datetime
 from typing import Optional
-from beanie import Document, Link
+from beanie import Delete, Document, Insert, Link, Replace, Update, after_event
 from pydantic import Field
+from .data_version import DataVersion
 from .user import User
 
 
@@ -47,8 +48,14 @@ class Notification(Document):
             "type",
             "priority",
             "timestamp",
+            ("user.$id", "timestamp", "_id"),  # Keyset pages of a user's feed
         ]
         
+    @after_event(Insert, Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of the recipient's notification pages"""
+        await DataVersion.bump(self.user)
+
     def __repr__(self) -> str:
         return f"<Notification {self.type} for {self.user}>"
 
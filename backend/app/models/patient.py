@@ -2,9 +2,11 @@
 Patient Model
 """
 from datetime import datetime, date
-from typing import Optional
-from beanie import Document, Link
+from typing import List, Optional
+from beanie import Delete, Document, Insert, Link, Replace, Save, SaveChanges, Update, after_event, before_event
 from pydantic import Field
+from app.utils.search import normalize_text, phone_terms, prefix_keys, search_terms
+from .data_version import DataVersion
 from .user import User
 
 
@@ -33,6 +35,10 @@ class Patient(Document):
     status: str = Field(default="active", description="Patient status: active or inactive")
     last_visit: Optional[datetime] = Field(None, description="Date of last visit")
     
+    # Typeahead keys (denormalized from the user's name and email, see set_search_keys)
+    search_keys: List[str] = Field(default_factory=list, description="Normalized name, email and phone prefixes")
+    search_name: str = Field(default="", description="Normalized full name, the typeahead sort key")
+    
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -42,9 +48,48 @@ class Patient(Document):
         name = "patients"  # Collection name in MongoDB
         indexes = [
             "user",
+            "user.$id",  # profile lookup by user (Patient.user.id == ...)
             "status",
             "last_visit",
+            [("search_keys", 1), ("search_name", 1), ("_id", 1)],
         ]
+
+    @staticmethod
+    def search_fields(full_name: str, email: str, phone: Optional[str]) -> dict:
+        """
+        Typeahead fields for a patient with the given name, email and phone
+
+        Returns:
+            ``search_keys`` and ``search_name`` values, usable in a $set
+        """
+        terms = search_terms(full_name) + search_terms(email) + phone_terms(phone)
+        return {
+            "search_keys": prefix_keys(terms),
+            "search_name": normalize_text(full_name).strip(),
+        }
+
+    def set_search_keys(self, full_name: str, email: str) -> None:
+        """Recompute the typeahead fields from the linked user's name and email and own phone"""
+        for field, value in self.search_fields(full_name, email, self.phone).items():
+            setattr(self, field, value)
+
+    @before_event(Insert, Replace, Save, SaveChanges)
+    async def refresh_search_keys(self) -> None:
+        """
+        Keep the typeahead fields current on instance writes
+
+        Loads the user unless the link is already fetched. ``insert_many`` and
+        query-level updates bypass this hook (the seeder and generator set the
+        fields themselves; see also app.database.search_keys).
+        """
+        user = self.user if isinstance(self.user, User) else await self.user.fetch()
+        if isinstance(user, User):
+            self.set_search_keys(user.full_name, user.email)
+
+    @after_event(Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of pages showing this patient (their settings too)"""
+        await DataVersion.bump_patient(self.id, self.user)
         
     def __repr__(self) -> str:
         return f"<Patient {self.user}>"
@@ -2,9 +2,12 @@
 Prescription Model
 """
 from datetime import datetime
-from typing import Optional, List
-from beanie import Document, Link
+from typing import Any, Optional, List
+from beanie import Delete, Document, Insert, Link, Replace, Save, SaveChanges, Update, after_event, before_event
 from pydantic import Field
+from pymongo import UpdateOne
+from app.utils.search import prefix_keys, search_terms
+from .data_version import DataVersion
 from .user import User
 from .patient import Patient
 from .doctor import Doctor
@@ -53,6 +56,10 @@ class Prescription(Document):
     side_effects: List[str] = Field(default_factory=list, description="Possible side effects")
     interactions: List[str] = Field(default_factory=list, description="Drug interactions")
     
+    # Search (see app.database.prescription_search)
+    patient_name: Optional[str] = Field(None, description="Patient's full name, denormalized for search")
+    search_keys: List[str] = Field(default_factory=list, description="Word prefixes of medication, generic and patient name")
+    
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -66,7 +73,71 @@ class Prescription(Document):
             "status",
             "prescribed_date",
             "medication",
+            # Keyset pages of a doctor's / patient's history (newest first)
+            ("doctor.$id", "prescribed_date", "_id"),
+            ("patient.$id", "prescribed_date", "_id"),
+            # Prefix (n-gram) search within a doctor's history
+            ("doctor.$id", "search_keys"),
+        ]
+
+    @staticmethod
+    def search_fields(medication: str, generic_name: Optional[str], patient_name: Optional[str]) -> dict:
+        """
+        Search fields for a prescription with the given names
+
+        Returns:
+            ``patient_name`` and ``search_keys`` values, usable in a $set
+        """
+        terms = search_terms(medication) + search_terms(generic_name) + search_terms(patient_name)
+        return {"patient_name": patient_name, "search_keys": prefix_keys(terms)}
+
+    def set_search_fields(self, patient_name: Optional[str]) -> None:
+        """Recompute the search fields from own names and the patient's name"""
+        for field, value in self.search_fields(self.medication, self.generic_name, patient_name).items():
+            setattr(self, field, value)
+
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def refresh_search_fields(self) -> None:
+        """
+        Keep the search keys current on instance writes
+
+        ``patient_name`` is set by whoever creates the prescription; when it is
+        missing and the patient and user links are fetched, it is taken from
+        them. ``insert_many`` bypasses this hook.
+        """
+        patient_name = self.patient_name
+        if patient_name is None and isinstance(self.patient, Patient) and isinstance(self.patient.user, User):
+            patient_name = self.patient.user.full_name
+        self.set_search_fields(patient_name)
+
+    @after_event(Insert, Replace, Update, Delete)
+    async def bump_data_versions(self) -> None:
+        """Expire ETags of the patient's and the prescribing doctor's pages"""
+        await DataVersion.bump_patient(self.patient, self.doctor)
+
+    @classmethod
+    async def rename_patient(cls, patient_id: Any, patient_name: str) -> int:
+        """
+        Carry a patient's new name into their prescriptions' search fields
+
+        Returns:
+            Number of prescriptions updated
+        """
+        rows = cls.get_pymongo_collection().find(
+            {"patient.$id": patient_id},
+            {"medication": 1, "generic_name": 1},
+        )
+        requests = [
+            UpdateOne(
+                {"_id": row["_id"]},
+                {"$set": cls.search_fields(row.get("medication", ""), row.get("generic_name"), patient_name)},
+            )
+            async for row in rows
         ]
+        if not requests:
+            return 0
+        result = await cls.get_pymongo_collection().bulk_write(requests, ordered=False)
+        return result.modified_count
         
     def __repr__(self) -> str:
         return f"<Prescription {self.medication} for {self.patient}>"
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from beanie import Document, Indexed, Link
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 from .user import User
 from app.config.settings import settings
 
@@ -42,10 +43,10 @@ class RefreshToken(Document):
         """Beanie Document Settings"""
         name = "refresh_tokens"  # Collection name in MongoDB
         indexes = [
-            "user",
             "token_hash",
-            "expires_at",
-            "is_revoked",
+            # TTL index: MongoDB purges tokens once expires_at has passed.
+            # Rotation and logout set expires_at to now, so used tokens go too.
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
             ("user", "is_revoked"),  # Composite index for efficient queries
         ]
         
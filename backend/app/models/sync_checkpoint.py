@@ -0,0 +1,25 @@
+"""
+Sync Checkpoint Model
+Persists high-water marks of incremental background jobs
+"""
+from datetime import datetime
+from typing import Optional
+from beanie import Document, Indexed, PydanticObjectId
+from pydantic import Field
+
+
+class SyncCheckpoint(Document):
+    """
+    Sync Checkpoint Document Model
+
+    One document per job; ``last_id`` is the highest source document id the
+    job has processed, so the next run only scans newer documents.
+    """
+
+    name: Indexed(str, unique=True)
+    last_id: Optional[PydanticObjectId] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        """Beanie Document Settings"""
+        name = "sync_checkpoints"
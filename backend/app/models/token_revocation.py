@@ -0,0 +1,47 @@
+"""
+Token Revocation Model
+Records users whose access tokens must stop working before they expire
+"""
+from datetime import datetime, timedelta
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from app.config.settings import settings
+from app.utils.revocation import revocation_filter, to_timestamp
+
+
+class TokenRevocation(Document):
+    """
+    Token Revocation Document Model
+
+    Access tokens of ``user_id`` issued at or before ``revoked_at`` are
+    rejected in stateless token mode. Entries are purged by a TTL index once
+    every affected access token has expired.
+    """
+
+    user_id: PydanticObjectId
+    revoked_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(
+        default_factory=lambda: datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+    )
+
+    class Settings:
+        """Beanie Document Settings"""
+        name = "token_revocations"
+        indexes = [
+            "revoked_at",
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
+
+    @classmethod
+    async def revoke_user(cls, user_id: PydanticObjectId) -> "TokenRevocation":
+        """
+        Revoke every access token issued to a user so far
+
+        Applied to this worker's filter immediately; other workers pick it
+        up on their next refresh.
+        """
+        revocation = cls(user_id=user_id)
+        await revocation.insert()
+        revocation_filter.revoke(user_id, to_timestamp(revocation.revoked_at))
+        return revocation
@@ -3,9 +3,21 @@ User Model
 Example Beanie Document Model
 """
 from datetime import datetime
-from typing import Optional
-from beanie import Document, Indexed
-from pydantic import EmailStr, Field
+from typing import Optional, Set
+from beanie import Delete, Document, Indexed, Replace, Update, after_event, before_event
+from pydantic import EmailStr, Field, PrivateAttr
+from app.config.settings import settings
+from app.utils.cache import user_cache
+from app.utils.doctor_index import doctor_directory
+from .data_version import DataVersion
+from .token_revocation import TokenRevocation
+
+
+# Fields shown on other users' pages (a patient's doctors, a doctor's patients)
+_SHARED_FIELDS = ("full_name", "email")
+
+# Fields no page shows
+_UNSHOWN_FIELDS = {"password_hash", "updated_at"}
 
 
 class User(Document):
@@ -36,6 +48,14 @@ class User(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
+    # True for users built from access token claims (stateless token mode):
+    # they only carry the claim fields, so saving them raises
+    _from_token_claims: bool = PrivateAttr(default=False)
+    
+    # Fields changed by the write being processed (None when unknown), so
+    # after-write hooks can skip work a write does not call for
+    _changed_fields: Optional[Set[str]] = PrivateAttr(default=None)
+    
     class Settings:
         """Beanie Document Settings"""
         name = "users"  # Collection name in MongoDB
@@ -45,7 +65,110 @@ class User(Document):
             "role",
             "created_at",
         ]
+        # Loaded users remember their stored state (see record_changed_fields)
+        use_state_management = True
+    
+    @before_event(Replace, Update)
+    def refuse_claims_user_write(self) -> None:
+        """Refuse to store a user built from token claims (it lacks password_hash)"""
+        if self._from_token_claims:
+            raise RuntimeError("Users built from access token claims cannot be saved")
+    
+    @before_event(Replace, Update)
+    def record_changed_fields(self) -> None:
+        """Compare the user with its stored state before the write"""
+        if self.get_saved_state() is None:
+            self._changed_fields = None
+        else:
+            self._changed_fields = set(self.get_changes())
+    
+    def _wrote(self, *fields: str) -> bool:
+        """Whether the write being processed changed any of fields (True when unknown)"""
+        return self._changed_fields is None or not self._changed_fields.isdisjoint(fields)
+        
+    @after_event(Replace, Update, Delete)
+    def invalidate_cached_user(self) -> None:
+        """Drop this user's snapshot from the authenticated user cache
+
+        Runs after instance writes (profile, settings, password, deactivation);
+        save() and save_changes() go through update(), so they are covered.
+        Query-level updates such as ``User.find(...).update(...)`` bypass event
+        hooks and must call ``user_cache.invalidate`` themselves.
+        """
+        user_cache.invalidate(self.id)
+    
+    @after_event(Replace, Update)
+    async def revoke_tokens_if_inactive(self) -> None:
+        """Stop outstanding access tokens when a user is deactivated (stateless mode)"""
+        if settings.auth_stateless_tokens and not self.is_active and self._wrote("is_active"):
+            await TokenRevocation.revoke_user(self.id)
+    
+    @after_event(Replace, Update)
+    def rename_directory_doctor(self) -> None:
+        """Carry name changes into this worker's doctor directory index"""
+        if self.role == "doctor":
+            doctor_directory.rename_user(self.id, self.full_name)
+
+    @after_event(Replace, Update)
+    async def refresh_profile_dependents(self) -> None:
+        """
+        Carry changes into the data derived from this user's profile
+
+        A patient's name and email feed their typeahead and prescription
+        search keys, and pages of the patient's doctors (or of a doctor's
+        patients) show the name, so their ETags expire. Both use the one
+        profile lookup, made only when the name or email changed; other
+        writes expire the user's own pages, and password or timestamp-only
+        writes (login hash migration, password changes) nothing.
+        """
+        changed = self._changed_fields
+        if changed is not None and changed.isdisjoint(_SHARED_FIELDS):
+            if changed - _UNSHOWN_FIELDS:
+                await DataVersion.bump(self.id)
+            return
+        await self._expire_profile_pages(refresh_search_keys=True)
+
+    @after_event(Delete)
+    async def expire_pages_on_delete(self) -> None:
+        """Expire ETags of pages showing a deleted user"""
+        await self._expire_profile_pages(refresh_search_keys=False)
+
+    async def _expire_profile_pages(self, refresh_search_keys: bool) -> None:
+        if self.role == "patient":
+            from .patient import Patient
+            from .prescription import Prescription
+
+            patient = await Patient.find_one(Patient.user.id == self.id)
+            if patient is not None:
+                if refresh_search_keys:
+                    fields = Patient.search_fields(self.full_name, self.email, patient.phone)
+                    if fields["search_keys"] != patient.search_keys or fields["search_name"] != patient.search_name:
+                        # Query-level update: the profile itself did not change
+                        await Patient.find(Patient.id == patient.id).update({"$set": fields})
+                    if fields["search_name"] != patient.search_name:
+                        await Prescription.rename_patient(patient.id, self.full_name)
+                await DataVersion.bump_patient(patient.id, self.id)
+                return
+        elif self.role == "doctor":
+            from .doctor import Doctor
+
+            doctor = await Doctor.find_one(Doctor.user.id == self.id)
+            if doctor is not None:
+                await DataVersion.bump_doctor(doctor.id, self.id)
+                return
+        await DataVersion.bump(self.id)
+
+    @after_event(Delete)
+    async def revoke_tokens_on_delete(self) -> None:
+        """Stop outstanding access tokens of a deleted user (stateless mode)"""
+        if settings.auth_stateless_tokens:
+            await TokenRevocation.revoke_user(self.id)
         
+    @property
+    def from_token_claims(self) -> bool:
+        """Whether this user was built from token claims rather than loaded"""
+        return self._from_token_claims
+    
     def __repr__(self) -> str:
         return f"<User {self.email}>"
 
@@ -5,7 +5,10 @@ from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import math
 import secrets
+from beanie import UpdateResponse
+from beanie.operators import Set
 from app.models import User, Doctor, Patient, RefreshToken, PasswordResetToken
 from app.schemas.auth import (
     SignUpRequest,
@@ -14,13 +17,16 @@ from app.schemas.auth import (
     UserResponse,
 )
 from app.utils.auth import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password_async,
     create_access_token,
     decode_access_token,
     generate_refresh_token,
 )
 from app.config.settings import settings
+from app.utils.rate_limit import charge_auth_email, check_auth_rate_limit
+from app.dependencies.auth import load_user
+from app.database.loaders import link_id
 from app.schemas.settings import ForgotPasswordRequest, ResetPasswordRequest
 
 
@@ -34,6 +40,61 @@ def hash_token(token: str) -> str:
     return hashlib.sha256(token.encode()).hexdigest()
 
 
+async def enforce_auth_rate_limit(request: Request, email: str, action: str) -> None:
+    """
+    Reject credential requests over the per-IP or per-email rate limit
+    
+    Called before any database or password hashing work. The client address
+    is the proxy-reported one when TRUSTED_PROXIES is set (see app.main).
+    
+    Raises:
+        HTTPException: 429 with Retry-After when the caller must slow down
+    """
+    client_ip = request.client.host if request.client else None
+    retry_after = await check_auth_rate_limit(client_ip, email, action)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+async def charge_failed_login(request: Request, email: str) -> None:
+    """Count a failed login against the email's bucket for this client"""
+    client_ip = request.client.host if request.client else None
+    await charge_auth_email(email, "login", client_ip)
+
+
+async def get_profile_id(user: User) -> Optional[str]:
+    """Return the id of the user's Doctor/Patient profile, if the role has one"""
+    model = {"doctor": Doctor, "patient": Patient}.get(user.role)
+    if model is None:
+        return None
+    profile = await model.find_one(model.user.id == user.id)
+    return str(profile.id) if profile else None
+
+
+def access_token_claims(user: User, profile_id: Optional[str]) -> dict:
+    """
+    Build the access token claims for a user
+    
+    ``profile_id`` lets doctor/patient routes identify the caller's profile
+    without querying it (see ``get_current_doctor_profile``); the identity
+    claims are what stateless token mode builds the current user from.
+    """
+    claims = {
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.role,
+        "username": user.username,
+        "full_name": user.full_name,
+    }
+    if profile_id:
+        claims["profile_id"] = profile_id
+    return claims
+
+
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(
     signup_data: SignUpRequest,
@@ -70,7 +131,7 @@ async def signup(
         )
     
     # Hash password
-    password_hash = hash_password(signup_data.password)
+    password_hash = await hash_password_async(signup_data.password)
     
     # Create user
     user = User(
@@ -85,6 +146,7 @@ async def signup(
     await user.insert()
     
     # Create role-specific profile
+    profile_id = None
     if signup_data.role == "doctor":
         doctor_profile = Doctor(
             user=user,
@@ -94,21 +156,18 @@ async def signup(
             accepting_new_patients=True,
         )
         await doctor_profile.insert()
+        profile_id = str(doctor_profile.id)
     elif signup_data.role == "patient":
         patient_profile = Patient(
             user=user,
             status="active",
         )
         await patient_profile.insert()
+        profile_id = str(patient_profile.id)
     
     # Generate tokens
     access_token = create_access_token(
-        data={
-            "sub": str(user.id),
-            "email": user.email,
-            "role": user.role,
-            "username": user.username,
-        }
+        data=access_token_claims(user, profile_id)
     )
     
     # Generate and store refresh token
@@ -167,16 +226,23 @@ async def login(
     Authenticates user credentials and returns access + refresh tokens.
     Works for both doctors and patients.
     """
+    await enforce_auth_rate_limit(request, login_data.email, "login")
+    
     # Find user by email
     user = await User.find_one(User.email == login_data.email)
     if not user:
+        await charge_failed_login(request, login_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    # Verify password
-    if not verify_password(login_data.password, user.password_hash):
+    # Verify password (and migrate outdated hashes on success)
+    password_ok, new_password_hash = await verify_and_update_password_async(
+        login_data.password, user.password_hash
+    )
+    if not password_ok:
+        await charge_failed_login(request, login_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -189,14 +255,15 @@ async def login(
             detail="Account is inactive"
         )
     
+    # Migrate an outdated hash once the login is known to succeed
+    if new_password_hash:
+        user.password_hash = new_password_hash
+        user.updated_at = datetime.utcnow()
+        await user.save()
+    
     # Generate access token
     access_token = create_access_token(
-        data={
-            "sub": str(user.id),
-            "email": user.email,
-            "role": user.role,
-            "username": user.username,
-        }
+        data=access_token_claims(user, await get_profile_id(user))
     )
     
     # Generate and store refresh token
@@ -265,20 +332,36 @@ async def refresh_token(
     # Hash the token to look it up
     refresh_token_hash = hash_token(refresh_token)
     
-    # Find refresh token in database
+    # Revoke the token if it is still valid, in one atomic find_one_and_update.
+    # Of two concurrent refreshes with the same token only one gets it back.
+    # Setting expires_at to now lets the TTL index purge it.
+    now = datetime.utcnow()
     refresh_token_doc = await RefreshToken.find_one(
-        RefreshToken.token_hash == refresh_token_hash
+        RefreshToken.token_hash == refresh_token_hash,
+        RefreshToken.is_revoked == False,
+        RefreshToken.expires_at > now,
+    ).update(
+        Set({
+            RefreshToken.is_revoked: True,
+            RefreshToken.last_used_at: now,  # Track usage
+            RefreshToken.expires_at: now,
+        }),
+        response_type=UpdateResponse.OLD_DOCUMENT,
     )
     
-    if not refresh_token_doc or not refresh_token_doc.is_valid():
+    if not refresh_token_doc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token"
         )
     
     # Get user
-    await refresh_token_doc.fetch_link(RefreshToken.user)
-    user = refresh_token_doc.user
+    user = await load_user(link_id(refresh_token_doc.user))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
     
     if not user.is_active:
         raise HTTPException(
@@ -286,19 +369,9 @@ async def refresh_token(
             detail="Account is inactive"
         )
     
-    # Revoke old refresh token (rotation)
-    refresh_token_doc.is_revoked = True
-    refresh_token_doc.last_used_at = datetime.utcnow()  # Track usage
-    await refresh_token_doc.save()
-    
     # Generate new access token
     access_token = create_access_token(
-        data={
-            "sub": str(user.id),
-            "email": user.email,
-            "role": user.role,
-            "username": user.username,
-        }
+        data=access_token_claims(user, await get_profile_id(user))
     )
     
     # Generate new refresh token (rotation)
@@ -359,15 +432,16 @@ async def logout(
     refresh_token = request.cookies.get("refresh_token")
     
     if refresh_token:
-        # Hash and revoke the token
+        # Hash and revoke the token (expiring it so the TTL index purges it)
         refresh_token_hash = hash_token(refresh_token)
-        refresh_token_doc = await RefreshToken.find_one(
+        await RefreshToken.find_one(
             RefreshToken.token_hash == refresh_token_hash
+        ).update(
+            Set({
+                RefreshToken.is_revoked: True,
+                RefreshToken.expires_at: datetime.utcnow(),
+            })
         )
-        
-        if refresh_token_doc:
-            refresh_token_doc.is_revoked = True
-            await refresh_token_doc.save()
     
     # Clear the cookie
     response.delete_cookie(
@@ -380,11 +454,14 @@ async def logout(
 
 
 @router.post("/forgot-password")
-async def forgot_password(body: ForgotPasswordRequest):
+async def forgot_password(body: ForgotPasswordRequest, request: Request):
     """
     Request a password reset. Always returns the same message to avoid email enumeration.
     When SMTP is not configured, the reset link is printed to server logs (development).
     """
+    await enforce_auth_rate_limit(request, str(body.email), "reset")
+    # Every reset request may send mail, so each one counts
+    await charge_auth_email(str(body.email), "reset")
     user = await User.find_one(User.email == str(body.email).strip().lower())
     if user:
         raw_token = secrets.token_urlsafe(32)
@@ -412,7 +489,7 @@ async def reset_password(body: ResetPasswordRequest):
         )
     await doc.fetch_link(PasswordResetToken.user)
     u = doc.user
-    u.password_hash = hash_password(body.new_password)
+    u.password_hash = await hash_password_async(body.new_password)
     u.updated_at = datetime.utcnow()
     await u.save()
     doc.used_at = datetime.utcnow()
@@ -448,7 +525,7 @@ async def get_current_user(
         )
     
     # Fetch user
-    user = await User.get(user_id)
+    user = await load_user(user_id)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -4,12 +4,20 @@ Doctor-specific routes
 All routes in this module require authentication and doctor role.
 Patients cannot access these routes - they will receive a 403 Forbidden error.
 """
+import re
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from app.dependencies.auth import get_current_doctor
-from datetime import datetime
+from app.dependencies.auth import ProfileRef, get_current_doctor, get_current_doctor_profile, require_roles
+from app.dependencies.conditional import ConditionalGet
+from app.dependencies.loaders import get_link_loader
+from app.dependencies.pagination import PageParams
+from app.database.loaders import LinkLoader, link_id
+from app.database.identity_map import get_document
+from app.database.care_access import care_access, care_patient_ids
+from app.database.prescription_search import SEARCH_ORDER, search_prescriptions
+from app.utils.search import query_prefixes, search_terms
+from datetime import date, datetime, time, timedelta
 from bson import ObjectId
-from beanie.operators import In
 from app.models import (
     User,
     Doctor,
@@ -25,6 +33,7 @@ from app.schemas.prescription_requests import (
 )
 from app.schemas import (
     PatientListItemResponse,
+    PatientSearchResultResponse,
     PatientProfileResponse,
     PrescriptionHistoryItemResponse,
     PrescriptionListItemResponse,
@@ -34,27 +43,23 @@ from app.schemas import (
 
 router = APIRouter(prefix="/doctors", tags=["doctors"])
 
-
-async def get_doctor_from_user(user: User) -> Doctor:
-    """Helper to get Doctor document from User"""
-    doctor = await Doctor.find_one(Doctor.user.id == user.id)
-    if not doctor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor profile not found"
-        )
-    return doctor
+# Keyset pagination orders (each backed by a compound index ending in _id)
+PATIENT_ORDER = [("_id", 1)]
+PRESCRIPTION_ORDER = [("prescribed_date", -1), ("_id", -1)]
+DIAGNOSIS_ORDER = [("diagnosed_date", -1), ("_id", -1)]
 
 
 @router.get("/me")
 async def get_doctor_profile(
-    current_user: User = Depends(get_current_doctor)
+    current_user: User = Depends(require_roles(["doctor"], load_document=True)),
+    conditional: ConditionalGet = Depends(),
 ):
     """
     Get current doctor's profile
     
     Requires: Doctor role
     """
+    await conditional.check(current_user.id)
     return {
         "id": str(current_user.id),
         "email": current_user.email,
@@ -64,87 +69,197 @@ async def get_doctor_profile(
     }
 
 
-async def _patient_list_items_for_docs(
-    patients_docs: list,
-    search: Optional[str],
-) -> list[PatientListItemResponse]:
-    patients = []
-    for patient_doc in patients_docs:
-        await patient_doc.fetch_all_links()
-        patient_user = await patient_doc.user.fetch()
-        
-        # Apply search filter if provided
-        if search:
-            search_lower = search.lower()
-            if (search_lower not in patient_user.full_name.lower() and
-                search_lower not in patient_user.email.lower() and
-                (patient_doc.phone and search_lower not in patient_doc.phone.lower())):
-                continue
-        
-        # Get active conditions for this patient
-        conditions_docs = await Condition.find(
-            Condition.patient.id == patient_doc.id,
-            Condition.status == "active"
-        ).to_list()
-        conditions = [cond.name for cond in conditions_docs]
-
-        allergies_docs = await Allergy.find(Allergy.patient.id == patient_doc.id).to_list()
-        allergies = [a.allergen for a in allergies_docs]
-
-        patients.append(PatientListItemResponse(
-            id=str(patient_doc.id),
-            name=patient_user.full_name,
-            age=patient_doc.age,
-            gender=patient_doc.gender,
-            email=patient_user.email,
-            phone=patient_doc.phone,
-            lastVisit=patient_doc.last_visit.isoformat() if patient_doc.last_visit else None,
-            status=patient_doc.status,
-            conditions=conditions,
-            allergies=allergies,
-        ))
-    return patients
+def _patient_roster_pipeline(match: dict, search: Optional[str], limit: int) -> list[dict]:
+    """
+    Build the aggregation serving GET /doctors/patients
+
+    Joins each patient's user, applies the search filter and collects
+    active condition names and allergens through $lookup sub-pipelines,
+    so a page of the roster costs one query. Only the ``limit`` patients
+    of the page reach the condition and allergy lookups.
+    """
+    pipeline: list[dict] = [
+        {"$match": match},
+        {"$sort": {"_id": 1}},
+    ]
+    if not search:
+        pipeline.append({"$limit": limit})
+    pipeline += [
+        {"$lookup": {
+            "from": User.get_collection_name(),
+            "localField": "user.$id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"full_name": 1, "email": 1}}],
+            "as": "_user",
+        }},
+        {"$unwind": "$_user"},
+    ]
+
+    # Apply search filter if provided (name, email or phone)
+    if search:
+        pattern = {"$regex": re.escape(search), "$options": "i"}
+        pipeline.append({"$match": {"$or": [
+            {"_user.full_name": pattern},
+            {"_user.email": pattern},
+            {"phone": pattern},
+        ]}})
+        pipeline.append({"$limit": limit})
+
+    pipeline += [
+        {"$lookup": {
+            "from": Condition.get_collection_name(),
+            "localField": "_id",
+            "foreignField": "patient.$id",
+            "pipeline": [
+                {"$match": {"status": "active"}},
+                {"$project": {"name": 1}},
+            ],
+            "as": "_conditions",
+        }},
+        {"$lookup": {
+            "from": Allergy.get_collection_name(),
+            "localField": "_id",
+            "foreignField": "patient.$id",
+            "pipeline": [{"$project": {"allergen": 1}}],
+            "as": "_allergies",
+        }},
+        {"$project": {
+            "_id": 0,
+            "id": {"$toString": "$_id"},
+            "name": "$_user.full_name",
+            "age": 1,
+            "gender": 1,
+            "email": "$_user.email",
+            "phone": 1,
+            "lastVisit": "$last_visit",
+            "status": 1,
+            "conditions": "$_conditions.name",
+            "allergies": "$_allergies.allergen",
+        }},
+    ]
+    return pipeline
 
 
 @router.get("/patients", response_model=list[PatientListItemResponse])
 async def list_patients(
-    current_user: User = Depends(get_current_doctor),
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
     search: Optional[str] = Query(None),
     scope: str = Query(
         "mine",
         description="'mine' = patients with a care relationship; 'all' = full directory (e.g. prescription picker)",
     ),
+    page: PageParams = Depends(),
+    conditional: ConditionalGet = Depends(),
 ):
     """
     List patients. Default scope is patients linked to this doctor via care relationships.
     Use scope=all for the full patient directory when creating a new prescription.
-    """
-    doctor = await get_doctor_from_user(current_user)
+    
+    With scope=all, ``search`` matches word prefixes of the name, email or
+    phone through the search_keys index (as GET /doctors/patients/search
+    does); the doctor's own roster is small enough to filter by substring.
 
+    Paginated by patient id (limit/cursor, see PageParams).
+    """
+    if scope != "all":
+        await conditional.check(doctor.id)
+    after = page.after_values(PATIENT_ORDER)
     if scope == "all":
-        patients_docs = await Patient.find().to_list()
+        match: dict = {"_id": {"$gt": after[0]}} if after else {}
+        if search:
+            prefixes = query_prefixes(search)
+            if not prefixes:
+                return []
+            match["search_keys"] = {"$all": prefixes}
+            search = None  # Applied by the match, not the roster regex
     else:
-        rels = await CareRelationship.find(
-            CareRelationship.doctor.id == doctor.id
-        ).to_list()
-        patient_ids = []
-        for rel in rels:
-            await rel.fetch_link(CareRelationship.patient)
-            if rel.patient:
-                patient_ids.append(rel.patient.id)
+        # Without a search filter the page is known up front
+        patient_ids = await care_patient_ids(
+            doctor.id,
+            after=after[0] if after else None,
+            limit=None if search else page.fetch_limit,
+        )
         if not patient_ids:
             return []
-        patients_docs = await Patient.find(In(Patient.id, patient_ids)).to_list()
+        match = {"_id": {"$in": patient_ids}}
+
+    rows = await Patient.aggregate(
+        _patient_roster_pipeline(match, search, page.fetch_limit)
+    ).to_list()
+    rows = page.page(rows, lambda row: [ObjectId(row["id"])])
+    return [
+        PatientListItemResponse(**{
+            **row,
+            "lastVisit": row["lastVisit"].isoformat() if row.get("lastVisit") else None,
+        })
+        for row in rows
+    ]
+
+
+def _patient_search_pipeline(prefixes: list[str], limit: int) -> list[dict]:
+    """
+    Build the aggregation serving GET /doctors/patients/search
 
-    return await _patient_list_items_for_docs(patients_docs, search)
+    The match and sort are answered by the (search_keys, search_name, _id)
+    index: an equality on the longest typed prefix walks the index in name
+    order and stops after ``limit`` matches. Only those patients are joined
+    to their user and allergies.
+    """
+    return [
+        {"$match": {"search_keys": {"$all": prefixes}}},
+        {"$sort": {"search_name": 1, "_id": 1}},
+        {"$limit": limit},
+        {"$lookup": {
+            "from": User.get_collection_name(),
+            "localField": "user.$id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"full_name": 1, "email": 1}}],
+            "as": "_user",
+        }},
+        {"$unwind": "$_user"},
+        {"$lookup": {
+            "from": Allergy.get_collection_name(),
+            "localField": "_id",
+            "foreignField": "patient.$id",
+            "pipeline": [{"$project": {"allergen": 1}}],
+            "as": "_allergies",
+        }},
+        {"$project": {
+            "_id": 0,
+            "id": {"$toString": "$_id"},
+            "name": "$_user.full_name",
+            "age": 1,
+            "gender": 1,
+            "email": "$_user.email",
+            "phone": 1,
+            "status": 1,
+            "allergies": "$_allergies.allergen",
+        }},
+    ]
+
+
+@router.get("/patients/search", response_model=list[PatientSearchResultResponse])
+async def search_patients(
+    current_user: User = Depends(get_current_doctor),
+    q: str = Query(..., min_length=1, max_length=100, description="Name, email or phone as typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of matches"),
+):
+    """
+    Patient typeahead for the prescription picker
 
+    Every term of ``q`` must prefix a word of the patient's name or email, or
+    their phone number ("sar jo", "sarah.j", "555 123"). Searches the full
+    patient directory; matches are ordered by name.
+    """
+    prefixes = query_prefixes(q)
+    if not prefixes:
+        return []
+    rows = await Patient.aggregate(_patient_search_pipeline(prefixes, limit)).to_list()
+    return [PatientSearchResultResponse(**row) for row in rows]
 
-async def _require_patient_access(doctor: Doctor, patient_doc: Patient) -> None:
-    rel = await CareRelationship.find_one(
-        CareRelationship.doctor.id == doctor.id,
-        CareRelationship.patient.id == patient_doc.id,
-    )
-    if not rel:
+
+async def _require_patient_access(doctor: ProfileRef[Doctor], patient_doc: Patient) -> None:
+    if not await care_access.has_access(doctor.id, patient_doc.id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have access to this patient",
@@ -154,16 +269,17 @@ async def _require_patient_access(doctor: Doctor, patient_doc: Patient) -> None:
 @router.get("/patients/{patient_id}", response_model=PatientProfileResponse)
 async def get_patient_details(
     patient_id: str,
-    current_user: User = Depends(get_current_doctor)
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
+    loader: LinkLoader = Depends(get_link_loader),
+    conditional: ConditionalGet = Depends(),
 ):
     """
     Get patient details (doctor-only endpoint)
     
     Requires: Doctor role
     """
-    doctor = await get_doctor_from_user(current_user)
     try:
-        patient_doc = await Patient.get(ObjectId(patient_id))
+        patient_doc = await get_document(Patient, ObjectId(patient_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -175,9 +291,9 @@ async def get_patient_details(
             detail="Patient not found"
         )
     await _require_patient_access(doctor, patient_doc)
+    await conditional.check(doctor.id, patient_doc.id)
 
-    await patient_doc.fetch_all_links()
-    patient_user = await patient_doc.user.fetch()
+    patient_user = await loader.load(User, link_id(patient_doc.user))
     
     return PatientProfileResponse(
         id=str(patient_doc.id),
@@ -198,16 +314,18 @@ async def get_patient_details(
 @router.get("/patients/{patient_id}/prescriptions", response_model=list[PrescriptionListItemResponse])
 async def get_patient_prescriptions(
     patient_id: str,
-    current_user: User = Depends(get_current_doctor)
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
+    loader: LinkLoader = Depends(get_link_loader),
+    page: PageParams = Depends(),
+    conditional: ConditionalGet = Depends(),
 ):
     """
-    Get patient's prescriptions (doctor-only endpoint)
+    Get patient's prescriptions (doctor-only endpoint), newest first, paginated
     
     Requires: Doctor role
     """
-    doctor = await get_doctor_from_user(current_user)
     try:
-        patient_doc = await Patient.get(ObjectId(patient_id))
+        patient_doc = await get_document(Patient, ObjectId(patient_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -219,15 +337,18 @@ async def get_patient_prescriptions(
             detail="Patient not found"
         )
     await _require_patient_access(doctor, patient_doc)
+    await conditional.check(doctor.id, patient_doc.id)
 
-    prescriptions_docs = await Prescription.find(
-        Prescription.patient.id == patient_doc.id
-    ).sort(-Prescription.prescribed_date).to_list()
+    prescriptions_docs = await page.find(
+        Prescription.find(Prescription.patient.id == patient_doc.id),
+        PRESCRIPTION_ORDER,
+    )
+    
+    doctor_users = await loader.load_users(Doctor, prescriptions_docs, "doctor")
     
     prescriptions = []
     for presc in prescriptions_docs:
-        await presc.fetch_all_links()
-        doctor_user = await presc.doctor.user.fetch()
+        doctor_user = doctor_users[link_id(presc.doctor)]
         
         prescriptions.append(PrescriptionListItemResponse(
             id=str(presc.id),
@@ -248,16 +369,18 @@ async def get_patient_prescriptions(
 @router.get("/patients/{patient_id}/conditions", response_model=list[ConditionResponse])
 async def get_patient_conditions(
     patient_id: str,
-    current_user: User = Depends(get_current_doctor)
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
+    loader: LinkLoader = Depends(get_link_loader),
+    page: PageParams = Depends(),
+    conditional: ConditionalGet = Depends(),
 ):
     """
-    Get patient's medical conditions (doctor-only endpoint)
+    Get patient's medical conditions (doctor-only endpoint), newest first, paginated
     
     Requires: Doctor role
     """
-    doctor = await get_doctor_from_user(current_user)
     try:
-        patient_doc = await Patient.get(ObjectId(patient_id))
+        patient_doc = await get_document(Patient, ObjectId(patient_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -269,15 +392,18 @@ async def get_patient_conditions(
             detail="Patient not found"
         )
     await _require_patient_access(doctor, patient_doc)
+    await conditional.check(doctor.id, patient_doc.id)
 
-    conditions_docs = await Condition.find(
-        Condition.patient.id == patient_doc.id
-    ).sort(-Condition.diagnosed_date).to_list()
+    conditions_docs = await page.find(
+        Condition.find(Condition.patient.id == patient_doc.id),
+        DIAGNOSIS_ORDER,
+    )
+    
+    doctor_users = await loader.load_users(Doctor, conditions_docs, "doctor")
     
     conditions = []
     for cond in conditions_docs:
-        await cond.fetch_all_links()
-        doctor_user = await cond.doctor.user.fetch()
+        doctor_user = doctor_users[link_id(cond.doctor)]
         
         conditions.append(ConditionResponse(
             id=str(cond.id),
@@ -295,16 +421,17 @@ async def get_patient_conditions(
 @router.get("/patients/{patient_id}/allergies", response_model=list[AllergyResponse])
 async def get_patient_allergies(
     patient_id: str,
-    current_user: User = Depends(get_current_doctor)
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
+    page: PageParams = Depends(),
+    conditional: ConditionalGet = Depends(),
 ):
     """
-    Get patient's allergies (doctor-only endpoint)
+    Get patient's allergies (doctor-only endpoint), newest first, paginated
     
     Requires: Doctor role
     """
-    doctor = await get_doctor_from_user(current_user)
     try:
-        patient_doc = await Patient.get(ObjectId(patient_id))
+        patient_doc = await get_document(Patient, ObjectId(patient_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -316,10 +443,12 @@ async def get_patient_allergies(
             detail="Patient not found"
         )
     await _require_patient_access(doctor, patient_doc)
+    await conditional.check(doctor.id, patient_doc.id)
 
-    allergies_docs = await Allergy.find(
-        Allergy.patient.id == patient_doc.id
-    ).sort(-Allergy.diagnosed_date).to_list()
+    allergies_docs = await page.find(
+        Allergy.find(Allergy.patient.id == patient_doc.id),
+        DIAGNOSIS_ORDER,
+    )
     
     allergies = []
     for allergy in allergies_docs:
@@ -337,12 +466,11 @@ async def get_patient_allergies(
 @router.post("/prescriptions", status_code=status.HTTP_201_CREATED)
 async def create_prescription(
     body: CreatePrescriptionRequest,
-    current_user: User = Depends(get_current_doctor),
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
 ):
     """Create a prescription and ensure a care relationship exists."""
-    doctor = await get_doctor_from_user(current_user)
     try:
-        patient_doc = await Patient.get(ObjectId(body.patient_id))
+        patient_doc = await get_document(Patient, ObjectId(body.patient_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -354,17 +482,15 @@ async def create_prescription(
             detail="Patient not found",
         )
 
-    existing_rel = await CareRelationship.find_one(
-        CareRelationship.doctor.id == doctor.id,
-        CareRelationship.patient.id == patient_doc.id,
-    )
-    if not existing_rel:
-        await CareRelationship(doctor=doctor, patient=patient_doc).insert()
+    if await CareRelationship.ensure(doctor.id, patient_doc.id):
+        care_access.invalidate(doctor.id)
 
     refills = body.refills or 0
+    patient_user = await get_document(User, link_id(patient_doc.user))
     presc = Prescription(
         patient=patient_doc,
-        doctor=doctor,
+        doctor=doctor.as_link(),
+        patient_name=patient_user.full_name if patient_user else None,
         medication=body.medication,
         dosage=body.dosage,
         frequency=body.frequency,
@@ -384,26 +510,29 @@ async def create_prescription(
 async def get_doctor_prescription(
     prescription_id: str,
     current_user: User = Depends(get_current_doctor),
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
+    loader: LinkLoader = Depends(get_link_loader),
+    conditional: ConditionalGet = Depends(),
 ):
-    doctor = await get_doctor_from_user(current_user)
     try:
-        presc = await Prescription.get(ObjectId(prescription_id))
+        presc = await get_document(Prescription, ObjectId(prescription_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prescription not found",
         )
-    await presc.fetch_all_links()
-    if not presc or presc.doctor.id != doctor.id:
+    if not presc or link_id(presc.doctor) != doctor.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prescription not found",
         )
-    patient_user = await presc.patient.user.fetch()
+    await conditional.check(current_user.id, doctor.id)
+    patient_users = await loader.load_users(Patient, [presc], "patient")
+    patient_user = patient_users[link_id(presc.patient)]
     return PrescriptionHistoryItemResponse(
         id=str(presc.id),
         patientName=patient_user.full_name,
-        patientId=str(presc.patient.id),
+        patientId=str(link_id(presc.patient)),
         medication=presc.medication,
         dosage=presc.dosage,
         frequency=presc.frequency,
@@ -422,18 +551,16 @@ async def get_doctor_prescription(
 async def update_doctor_prescription(
     prescription_id: str,
     body: UpdatePrescriptionRequest,
-    current_user: User = Depends(get_current_doctor),
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
 ):
-    doctor = await get_doctor_from_user(current_user)
     try:
-        presc = await Prescription.get(ObjectId(prescription_id))
+        presc = await get_document(Prescription, ObjectId(prescription_id))
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prescription not found",
         )
-    await presc.fetch_all_links()
-    if not presc or presc.doctor.id != doctor.id:
+    if not presc or link_id(presc.doctor) != doctor.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prescription not found",
@@ -463,54 +590,121 @@ async def update_doctor_prescription(
     return {"message": "Prescription updated", "id": str(presc.id)}
 
 
+def _prescription_history_match(
+    doctor: ProfileRef[Doctor],
+    status_filter: Optional[str],
+    prescribed_from: Optional[date],
+    prescribed_to: Optional[date],
+) -> dict:
+    """Filters of GET /doctors/prescriptions (dates are inclusive days)"""
+    match: dict = {"doctor.$id": doctor.id}
+    if status_filter and status_filter != "all":
+        match["status"] = status_filter
+    date_range: dict = {}
+    if prescribed_from:
+        date_range["$gte"] = datetime.combine(prescribed_from, time.min)
+    if prescribed_to:
+        date_range["$lt"] = datetime.combine(prescribed_to + timedelta(days=1), time.min)
+    if date_range:
+        match["prescribed_date"] = date_range
+    return match
+
+
+def _prescription_history_rows(prescribed_by: str) -> list[dict]:
+    """
+    Stages turning a page of prescriptions into history rows
+
+    Joins patient -> user for the name and projects exactly the
+    PrescriptionHistoryItemResponse fields (plus the search ``_score``).
+    """
+    return [
+        {"$lookup": {
+            "from": Patient.get_collection_name(),
+            "localField": "patient.$id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"user": 1}}],
+            "as": "_patient",
+        }},
+        {"$unwind": "$_patient"},
+        {"$lookup": {
+            "from": User.get_collection_name(),
+            "localField": "_patient.user.$id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"full_name": 1}}],
+            "as": "_patient_user",
+        }},
+        {"$unwind": "$_patient_user"},
+        {"$project": {
+            "_id": 0,
+            "id": {"$toString": "$_id"},
+            "patientName": "$_patient_user.full_name",
+            "patientId": {"$toString": "$_patient._id"},
+            "medication": 1,
+            "dosage": 1,
+            "frequency": 1,
+            "duration": 1,
+            "prescribedDate": "$prescribed_date",
+            "status": 1,
+            "prescribedBy": {"$literal": prescribed_by},
+            "instructions": 1,
+            "notes": 1,
+            "refills": 1,
+            "refillsRemaining": "$refills_remaining",
+            "_score": 1,
+        }},
+    ]
+
+
 @router.get("/prescriptions", response_model=list[PrescriptionHistoryItemResponse])
 async def list_prescriptions(
     current_user: User = Depends(get_current_doctor),
-    search: Optional[str] = Query(None),
-    status_filter: Optional[str] = Query(None, alias="status")
+    doctor: ProfileRef[Doctor] = Depends(get_current_doctor_profile),
+    search: Optional[str] = Query(None, description="Medication, generic or patient name"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    prescribed_from: Optional[date] = Query(None, description="Prescribed on or after this day"),
+    prescribed_to: Optional[date] = Query(None, description="Prescribed on or before this day"),
+    page: PageParams = Depends(),
+    conditional: ConditionalGet = Depends(),
 ):
     """
-    List doctor's prescriptions (doctor-only endpoint)
+    List doctor's prescriptions (doctor-only endpoint), paginated
+    
+    Newest first; with ``search``, ranked by relevance (see
+    app.database.prescription_search). Served by a single aggregation:
+    filtering, search, paging and the patient name join all run inside
+    MongoDB.
     
     Requires: Doctor role
     """
-    doctor = await get_doctor_from_user(current_user)
-    
-    query = Prescription.find(Prescription.doctor.id == doctor.id)
-    
-    if status_filter and status_filter != "all":
-        query = query.find(Prescription.status == status_filter)
-    
-    prescriptions_docs = await query.sort(-Prescription.prescribed_date).to_list()
-    
-    prescriptions = []
-    for presc in prescriptions_docs:
-        await presc.fetch_all_links()
-        patient_user = await presc.patient.user.fetch()
-        
-        # Apply search filter if provided
-        if search:
-            search_lower = search.lower()
-            if (search_lower not in patient_user.full_name.lower() and
-                search_lower not in presc.medication.lower()):
-                continue
-        
-        prescriptions.append(PrescriptionHistoryItemResponse(
-            id=str(presc.id),
-            patientName=patient_user.full_name,
-            patientId=str(presc.patient.id),
-            medication=presc.medication,
-            dosage=presc.dosage,
-            frequency=presc.frequency,
-            duration=presc.duration,
-            prescribedDate=presc.prescribed_date.isoformat(),
-            status=presc.status,
-            prescribedBy=current_user.full_name,
-            instructions=presc.instructions,
-            notes=presc.notes,
-            refills=presc.refills,
-            refillsRemaining=presc.refills_remaining,
-        ))
+    await conditional.check(current_user.id, doctor.id)
+    match = _prescription_history_match(doctor, status_filter, prescribed_from, prescribed_to)
+    rows_stages = _prescription_history_rows(current_user.full_name)
+
+    if search and search_terms(search):
+        rows = await search_prescriptions(
+            match,
+            search,
+            page.after_values(SEARCH_ORDER),
+            page.fetch_limit,
+            rows_stages,
+        )
+        rows = page.page(rows, lambda row: [row["_score"], ObjectId(row["id"])])
+    else:
+        after = page.after(PRESCRIPTION_ORDER)
+        if after:
+            match.update(after)
+        pipeline: list[dict] = [
+            {"$match": match},
+            {"$sort": dict(PRESCRIPTION_ORDER)},
+            {"$limit": page.fetch_limit},
+        ]
+        rows = await Prescription.aggregate(pipeline + rows_stages).to_list()
+        rows = page.page(rows, lambda row: [row["prescribedDate"], ObjectId(row["id"])])
     
-    return prescriptions
-
+    # Dates are formatted here so the output matches datetime.isoformat()
+    return [
+        PrescriptionHistoryItemResponse(
+            **{**row, "prescribedDate": row["prescribedDate"].isoformat()}
+        )
+        for row in rows
+    ]
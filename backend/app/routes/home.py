@@ -1,8 +1,12 @@
 """
 Home/Health Check Routes
 """
-from fastapi import APIRouter
-from app.schemas.home import HealthResponse
+from fastapi import APIRouter, HTTPException, status
+from app.config.settings import settings
+from app.schemas.home import HealthResponse, RuntimeStatsResponse
+from app.utils.auth import access_token_cache, password_hash_stats
+from app.utils.cache import user_cache
+from app.utils.rate_limit import rate_limit_stats
 
 router = APIRouter()
 
@@ -17,3 +21,26 @@ async def root():
     """
     return HealthResponse(message="Server is running", status="running")
 
+
+@router.get("/stats", response_model=RuntimeStatsResponse, tags=["health"], include_in_schema=settings.debug)
+async def runtime_stats():
+    """
+    Counters of the worker serving the request (debug only, like the
+    X-Identity-Map and X-DB-Queries headers)
+    
+    Every worker keeps its own counters, so repeated calls may land on
+    different workers.
+    
+    Returns:
+        RuntimeStatsResponse: Admitted and rejected requests per rate limiter,
+        bcrypt pool load (queue depth, rejections), user and access token
+        cache hit rates
+    """
+    if not settings.debug:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return RuntimeStatsResponse(
+        rate_limits=rate_limit_stats(),
+        password_hashing=password_hash_stats(),
+        user_cache=user_cache.stats(),
+        access_token_cache=access_token_cache.stats(),
+    )
@@ -4,10 +4,20 @@ Patient-specific routes
 All routes in this module require authentication and patient role.
 Doctors cannot access these routes - they will receive a 403 Forbidden error.
 """
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from app.dependencies.auth import get_current_patient
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, Field
+from app.dependencies.auth import ProfileRef, get_current_patient, get_current_patient_profile, require_roles
+from app.dependencies.conditional import ConditionalGet
+from app.dependencies.loaders import get_link_loader
+from app.dependencies.pagination import PageParams
+from app.database.loaders import LinkLoader, link_id
+from app.database.identity_map import get_document
+from app.database.doctor_directory import get_doctor_directory
 from app.models import (
     User,
     Patient,
@@ -41,27 +51,95 @@ from app.schemas import (
 
 router = APIRouter(prefix="/patients", tags=["patients"])
 
+# Keyset pagination orders (each backed by a compound index ending in _id)
+PRESCRIPTION_ORDER = [("prescribed_date", -1), ("_id", -1)]
+# Doctor directory orders, paged in memory (browse / search ranking)
+DOCTOR_ORDER = [("_id", 1)]
+DOCTOR_RANKED_ORDER = [("score", -1), ("_id", 1)]
+
+# Seconds a dashboard ETag stays valid (the dashboard shows relative times)
+DASHBOARD_ETAG_PERIOD = 60
+
+
+# Projections for the medical history read path: only the fields
+# MedicalHistoryResponse needs, with link fields reduced to their id.
+
+class _ConditionRow(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    diagnosed_date: datetime
+    status: str
+    severity: str
+    notes: Optional[str] = None
+    doctor_id: PydanticObjectId
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "name": 1,
+            "diagnosed_date": 1,
+            "status": 1,
+            "severity": 1,
+            "notes": 1,
+            "doctor_id": "$doctor.$id",
+        }
+
+
+class _AllergyRow(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    allergen: str
+    reaction: str
+    severity: str
+    diagnosed_date: datetime
+
+
+class _SurgeryRow(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    procedure: str
+    date: datetime
+    hospital: str
+    surgeon: str
+    notes: Optional[str] = None
+
+
+class _ImmunizationRow(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    vaccine: str
+    date: datetime
+    next_due: Optional[datetime] = None
+    provider: str
 
-async def get_patient_from_user(user: User) -> Patient:
-    """Helper to get Patient document from User"""
-    patient = await Patient.find_one(Patient.user.id == user.id)
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patient profile not found"
-        )
-    return patient
+
+class _LabResultRow(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    test: str
+    date: datetime
+    result: str
+    status: str
+    ordered_by_id: PydanticObjectId
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "test": 1,
+            "date": 1,
+            "result": 1,
+            "status": 1,
+            "ordered_by_id": "$ordered_by.$id",
+        }
 
 
 @router.get("/me")
 async def get_patient_profile(
-    current_user: User = Depends(get_current_patient)
+    current_user: User = Depends(require_roles(["patient"], load_document=True)),
+    conditional: ConditionalGet = Depends(),
 ):
     """
     Get current patient's profile
     
     Requires: Patient role
     """
+    await conditional.check(current_user.id)
     return {
         "id": str(current_user.id),
         "email": current_user.email,
@@ -71,27 +149,97 @@ async def get_patient_profile(
     }
 
 
+def _dashboard_stats_pipeline(patient: ProfileRef[Patient]) -> list[dict]:
+    """
+    Build the aggregation computing all dashboard stat counts at once
+
+    Unions the patient's prescriptions, appointments and lab results into one
+    stream and counts each bucket in a single $facet stage.
+    """
+    def _tagged(kind: str) -> list[dict]:
+        return [
+            {"$match": {"patient.$id": patient.id}},
+            {"$project": {"_id": 0, "kind": {"$literal": kind}, "status": 1}},
+        ]
+
+    def _count(match: dict) -> list[dict]:
+        return [{"$match": match}, {"$count": "n"}]
+
+    return [
+        *_tagged("prescription"),
+        {"$unionWith": {
+            "coll": Appointment.get_collection_name(),
+            "pipeline": _tagged("appointment"),
+        }},
+        {"$unionWith": {
+            "coll": LabResult.get_collection_name(),
+            "pipeline": _tagged("lab_result"),
+        }},
+        {"$facet": {
+            "activePrescriptions": _count({"kind": "prescription", "status": "active"}),
+            "appointments": _count({"kind": "appointment"}),
+            "labResults": _count({"kind": "lab_result"}),
+        }},
+    ]
+
+
 @router.get("/dashboard", response_model=PatientDashboardResponse)
 async def get_patient_dashboard(
-    current_user: User = Depends(get_current_patient)
+    patient: ProfileRef[Patient] = Depends(get_current_patient_profile),
+    loader: LinkLoader = Depends(get_link_loader),
+    conditional: ConditionalGet = Depends(),
 ):
     """
     Get patient dashboard data (active prescriptions, appointments, stats, activity)
     
     Requires: Patient role
     """
-    patient = await get_patient_from_user(current_user)
+    # Days remaining, "N days ago" and upcoming appointments follow the clock
+    await conditional.check(patient.id, period=DASHBOARD_ETAG_PERIOD)
+    
+    # The sections are independent, so run them concurrently
+    (
+        active_prescriptions_docs,
+        upcoming_appointments_docs,
+        recent_prescriptions,
+        recent_appointments,
+        stats_rows,
+    ) = await asyncio.gather(
+        # Active prescriptions
+        Prescription.find(
+            Prescription.patient.id == patient.id,
+            Prescription.status == "active"
+        ).sort(-Prescription.prescribed_date).limit(10).to_list(),
+        # Upcoming appointments
+        Appointment.find(
+            Appointment.patient.id == patient.id,
+            In(Appointment.status, ["upcoming", "confirmed"]),
+            Appointment.date >= datetime.utcnow()
+        ).sort(Appointment.date).limit(10).to_list(),
+        # Recent prescriptions and appointments for the activity feed
+        Prescription.find(
+            Prescription.patient.id == patient.id
+        ).sort(-Prescription.created_at).limit(3).to_list(),
+        Appointment.find(
+            Appointment.patient.id == patient.id
+        ).sort(-Appointment.created_at).limit(2).to_list(),
+        # Stat counts in a single round trip
+        Prescription.aggregate(_dashboard_stats_pipeline(patient)).to_list(),
+    )
     
-    # Get active prescriptions
-    active_prescriptions_docs = await Prescription.find(
-        Prescription.patient.id == patient.id,
-        Prescription.status == "active"
-    ).sort(-Prescription.prescribed_date).limit(10).to_list()
+    # Resolve every referenced doctor (and their user) in one batch
+    doctor_rows = [
+        *active_prescriptions_docs,
+        *upcoming_appointments_docs,
+        *recent_prescriptions,
+        *recent_appointments,
+    ]
+    doctor_users = await loader.load_users(Doctor, doctor_rows, "doctor")
+    doctor_docs = await loader.load_links(Doctor, doctor_rows, "doctor")
     
     active_prescriptions = []
     for presc in active_prescriptions_docs:
-        await presc.fetch_all_links()
-        doctor_user = await presc.doctor.user.fetch()
+        doctor_user = doctor_users[link_id(presc.doctor)]
         
         # Calculate days remaining
         if presc.expiry_date:
@@ -114,18 +262,10 @@ async def get_patient_dashboard(
             nextDose=next_dose,
         ))
     
-    # Get upcoming appointments
-    upcoming_appointments_docs = await Appointment.find(
-        Appointment.patient.id == patient.id,
-        Appointment.status.in_(["upcoming", "confirmed"]),
-        Appointment.date >= datetime.utcnow()
-    ).sort(Appointment.date).limit(10).to_list()
-    
     upcoming_appointments = []
     for appt in upcoming_appointments_docs:
-        await appt.fetch_all_links()
-        doctor_user = await appt.doctor.user.fetch()
-        doctor_doc = await Doctor.find_one(Doctor.user.id == doctor_user.id)
+        doctor_user = doctor_users[link_id(appt.doctor)]
+        doctor_doc = doctor_docs.get(link_id(appt.doctor))
         
         upcoming_appointments.append(AppointmentResponse(
             id=str(appt.id),
@@ -141,13 +281,8 @@ async def get_patient_dashboard(
     recent_activity = []
     
     # Add prescription activities
-    recent_prescriptions = await Prescription.find(
-        Prescription.patient.id == patient.id
-    ).sort(-Prescription.created_at).limit(3).to_list()
-    
     for presc in recent_prescriptions:
-        await presc.fetch_all_links()
-        doctor_user = await presc.doctor.user.fetch()
+        doctor_user = doctor_users[link_id(presc.doctor)]
         
         days_ago = (datetime.utcnow() - presc.created_at).days
         timestamp = f"{days_ago} day{'s' if days_ago != 1 else ''} ago" if days_ago > 0 else "Today"
@@ -162,13 +297,8 @@ async def get_patient_dashboard(
         ))
     
     # Add appointment activities
-    recent_appointments = await Appointment.find(
-        Appointment.patient.id == patient.id
-    ).sort(-Appointment.created_at).limit(2).to_list()
-    
     for appt in recent_appointments:
-        await appt.fetch_all_links()
-        doctor_user = await appt.doctor.user.fetch()
+        doctor_user = doctor_users[link_id(appt.doctor)]
         
         days_ago = (datetime.utcnow() - appt.created_at).days
         timestamp = f"{days_ago} day{'s' if days_ago != 1 else ''} ago" if days_ago > 0 else "Today"
@@ -185,29 +315,18 @@ async def get_patient_dashboard(
     # Sort activity by timestamp (most recent first)
     recent_activity.sort(key=lambda x: x.timestamp)
     
-    # Calculate stats
-    total_prescriptions = await Prescription.find(
-        Prescription.patient.id == patient.id
-    ).count()
+    # Calculate stats ($facet yields one document holding a list per bucket)
+    facets = stats_rows[0] if stats_rows else {}
     
-    active_prescriptions_count = await Prescription.find(
-        Prescription.patient.id == patient.id,
-        Prescription.status == "active"
-    ).count()
-    
-    total_appointments = await Appointment.find(
-        Appointment.patient.id == patient.id
-    ).count()
-    
-    total_lab_results = await LabResult.find(
-        LabResult.patient.id == patient.id
-    ).count()
+    def _facet_count(name: str) -> int:
+        bucket = facets.get(name) or [{"n": 0}]
+        return bucket[0]["n"]
     
     stats = {
-        "activePrescriptions": active_prescriptions_count,
-        "appointments": total_appointments,
+        "activePrescriptions": _facet_count("activePrescriptions"),
+        "appointments": _facet_count("appointments"),
         "doctors": 3,  # TODO: Calculate from unique doctors
-        "labResults": total_lab_results,
+        "labResults": _facet_count("labResults"),
     }
     
     return PatientDashboardResponse(
@@ -220,27 +339,29 @@ async def get_patient_dashboard(
 
 @router.get("/prescriptions", response_model=list[PrescriptionListItemResponse])
 async def list_my_prescriptions(
-    current_user: User = Depends(get_current_patient),
-    status_filter: Optional[str] = Query(None, alias="status")
+    patient: ProfileRef[Patient] = Depends(get_current_patient_profile),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    loader: LinkLoader = Depends(get_link_loader),
+    page: PageParams = Depends(),
+    conditional: ConditionalGet = Depends(),
 ):
     """
-    List patient's prescriptions (patient-only endpoint)
+    List patient's prescriptions (patient-only endpoint), newest first, paginated
     
     Requires: Patient role
     """
-    patient = await get_patient_from_user(current_user)
-    
+    await conditional.check(patient.id)
     query = Prescription.find(Prescription.patient.id == patient.id)
     
     if status_filter and status_filter != "all":
         query = query.find(Prescription.status == status_filter)
     
-    prescriptions_docs = await query.sort(-Prescription.prescribed_date).to_list()
+    prescriptions_docs = await page.find(query, PRESCRIPTION_ORDER)
+    doctor_users = await loader.load_users(Doctor, prescriptions_docs, "doctor")
     
     prescriptions = []
     for presc in prescriptions_docs:
-        await presc.fetch_all_links()
-        doctor_user = await presc.doctor.user.fetch()
+        doctor_user = doctor_users[link_id(presc.doctor)]
         
         prescriptions.append(PrescriptionListItemResponse(
             id=str(presc.id),
@@ -261,34 +382,40 @@ async def list_my_prescriptions(
 @router.get("/prescriptions/{prescription_id}", response_model=PrescriptionDetailResponse)
 async def get_prescription_details(
     prescription_id: str,
-    current_user: User = Depends(get_current_patient)
+    patient: ProfileRef[Patient] = Depends(get_current_patient_profile),
+    loader: LinkLoader = Depends(get_link_loader),
+    conditional: ConditionalGet = Depends(),
 ):
     """
     Get prescription details (patient-only endpoint)
     
     Requires: Patient role
     """
-    patient = await get_patient_from_user(current_user)
-    
     try:
         from bson import ObjectId
-        presc = await Prescription.get(ObjectId(prescription_id))
+        presc = await get_document(Prescription, ObjectId(prescription_id))
     except:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prescription not found"
         )
     
+    if not presc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Prescription not found"
+        )
+    
     # Verify prescription belongs to patient
-    if presc.patient.id != patient.id:
+    if link_id(presc.patient) != patient.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
         )
+    await conditional.check(patient.id)
     
-    await presc.fetch_all_links()
-    doctor_user = await presc.doctor.user.fetch()
-    doctor_doc = await Doctor.find_one(Doctor.user.id == doctor_user.id)
+    doctor_user = (await loader.load_users(Doctor, [presc], "doctor"))[link_id(presc.doctor)]
+    doctor_doc = await loader.load(Doctor, link_id(presc.doctor))
     
     # Get pharmacy info if available
     pharmacy_info = None
@@ -337,70 +464,85 @@ async def get_prescription_details(
 async def list_doctors(
     current_user: User = Depends(get_current_patient),
     search: Optional[str] = Query(None),
-    specialty: Optional[str] = Query(None)
+    specialty: Optional[str] = Query(None),
+    page: PageParams = Depends(),
+    conditional: ConditionalGet = Depends(),
 ):
     """
-    List available doctors (patient-only endpoint)
+    List available doctors (patient-only endpoint), paginated
+    
+    Served from the in-process directory index without querying MongoDB.
+    Without ``search`` doctors are listed by id; with it they are ranked by
+    relevance (fuzzy match on name, specialty, hospital and languages).
     
     Requires: Patient role
     """
-    query = Doctor.find(Doctor.accepting_new_patients == True)
-    
-    if specialty and specialty != "all":
-        query = query.find(Doctor.specialty == specialty)
-    
-    doctors_docs = await query.to_list()
-    
-    doctors = []
-    for doctor_doc in doctors_docs:
-        await doctor_doc.fetch_all_links()
-        doctor_user = await doctor_doc.user.fetch()
-        
-        # Apply search filter if provided (client-side filtering for better UX)
-        if search:
-            search_lower = search.lower()
-            if (search_lower not in doctor_user.full_name.lower() and
-                search_lower not in doctor_doc.specialty.lower() and
-                search_lower not in doctor_doc.hospital.lower()):
-                continue
-        
-        doctors.append(DoctorListItemResponse(
-            id=str(doctor_doc.id),
-            name=doctor_user.full_name,
-            specialty=doctor_doc.specialty,
-            rating=doctor_doc.rating,
-            reviewCount=doctor_doc.review_count,
-            experience=doctor_doc.experience_years,
-            hospital=doctor_doc.hospital,
-            availability=doctor_doc.availability,
-            acceptingNewPatients=doctor_doc.accepting_new_patients,
-            languages=doctor_doc.languages,
-            distance=doctor_doc.distance,
-        ))
-    
-    return doctors
+    directory = await get_doctor_directory()
+    conditional.check_fingerprint(directory.fingerprint)
+    if specialty == "all":
+        specialty = None
+
+    if search and search.strip():
+        hits = directory.search(search, specialty, page.after_values(DOCTOR_RANKED_ORDER), page.fetch_limit)
+        hits = page.page(hits, lambda hit: [hit.score, hit.id])
+    else:
+        after = page.after_values(DOCTOR_ORDER)
+        hits = directory.browse(specialty, after[0] if after else None, page.fetch_limit)
+        hits = page.page(hits, lambda hit: [hit.id])
+    return [DoctorListItemResponse(**hit.row) for hit in hits]
 
 
 @router.get("/medical-history", response_model=MedicalHistoryResponse)
 async def get_medical_history(
-    current_user: User = Depends(get_current_patient)
+    patient: ProfileRef[Patient] = Depends(get_current_patient_profile),
+    loader: LinkLoader = Depends(get_link_loader),
+    conditional: ConditionalGet = Depends(),
 ):
     """
     Get patient's medical history (patient-only endpoint)
     
     Requires: Patient role
     """
-    patient = await get_patient_from_user(current_user)
+    await conditional.check(patient.id)
+    # The five collections are independent, so fetch them concurrently
+    (
+        conditions_docs,
+        allergies_docs,
+        surgeries_docs,
+        immunizations_docs,
+        lab_results_docs,
+    ) = await asyncio.gather(
+        Condition.find(
+            Condition.patient.id == patient.id,
+            projection_model=_ConditionRow,
+        ).sort(-Condition.diagnosed_date).to_list(),
+        Allergy.find(
+            Allergy.patient.id == patient.id,
+            projection_model=_AllergyRow,
+        ).sort(-Allergy.diagnosed_date).to_list(),
+        Surgery.find(
+            Surgery.patient.id == patient.id,
+            projection_model=_SurgeryRow,
+        ).sort(-Surgery.date).to_list(),
+        Immunization.find(
+            Immunization.patient.id == patient.id,
+            projection_model=_ImmunizationRow,
+        ).sort(-Immunization.date).to_list(),
+        LabResult.find(
+            LabResult.patient.id == patient.id,
+            projection_model=_LabResultRow,
+        ).sort(-LabResult.date).to_list(),
+    )
     
-    # Get conditions
-    conditions_docs = await Condition.find(
-        Condition.patient.id == patient.id
-    ).sort(-Condition.diagnosed_date).to_list()
+    # Resolve diagnosing and ordering doctors in one batch
+    doctor_users = await loader.load_users_by_profile(Doctor, [
+        *(cond.doctor_id for cond in conditions_docs),
+        *(lab.ordered_by_id for lab in lab_results_docs),
+    ])
     
     conditions = []
     for cond in conditions_docs:
-        await cond.fetch_all_links()
-        doctor_user = await cond.doctor.user.fetch()
+        doctor_user = doctor_users[cond.doctor_id]
         
         conditions.append(ConditionResponse(
             id=str(cond.id),
@@ -412,11 +554,6 @@ async def get_medical_history(
             notes=cond.notes,
         ))
     
-    # Get allergies
-    allergies_docs = await Allergy.find(
-        Allergy.patient.id == patient.id
-    ).sort(-Allergy.diagnosed_date).to_list()
-    
     allergies = []
     for allergy in allergies_docs:
         allergies.append(AllergyResponse(
@@ -427,11 +564,6 @@ async def get_medical_history(
             diagnosedDate=allergy.diagnosed_date.isoformat(),
         ))
     
-    # Get surgeries
-    surgeries_docs = await Surgery.find(
-        Surgery.patient.id == patient.id
-    ).sort(-Surgery.date).to_list()
-    
     surgeries = []
     for surgery in surgeries_docs:
         surgeries.append(SurgeryResponse(
@@ -443,11 +575,6 @@ async def get_medical_history(
             notes=surgery.notes,
         ))
     
-    # Get immunizations
-    immunizations_docs = await Immunization.find(
-        Immunization.patient.id == patient.id
-    ).sort(-Immunization.date).to_list()
-    
     immunizations = []
     for imm in immunizations_docs:
         immunizations.append(ImmunizationResponse(
@@ -458,15 +585,9 @@ async def get_medical_history(
             provider=imm.provider,
         ))
     
-    # Get lab results
-    lab_results_docs = await LabResult.find(
-        LabResult.patient.id == patient.id
-    ).sort(-LabResult.date).to_list()
-    
     lab_results = []
     for lab in lab_results_docs:
-        await lab.fetch_all_links()
-        doctor_user = await lab.ordered_by.user.fetch()
+        doctor_user = doctor_users[lab.ordered_by_id]
         
         lab_results.append(LabResultResponse(
             id=str(lab.id),
@@ -484,4 +605,3 @@ async def get_medical_history(
         immunizations=immunizations,
         labResults=lab_results,
     )
-
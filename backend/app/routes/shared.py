@@ -5,8 +5,12 @@ from datetime import datetime
 from typing import Optional, Tuple
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from app.dependencies.auth import get_current_user, require_roles
-from app.models import User, Notification, Doctor, Patient
+from app.dependencies.auth import get_current_user_document, require_roles
+from app.dependencies.conditional import ConditionalGet
+from app.dependencies.pagination import PageParams
+from app.models import User, Notification, Doctor, Patient, DataVersion
+from app.database.identity_map import find_one_cached
+from app.database.loaders import link_id
 from app.schemas import NotificationResponse
 from app.schemas.settings import (
     ProfileUpdateRequest,
@@ -15,10 +19,16 @@ from app.schemas.settings import (
     SettingsPatchRequest,
     NotificationReadUpdate,
 )
-from app.utils.auth import hash_password, verify_password
+from app.utils.auth import hash_password_async, verify_password_async
 
 router = APIRouter(prefix="/shared", tags=["shared"])
 
+# Keyset pagination order of the notification feed (newest first)
+NOTIFICATION_ORDER = [("timestamp", -1), ("_id", -1)]
+
+# Seconds a notification feed ETag stays valid ("5 minutes ago" timestamps)
+NOTIFICATION_ETAG_PERIOD = 60
+
 
 def _split_full_name(full_name: str) -> Tuple[str, str]:
     parts = (full_name or "").strip().split(None, 1)
@@ -40,9 +50,8 @@ async def _build_settings_response(user: User) -> SettingsResponse:
         last_name=ln,
     )
     if user.role == "doctor":
-        doc = await Doctor.find_one(Doctor.user.id == user.id)
+        doc = await find_one_cached(Doctor, ("user", user.id), Doctor.user.id == user.id)
         if doc:
-            await doc.fetch_all_links()
             return SettingsResponse(
                 role=user.role,
                 email=user.email,
@@ -57,9 +66,8 @@ async def _build_settings_response(user: User) -> SettingsResponse:
                 address=doc.practice_address,
             )
     if user.role == "patient":
-        pat = await Patient.find_one(Patient.user.id == user.id)
+        pat = await find_one_cached(Patient, ("user", user.id), Patient.user.id == user.id)
         if pat:
-            await pat.fetch_all_links()
             dob = pat.date_of_birth.isoformat() if pat.date_of_birth else None
             return SettingsResponse(
                 role=user.role,
@@ -82,7 +90,10 @@ async def get_notifications(
     current_user: User = Depends(require_roles(["doctor", "patient"])),
     type_filter: Optional[str] = Query(None, alias="type"),
     unread_only: Optional[bool] = Query(False, alias="unread"),
+    page: PageParams = Depends(),
+    conditional: ConditionalGet = Depends(),
 ):
+    await conditional.check(current_user.id, period=NOTIFICATION_ETAG_PERIOD)
     query = Notification.find(Notification.user.id == current_user.id)
 
     if unread_only:
@@ -91,7 +102,7 @@ async def get_notifications(
     if type_filter and type_filter != "all":
         query = query.find(Notification.type == type_filter)
 
-    notifications_docs = await query.sort(-Notification.timestamp).to_list()
+    notifications_docs = await page.find(query, NOTIFICATION_ORDER)
 
     notifications = []
     for notif in notifications_docs:
@@ -140,8 +151,7 @@ async def patch_notification(
         notif = await Notification.get(ObjectId(notification_id))
     except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
-    await notif.fetch_link(Notification.user)
-    if not notif or notif.user.id != current_user.id:
+    if not notif or link_id(notif.user) != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
     notif.read = body.read
     notif.updated_at = datetime.utcnow()
@@ -171,15 +181,14 @@ async def patch_notification(
 async def mark_all_notifications_read(
     current_user: User = Depends(require_roles(["doctor", "patient"])),
 ):
-    unread = await Notification.find(
+    # One query-level update; it bypasses the document hooks, so expire the
+    # feed's ETags here
+    result = await Notification.find(
         Notification.user.id == current_user.id,
         Notification.read == False,
-    ).to_list()
-    now = datetime.utcnow()
-    for n in unread:
-        n.read = True
-        n.updated_at = now
-        await n.save()
+    ).update({"$set": {"read": True, "updated_at": datetime.utcnow()}})
+    if result is not None and result.modified_count:
+        await DataVersion.bump(current_user.id)
     return {"message": "All notifications marked read"}
 
 
@@ -192,14 +201,17 @@ async def delete_notification(
         notif = await Notification.get(ObjectId(notification_id))
     except Exception:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
-    await notif.fetch_link(Notification.user)
-    if not notif or notif.user.id != current_user.id:
+    if not notif or link_id(notif.user) != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
     await notif.delete()
 
 
 @router.get("/profile")
-async def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(
+    current_user: User = Depends(get_current_user_document),
+    conditional: ConditionalGet = Depends(),
+):
+    await conditional.check(current_user.id)
     return {
         "id": str(current_user.id),
         "email": current_user.email,
@@ -214,7 +226,7 @@ async def get_profile(current_user: User = Depends(get_current_user)):
 @router.patch("/profile")
 async def patch_profile(
     body: ProfileUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_document),
 ):
     current_user.full_name = body.full_name.strip()
     current_user.updated_at = datetime.utcnow()
@@ -233,14 +245,14 @@ async def patch_profile(
 @router.post("/change-password")
 async def change_password(
     body: ChangePasswordRequest,
-    current_user: User = Depends(require_roles(["doctor", "patient"])),
+    current_user: User = Depends(require_roles(["doctor", "patient"], load_document=True)),
 ):
-    if not verify_password(body.current_password, current_user.password_hash):
+    if not await verify_password_async(body.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
-    current_user.password_hash = hash_password(body.new_password)
+    current_user.password_hash = await hash_password_async(body.new_password)
     current_user.updated_at = datetime.utcnow()
     await current_user.save()
     return {"message": "Password updated successfully"}
@@ -248,15 +260,18 @@ async def change_password(
 
 @router.get("/settings", response_model=SettingsResponse)
 async def get_settings(
-    current_user: User = Depends(require_roles(["doctor", "patient"])),
+    current_user: User = Depends(require_roles(["doctor", "patient"], load_document=True)),
+    conditional: ConditionalGet = Depends(),
 ):
+    # Profile writes bump their user's scope too
+    await conditional.check(current_user.id)
     return await _build_settings_response(current_user)
 
 
 @router.patch("/settings", response_model=SettingsResponse)
 async def patch_settings(
     body: SettingsPatchRequest,
-    current_user: User = Depends(require_roles(["doctor", "patient"])),
+    current_user: User = Depends(require_roles(["doctor", "patient"], load_document=True)),
 ):
     data = body.model_dump(exclude_unset=True)
     if "full_name" in data and data["full_name"]:
@@ -265,7 +280,7 @@ async def patch_settings(
         await current_user.save()
 
     if current_user.role == "doctor":
-        doc = await Doctor.find_one(Doctor.user.id == current_user.id)
+        doc = await find_one_cached(Doctor, ("user", current_user.id), Doctor.user.id == current_user.id)
         if not doc:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor profile not found")
         if "specialty" in data and data["specialty"] is not None:
@@ -282,7 +297,7 @@ async def patch_settings(
         await doc.save()
 
     elif current_user.role == "patient":
-        pat = await Patient.find_one(Patient.user.id == current_user.id)
+        pat = await find_one_cached(Patient, ("user", current_user.id), Patient.user.id == current_user.id)
         if not pat:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient profile not found")
         if "phone" in data:
@@ -18,6 +18,7 @@ from .prescription import (
 )
 from .patient import (
     PatientListItemResponse,
+    PatientSearchResultResponse,
     PatientProfileResponse,
 )
 from .doctor import (
@@ -58,6 +59,7 @@ __all__ = [
     "PharmacyInfo",
     # Patient
     "PatientListItemResponse",
+    "PatientSearchResultResponse",
     "PatientProfileResponse",
     # Doctor
     "DoctorListItemResponse",
@@ -1,6 +1,7 @@
 """
 Home/Health Check Schemas
 """
+from typing import Any, Dict
 from pydantic import BaseModel
 
 
@@ -9,3 +10,10 @@ class HealthResponse(BaseModel):
     message: str
     status: str = "running"
 
+
+class RuntimeStatsResponse(BaseModel):
+    """Counters of this worker process (debug only)"""
+    rate_limits: Dict[str, Dict[str, int]]
+    password_hashing: Dict[str, int]
+    user_cache: Dict[str, Any]
+    access_token_cache: Dict[str, Any]
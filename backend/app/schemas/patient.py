@@ -19,6 +19,18 @@ class PatientListItemResponse(BaseModel):
     allergies: List[str] = []
 
 
+class PatientSearchResultResponse(BaseModel):
+    """Patient typeahead match (prescription picker)"""
+    id: str
+    name: str
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    email: str
+    phone: Optional[str] = None
+    status: str
+    allergies: List[str] = []
+
+
 class PatientProfileResponse(BaseModel):
     """Detailed patient profile response"""
     id: str
@@ -1,17 +1,44 @@
 """
 Authentication utilities for password hashing and JWT token generation
 """
+import asyncio
 import hashlib
 import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config.settings import settings
+from app.utils.cache import TTLCache
 
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.password_bcrypt_rounds,
+)
+
+# Stored hashes are tagged with the scheme that produced them so exactly one
+# bcrypt verification runs per attempt. Untagged "$2b$..." hashes predate the
+# tag and may be either SHA-256 pre-hashed or raw; they are migrated on login.
+PASSWORD_SCHEME_SHA256_BCRYPT = "sha256_bcrypt"
+PASSWORD_SCHEME_LEGACY_BCRYPT = "legacy_bcrypt"
+_SCHEME_SEPARATOR = "$"
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+# Dedicated bcrypt pool (created lazily) and its load counters
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_in_flight = 0
+_hash_rejected = 0
 
 
 def _prehash_password(password: str) -> str:
@@ -34,10 +61,27 @@ def _prehash_password(password: str) -> str:
     return base64_hash
 
 
+def identify_password_hash(hashed_password: str) -> str:
+    """
+    Return the scheme a stored password hash was produced with
+    
+    Args:
+        hashed_password: Hashed password from database
+        
+    Returns:
+        PASSWORD_SCHEME_SHA256_BCRYPT for tagged hashes,
+        PASSWORD_SCHEME_LEGACY_BCRYPT for untagged bcrypt hashes
+    """
+    if hashed_password.startswith(PASSWORD_SCHEME_SHA256_BCRYPT + _SCHEME_SEPARATOR):
+        return PASSWORD_SCHEME_SHA256_BCRYPT
+    return PASSWORD_SCHEME_LEGACY_BCRYPT
+
+
 def hash_password(password: str) -> str:
     """
     Hash a password using bcrypt with SHA-256 pre-hashing.
     Pre-hashing ensures passwords longer than 72 bytes can be handled.
+    The result is tagged with its scheme (``sha256_bcrypt$<bcrypt hash>``).
     
     Args:
         password: Plain text password
@@ -47,15 +91,15 @@ def hash_password(password: str) -> str:
     """
     # Pre-hash with SHA-256 to handle long passwords
     prehashed = _prehash_password(password)
-    # Then hash with bcrypt (the prehashed value is always 64 bytes, well within bcrypt's limit)
-    return pwd_context.hash(prehashed)
+    # Then hash with bcrypt (the prehashed value is always 44 bytes, well within bcrypt's limit)
+    return PASSWORD_SCHEME_SHA256_BCRYPT + _SCHEME_SEPARATOR + pwd_context.hash(prehashed)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hash.
-    Uses the same pre-hashing approach as hash_password for consistency.
-    Also supports backward compatibility with passwords hashed without pre-hashing.
+    Tagged hashes cost exactly one bcrypt verification. Untagged legacy hashes
+    are tried pre-hashed first, then raw, for backward compatibility.
     
     Args:
         plain_password: Plain text password to verify
@@ -64,8 +108,12 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    # Try new method: pre-hash with SHA-256 before verification
     prehashed = _prehash_password(plain_password)
+    if identify_password_hash(hashed_password) == PASSWORD_SCHEME_SHA256_BCRYPT:
+        bcrypt_hash = hashed_password[len(PASSWORD_SCHEME_SHA256_BCRYPT) + 1:]
+        return pwd_context.verify(prehashed, bcrypt_hash)
+    
+    # Legacy: try pre-hashed first, as most untagged hashes were made that way
     if pwd_context.verify(prehashed, hashed_password):
         return True
     
@@ -81,6 +129,146 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return False
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash should be replaced on next successful login
+    
+    True for untagged legacy hashes and for hashes whose bcrypt cost differs
+    from PASSWORD_BCRYPT_ROUNDS (raising or lowering the cost).
+    
+    Args:
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if the hash should be regenerated
+    """
+    if identify_password_hash(hashed_password) != PASSWORD_SCHEME_SHA256_BCRYPT:
+        return True
+    bcrypt_hash = hashed_password[len(PASSWORD_SCHEME_SHA256_BCRYPT) + 1:]
+    return pwd_context.needs_update(bcrypt_hash)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and produce a replacement hash when the stored one is outdated
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password from database
+        
+    Returns:
+        (matches, new_hash) where new_hash is None unless the password matched
+        and the stored hash needs migrating
+    """
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if password_needs_rehash(hashed_password):
+        return True, hash_password(plain_password)
+    return True, None
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Return the bcrypt thread pool, creating it on first use"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="bcrypt",
+        )
+    return _hash_executor
+
+
+async def _run_in_hash_pool(func: Callable[..., T], *args) -> T:
+    """
+    Run a bcrypt call on the dedicated pool without blocking the event loop
+    
+    At most ``password_hash_workers`` hashes run at once; up to
+    ``password_hash_max_queue`` more may wait for a worker.
+    
+    Raises:
+        PasswordHashingBusy: If the wait queue is full
+    """
+    global _hash_in_flight, _hash_rejected
+    if _hash_in_flight - settings.password_hash_workers >= settings.password_hash_max_queue:
+        _hash_rejected += 1
+        raise PasswordHashingBusy()
+    
+    _hash_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_in_flight -= 1
+
+
+def password_hash_stats() -> Dict[str, int]:
+    """
+    Load metrics for the password hashing pool
+    
+    Returns:
+        Worker count, hashes running or waiting, queue depth (waiting only)
+        and the number of rejected calls since startup
+    """
+    return {
+        "workers": settings.password_hash_workers,
+        "in_flight": _hash_in_flight,
+        "queue_depth": max(0, _hash_in_flight - settings.password_hash_workers),
+        "rejected": _hash_rejected,
+    }
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the bcrypt pool (called on application shutdown)"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Async variant of hash_password that runs bcrypt on the hashing pool
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password string
+    """
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Async variant of verify_password that runs bcrypt on the hashing pool
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if password matches, False otherwise
+    """
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Async variant of verify_and_update_password that runs on the hashing pool
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password from database
+        
+    Returns:
+        (matches, new_hash); see verify_and_update_password
+    """
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -99,31 +287,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
 
+# Verified access token payloads keyed by token digest, kept until "exp".
+# Clients send the same token on several parallel requests, so this skips
+# repeated signature checks. Only successfully verified tokens are cached.
+access_token_cache: TTLCache = TTLCache(
+    maxsize=settings.jwt_cache_max_size if settings.jwt_cache_enabled else 0,
+    ttl=settings.access_token_expire_minutes * 60,
+)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     """
     Decode and verify a JWT access token
     
+    Verified payloads are cached per token until they expire (see
+    access_token_cache); callers get their own copy.
+    
     Args:
         token: JWT token string
         
     Returns:
         Decoded token payload if valid, None otherwise
     """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = access_token_cache.get(digest)
+    if payload is not None:
+        return dict(payload)
+    
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        
-        # Verify it's an access token
-        if payload.get("type") != "access":
-            return None
-            
-        return payload
     except JWTError:
         return None
+    
+    # Verify it's an access token
+    if payload.get("type") != "access":
+        return None
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        access_token_cache.set(digest, payload, ttl=exp - time.time())
+    return dict(payload)
 
 
 def generate_refresh_token() -> str:
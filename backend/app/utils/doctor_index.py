@@ -0,0 +1,353 @@
+"""
+In-process doctor directory index
+
+The patient-facing doctor directory (GET /patients/doctors) is small enough
+to hold in memory and is read far more often than it changes. Each worker
+keeps the listed doctors (those accepting new patients) as ready-to-serve
+response rows, plus an inverted index from normalized tokens of the name,
+specialty, hospital and languages to doctors, and from character trigrams
+to tokens. Searches are then answered without touching MongoDB:
+
+- every query term must match some token of the doctor, exactly, as a
+  prefix or (for terms of three characters or more) fuzzily by trigram
+  similarity, so "cardio" and "cardoilogy" both find cardiologists
+- a match scores the field weight (name > specialty > hospital, languages)
+  times the match quality, and doctors are ranked by their summed score
+
+The index is loaded from MongoDB and refreshed periodically (see
+app.database.doctor_directory); Doctor and User writes on this worker
+update it immediately through document hooks. ``fingerprint`` digests the
+served rows, so responses get the same ETag on every worker holding the
+same doctors.
+"""
+import bisect
+import hashlib
+import heapq
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from app.utils.search import normalize_text, search_terms, trigrams
+
+
+# Field weights: a name match ranks above a specialty match, and so on
+FIELD_WEIGHTS = {"name": 3.0, "specialty": 2.0, "hospital": 1.0, "languages": 1.0}
+
+# Match quality by kind; fuzzy matches are further scaled by their similarity
+PREFIX_QUALITY = 0.7
+FUZZY_QUALITY = 0.5
+
+# Minimum trigram (Jaccard) similarity for a fuzzy token match
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Titles that would otherwise match every doctor
+_NAME_STOPWORDS = {"dr"}
+
+
+def _id_key(doctor_id: Any) -> Any:
+    """Sort key of a doctor id: the raw bytes of an ObjectId"""
+    return getattr(doctor_id, "binary", doctor_id)
+
+
+class DirectoryHit(NamedTuple):
+    """A listed doctor with its search score (0 when browsing)"""
+    score: float
+    id: Any
+    row: dict
+
+
+class DirectoryEntry(NamedTuple):
+    """What the index needs to know about one doctor"""
+    id: Any
+    user_id: Any
+    name: str
+    row: dict
+
+
+def _entry_tokens(entry: DirectoryEntry) -> Dict[str, float]:
+    """Token -> highest field weight over the doctor's indexed fields"""
+    fields = {
+        "name": search_terms(entry.name),
+        "specialty": search_terms(entry.row.get("specialty")),
+        "hospital": search_terms(entry.row.get("hospital")),
+        "languages": [term for language in entry.row.get("languages") or [] for term in search_terms(language)],
+    }
+    tokens: Dict[str, float] = {}
+    for field, terms in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for term in terms:
+            if field == "name" and term in _NAME_STOPWORDS:
+                continue
+            if weight > tokens.get(term, 0.0):
+                tokens[term] = weight
+    return tokens
+
+
+class DoctorDirectoryIndex:
+    """
+    Listed doctors with a token and trigram index for ranked search
+
+    Pages are ordered by id when browsing and by (score desc, id) when
+    searching. Internally doctors are keyed by ``_id_key`` (the ObjectId
+    bytes), whose hashing and comparison run in C.
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+        self.loaded_at: Optional[float] = None
+        # Entries written while a reload is reading MongoDB, replayed after it
+        self._pending: Optional[List[Tuple[str, Any]]] = None
+
+    def _reset(self) -> None:
+        self._entries: Dict[Any, DirectoryEntry] = {}
+        self._by_user: Dict[Any, Any] = {}
+        self._doc_tokens: Dict[Any, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[Any, float]] = {}
+        self._token_grams: Dict[str, Set[str]] = {}
+        self._gram_tokens: Dict[str, Set[str]] = {}
+        self._sorted_tokens: Optional[List[str]] = None
+        self._ids: List[Any] = []
+        self._by_specialty: Dict[str, List[Any]] = {}
+        self._specialty_of: Dict[Any, str] = {}
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been filled from MongoDB"""
+        return self.loaded_at is not None
+
+    @property
+    def tracking(self) -> bool:
+        """Whether writes must be applied (the index is loaded or loading)"""
+        return self.loaded or self._pending is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def fingerprint(self) -> str:
+        """Digest of every served row, recomputed on first use after a change"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for key in self._ids:
+                digest.update(repr(self._entries[key].row).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def begin_reload(self) -> None:
+        """Start recording writes that must survive the upcoming replace_all"""
+        self._pending = []
+
+    def abort_reload(self) -> None:
+        """Stop recording writes after a failed reload"""
+        self._pending = None
+
+    def replace_all(self, entries: Iterable[DirectoryEntry]) -> None:
+        """
+        Swap in a freshly loaded set of listed doctors
+
+        Writes made on this worker since begin_reload are replayed on top,
+        so a reload cannot undo them.
+        """
+        pending, self._pending = self._pending or [], None
+        self._reset()
+        for entry in entries:
+            self._add(entry)
+        for action, value in pending:
+            if action == "upsert":
+                self.upsert(value)
+            elif action == "remove":
+                self.remove(value)
+            else:
+                self.rename_user(*value)
+        self.loaded_at = time.monotonic()
+
+    def upsert(self, entry: DirectoryEntry) -> None:
+        """Add or replace a listed doctor"""
+        if self._pending is not None:
+            self._pending.append(("upsert", entry))
+        self._remove(_id_key(entry.id))
+        self._add(entry)
+
+    def remove(self, doctor_id: Any) -> None:
+        """Drop a doctor (deleted or no longer accepting new patients)"""
+        if self._pending is not None:
+            self._pending.append(("remove", doctor_id))
+        self._remove(_id_key(doctor_id))
+
+    def rename_user(self, user_id: Any, name: str) -> None:
+        """Carry a user's new name into their listed doctor profile, if any"""
+        if self._pending is not None:
+            self._pending.append(("rename", (user_id, name)))
+        key = self._by_user.get(user_id)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is not None and entry.name != name:
+            self._remove(key)
+            self._add(entry._replace(name=name, row={**entry.row, "name": name}))
+
+    def user_name(self, user_id: Any) -> Optional[str]:
+        """Name of a listed doctor's user, if this index knows it"""
+        key = self._by_user.get(user_id)
+        return self._entries[key].name if key is not None else None
+
+    def _add(self, entry: DirectoryEntry) -> None:
+        key = _id_key(entry.id)
+        self._entries[key] = entry
+        self._fingerprint = None
+        self._by_user[entry.user_id] = key
+        bisect.insort(self._ids, key)
+        specialty = normalize_text(entry.row.get("specialty"))
+        self._specialty_of[key] = specialty
+        bisect.insort(self._by_specialty.setdefault(specialty, []), key)
+
+        tokens = _entry_tokens(entry)
+        self._doc_tokens[key] = tokens
+        for token, weight in tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                grams = set(trigrams(token))
+                self._token_grams[token] = grams
+                for gram in grams:
+                    self._gram_tokens.setdefault(gram, set()).add(token)
+                self._sorted_tokens = None
+            postings[key] = weight
+
+    def _remove(self, key: Any) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._fingerprint = None
+        if self._by_user.get(entry.user_id) == key:
+            del self._by_user[entry.user_id]
+        self._discard_sorted(self._ids, key)
+        specialty = self._specialty_of.pop(key)
+        ids = self._by_specialty.get(specialty)
+        if ids is not None:
+            self._discard_sorted(ids, key)
+            if not ids:
+                del self._by_specialty[specialty]
+
+        for token in self._doc_tokens.pop(key, {}):
+            postings = self._postings[token]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+                for gram in self._token_grams.pop(token):
+                    tokens = self._gram_tokens[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._gram_tokens[gram]
+                self._sorted_tokens = None
+
+    @staticmethod
+    def _discard_sorted(keys: List[Any], key: Any) -> None:
+        position = bisect.bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+
+    def _candidates(self, specialty: Optional[str]) -> Sequence[Any]:
+        if specialty is None:
+            return self._ids
+        return self._by_specialty.get(normalize_text(specialty), [])
+
+    def browse(self, specialty: Optional[str], after_id: Any, limit: int) -> List[DirectoryHit]:
+        """
+        Listed doctors in id order
+
+        Args:
+            specialty: Only doctors of this specialty (case-insensitive)
+            after_id: Id of the last doctor on the previous page, if any
+            limit: Maximum doctors to return
+        """
+        keys = self._candidates(specialty)
+        start = bisect.bisect_right(keys, _id_key(after_id)) if after_id is not None else 0
+        entries = [self._entries[key] for key in keys[start:start + limit]]
+        return [DirectoryHit(0.0, entry.id, entry.row) for entry in entries]
+
+    def _match_term(self, term: str) -> Dict[Any, float]:
+        """Doctor key -> best score of the term against the doctor's tokens"""
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        qualities: Dict[str, float] = {}
+
+        # Exact and prefix matches: a contiguous run of the sorted vocabulary
+        tokens = self._sorted_tokens
+        position = bisect.bisect_left(tokens, term)
+        while position < len(tokens) and tokens[position].startswith(term):
+            token = tokens[position]
+            qualities[token] = 1.0 if token == term else PREFIX_QUALITY
+            position += 1
+
+        # Fuzzy matches: tokens sharing enough trigrams with the term
+        if len(term) >= 3:
+            grams = trigrams(term)
+            shared = Counter(token for gram in grams for token in self._gram_tokens.get(gram, ()))
+            for token, count in shared.items():
+                similarity = count / (len(grams) + len(self._token_grams[token]) - count)
+                if similarity >= FUZZY_MIN_SIMILARITY:
+                    quality = FUZZY_QUALITY * similarity
+                    if quality > qualities.get(token, 0.0):
+                        qualities[token] = quality
+
+        scores: Dict[Any, float] = {}
+        for token, quality in qualities.items():
+            for key, weight in self._postings[token].items():
+                score = weight * quality
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+        return scores
+
+    def search(
+        self,
+        query: str,
+        specialty: Optional[str],
+        after: Optional[Sequence[Any]],
+        limit: int,
+    ) -> List[DirectoryHit]:
+        """
+        Rank listed doctors against a free-text query
+
+        Args:
+            query: Search text; every term must match the doctor
+            specialty: Only doctors of this specialty (case-insensitive)
+            after: (score, id) of the last hit on the previous page, if any
+            limit: Maximum hits to return
+
+        Returns:
+            Hits ordered by score (highest first), then id
+        """
+        terms = list(dict.fromkeys(search_terms(query)))
+        if not terms:
+            return []
+        scores: Optional[Dict[Any, float]] = None
+        for term_scores in sorted((self._match_term(term) for term in terms), key=len):
+            if scores is None:
+                scores = dict(term_scores)
+            else:
+                scores = {
+                    key: score + term_scores[key]
+                    for key, score in scores.items()
+                    if key in term_scores
+                }
+            if not scores:
+                return []
+
+        if specialty is not None:
+            allowed = normalize_text(specialty)
+            scores = {key: score for key, score in scores.items() if self._specialty_of[key] == allowed}
+        ranked = [(-round(score, 6), key) for key, score in scores.items()]
+        if after is not None:
+            bound = (-after[0], _id_key(after[1]))
+            ranked = [item for item in ranked if item > bound]
+        hits = []
+        for negated, key in heapq.nsmallest(limit, ranked):
+            entry = self._entries[key]
+            hits.append(DirectoryHit(-negated, entry.id, entry.row))
+        return hits
+
+    def stats(self) -> dict:
+        """Size of the index"""
+        return {"doctors": len(self._entries), "tokens": len(self._postings), "trigrams": len(self._gram_tokens)}
+
+
+doctor_directory = DoctorDirectoryIndex()
@@ -0,0 +1,204 @@
+"""
+Token-bucket rate limiting
+
+A ``TokenBucketLimiter`` admits a request when the bucket for its key (an IP
+address, an email, ...) still holds a token; buckets refill continuously up
+to their capacity. Bucket state lives in a ``RateLimitStore``: the default
+``InMemoryRateLimitStore`` is per worker, and a shared store (e.g. Redis)
+can be plugged in by implementing ``RateLimitStore.take``.
+"""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.config.settings import settings
+
+
+class RateLimitStore(ABC):
+    """Storage backend holding token bucket state"""
+
+    @abstractmethod
+    async def take(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> float:
+        """
+        Take tokens from the bucket for key
+
+        Args:
+            key: Bucket key
+            capacity: Maximum tokens (burst size)
+            refill_per_second: Tokens added per second
+            cost: Tokens to take if one is available (0 only checks)
+
+        Returns:
+            0 if a token was available, otherwise seconds until one is
+        """
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Per-worker bucket store
+
+    Args:
+        max_keys: Maximum buckets kept; the least recently used is dropped
+            (a dropped bucket simply starts full again)
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+
+        if tokens >= 1:
+            retry_after = 0.0
+            tokens -= cost
+        else:
+            retry_after = (1 - tokens) / refill_per_second if refill_per_second > 0 else 60.0
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class TokenBucketLimiter:
+    """
+    Named token-bucket limiter with admission counters
+
+    Args:
+        name: Limiter name used as key prefix and in stats
+        store: Bucket store
+        capacity: Burst size per key
+        per_minute: Sustained requests per minute per key
+    """
+
+    def __init__(self, name: str, store: RateLimitStore, capacity: float, per_minute: float) -> None:
+        self.name = name
+        self.store = store
+        self.capacity = capacity
+        self.refill_per_second = per_minute / 60
+        self.allowed = 0
+        self.rejected = 0
+
+    async def hit(self, key: str) -> float:
+        """
+        Count a request for key
+
+        Returns:
+            0 if admitted, otherwise seconds the caller should wait
+        """
+        return self._count(await self._take(key, 1))
+
+    async def check(self, key: str) -> float:
+        """
+        Admit a request for key without taking a token (see charge)
+
+        Returns:
+            0 if admitted, otherwise seconds the caller should wait
+        """
+        return self._count(await self._take(key, 0))
+
+    async def charge(self, key: str) -> None:
+        """Take a token for key after the fact, e.g. for a failed attempt"""
+        await self._take(key, 1)
+
+    async def _take(self, key: str, cost: float) -> float:
+        return await self.store.take(f"{self.name}:{key}", self.capacity, self.refill_per_second, cost)
+
+    def _count(self, retry_after: float) -> float:
+        if retry_after:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, int]:
+        """Admitted and rejected request counts"""
+        return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+# Credential endpoints (login, forgot-password) share one store
+_auth_store: RateLimitStore = InMemoryRateLimitStore(max_keys=settings.auth_rate_limit_max_keys)
+
+auth_ip_limiter = TokenBucketLimiter(
+    "auth-ip",
+    _auth_store,
+    capacity=settings.auth_rate_limit_ip_burst,
+    per_minute=settings.auth_rate_limit_ip_per_minute,
+)
+auth_email_limiter = TokenBucketLimiter(
+    "auth-email",
+    _auth_store,
+    capacity=settings.auth_rate_limit_email_burst,
+    per_minute=settings.auth_rate_limit_email_per_minute,
+)
+
+
+def use_auth_rate_limit_store(store: RateLimitStore) -> None:
+    """Switch the credential endpoint limiters to another (e.g. shared) store"""
+    auth_ip_limiter.store = store
+    auth_email_limiter.store = store
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, int]]:
+    """Counters of every credential endpoint limiter"""
+    return {
+        auth_ip_limiter.name: auth_ip_limiter.stats(),
+        auth_email_limiter.name: auth_email_limiter.stats(),
+    }
+
+
+# Actions whose email buckets are kept per client: failed logins from one
+# client must not lock the account owner out on another
+PER_CLIENT_EMAIL_ACTIONS = {"login"}
+
+
+def _email_key(action: str, email: str, ip: Optional[str]) -> str:
+    key = f"{action}:{email.strip().lower()}"
+    if action in PER_CLIENT_EMAIL_ACTIONS and ip:
+        key += f"@{ip}"
+    return key
+
+
+async def check_auth_rate_limit(ip: Optional[str], email: str, action: str) -> float:
+    """
+    Admit a credential request by client IP, then by account email
+
+    Every request takes a token from its IP bucket. The email bucket is only
+    checked; callers charge it with charge_auth_email. Logins charge it only
+    when they fail, and per client (email and IP), so wrong passwords sent
+    from elsewhere cannot lock the owner out; guessing across many clients
+    is bounded by their IP buckets. Reset buckets are per email, since each
+    reset request mails the owner.
+
+    Args:
+        ip: Client IP address (None if unknown)
+        email: Email the request targets
+        action: Endpoint kind ("login", "reset"); each has its own email buckets
+
+    Returns:
+        0 if admitted, otherwise seconds until the caller may retry
+    """
+    if not settings.auth_rate_limit_enabled:
+        return 0.0
+    if ip:
+        retry_after = await auth_ip_limiter.hit(ip)
+        if retry_after:
+            return retry_after
+    return await auth_email_limiter.check(_email_key(action, email, ip))
+
+
+async def charge_auth_email(email: str, action: str, ip: Optional[str] = None) -> None:
+    """
+    Count an attempt against an email's bucket for the action
+
+    Args:
+        email: Email the request targeted
+        action: Endpoint kind passed to check_auth_rate_limit
+        ip: Client IP passed to check_auth_rate_limit (used for login buckets)
+    """
+    if settings.auth_rate_limit_enabled:
+        await auth_email_limiter.charge(_email_key(action, email, ip))
@@ -0,0 +1,93 @@
+"""
+In-process access token revocation filter
+
+Used by the stateless access-token mode (AUTH_STATELESS_TOKENS), where
+get_current_user trusts the signed token claims instead of loading the user.
+Each worker keeps the ids of users whose tokens were revoked (deactivation,
+deletion) together with the revocation time; a token is rejected if it was
+issued at or before that time. Entries are dropped once every token they
+could affect has expired, so the filter stays small.
+
+The filter is filled by a background task polling the token_revocations
+collection (see app.database.revocations) and by local writes immediately.
+"""
+import calendar
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from app.config.settings import settings
+
+
+def to_timestamp(value: datetime) -> float:
+    """Convert a naive UTC datetime to epoch seconds"""
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+
+
+class RevocationFilter:
+    """
+    Map of revoked user id -> revocation time, with expiry
+
+    Args:
+        retention_seconds: How long an entry is kept; tokens issued before
+            the revocation are expired after this long (access token lifetime)
+    """
+
+    def __init__(self, retention_seconds: float) -> None:
+        self.retention_seconds = retention_seconds
+        self._revoked: Dict[str, float] = {}
+        self.last_refreshed: Optional[float] = None
+        self.rejections = 0
+
+    def revoke(self, user_id: Any, revoked_at: float) -> None:
+        """Reject tokens of user_id issued at or before revoked_at"""
+        key = str(user_id)
+        if revoked_at > self._revoked.get(key, 0.0):
+            self._revoked[key] = revoked_at
+
+    def is_revoked(self, user_id: Any, issued_at: Optional[float]) -> bool:
+        """
+        Check a token against the filter
+
+        Args:
+            user_id: Token subject
+            issued_at: Token ``iat`` claim (tokens without one are treated as
+                issued before any revocation)
+
+        Returns:
+            True if the token must be rejected
+        """
+        revoked_at = self._revoked.get(str(user_id))
+        if revoked_at is None:
+            return False
+        if issued_at is None or issued_at <= revoked_at:
+            self.rejections += 1
+            return True
+        return False
+
+    def mark_refreshed(self) -> None:
+        """Record a successful sync and drop entries past retention"""
+        now = time.time()
+        self.last_refreshed = now
+        cutoff = now - self.retention_seconds
+        self._revoked = {
+            user_id: revoked_at
+            for user_id, revoked_at in self._revoked.items()
+            if revoked_at > cutoff
+        }
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Whether the last successful sync happened within max_age seconds"""
+        return self.last_refreshed is not None and time.time() - self.last_refreshed <= max_age
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, rejection count and seconds since the last sync"""
+        return {
+            "size": len(self._revoked),
+            "rejections": self.rejections,
+            "age": time.time() - self.last_refreshed if self.last_refreshed else None,
+        }
+
+
+revocation_filter = RevocationFilter(
+    retention_seconds=settings.access_token_expire_minutes * 60,
+)
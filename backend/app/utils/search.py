@@ -0,0 +1,77 @@
+"""
+Search key normalization
+
+Typeahead lookups match what the user has typed so far against precomputed,
+lower-cased prefixes stored on the document (see ``Patient.search_keys``).
+Keys and queries go through the same normalization, so "José" matches
+"jose" and "(555) 123-4567" matches "555123". Fuzzy matching (the doctor
+directory) compares the character trigrams of terms.
+"""
+import re
+import unicodedata
+from typing import Iterable, List, Optional
+
+
+# Longest prefix stored per term; longer query terms are truncated to match
+SEARCH_PREFIX_MAX = 20
+
+_TERM_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lower-case text and strip accents"""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def search_terms(value: Optional[str]) -> List[str]:
+    """Split text into normalized alphanumeric terms"""
+    return _TERM_RE.findall(normalize_text(value))
+
+
+def phone_terms(phone: Optional[str]) -> List[str]:
+    """
+    Terms for a phone number: its digit groups, all digits, and the national
+    number (last 10 digits) so searches work with or without a country code
+    """
+    terms = search_terms(phone)
+    digits = "".join(ch for ch in (phone or "") if ch.isdigit())
+    if digits:
+        terms += [digits, digits[-10:]]
+    return terms
+
+
+def prefix_keys(terms: Iterable[str]) -> List[str]:
+    """Every prefix (up to SEARCH_PREFIX_MAX characters) of every term, deduplicated"""
+    keys: List[str] = []
+    seen = set()
+    for term in terms:
+        for end in range(1, min(len(term), SEARCH_PREFIX_MAX) + 1):
+            key = term[:end]
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+    return keys
+
+
+def query_prefixes(query: Optional[str]) -> List[str]:
+    """
+    Normalized query terms to match against prefix keys
+
+    Returns:
+        Distinct terms, longest (most selective) first, each truncated to
+        SEARCH_PREFIX_MAX characters; empty when the query has no terms
+    """
+    terms = {term[:SEARCH_PREFIX_MAX] for term in search_terms(query)}
+    return sorted(terms, key=lambda term: (-len(term), term))
+
+
+def trigrams(term: str) -> List[str]:
+    """
+    Distinct character trigrams of a term, padded with spaces so short terms
+    and word boundaries count ("abc" -> "  a", " ab", "abc", "bc ")
+    """
+    padded = f"  {term} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
@@ -0,0 +1,3 @@
+"""
+Performance benchmarks (run against a local mongod, not part of the app)
+"""
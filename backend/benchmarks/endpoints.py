@@ -0,0 +1,410 @@
+"""
+Endpoint Benchmarks
+Latency and MongoDB command counts for every API route at several dataset sizes
+
+For each --sizes entry (a fraction of the generator's full-size profile) a
+fresh database is filled by ``app.database.generator``, the FastAPI app is
+called in-process through httpx's ASGI transport, and each route is timed as
+the generator's busiest doctor and patient (``gen-doctor-0``,
+``gen-patient-0``). Warm-up requests run first, so numbers describe the
+steady state with caches warm. A PyMongo command listener counts the
+commands each request sends.
+
+Results are written as JSON (--output) and can be checked against an
+earlier run (--compare); regressions make the command exit with status 1.
+
+Requires a local mongod and the dev requirements
+(``pip install -r requirements-dev.txt``). Run from backend/:
+
+    python -m benchmarks.endpoints --sizes 0.001,0.01 --output bench.json
+    python -m benchmarks.endpoints --sizes 0.001,0.01 --compare bench.json
+
+Routes that consume one-shot state (signup, logout, reset-password,
+change-password, deleting a notification) are not benchmarked.
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+import httpx
+from pymongo import AsyncMongoClient, monitoring
+from app.config.settings import settings
+from app.database.care_access import care_access
+from app.database.care_sync import sync_care_relationships_from_prescriptions
+from app.database.connection import init_beanie, close_database
+from app.database.doctor_directory import load_doctor_directory
+from app.database.generator import DatasetGenerator, scaled_counts
+from app.main import app
+from app.models import User, Doctor, Patient, Prescription, Notification
+from app.utils.auth import access_token_cache
+from app.utils.cache import user_cache
+
+
+DEFAULT_SIZES = "0.001,0.01"
+DEFAULT_ITERATIONS = 30
+DEFAULT_WARMUP = 3
+DEFAULT_THRESHOLD = 0.25
+
+# Base URL is https so the secure refresh token cookie is sent back
+BASE_URL = "https://benchmark"
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts MongoDB commands and their server time since the last reset"""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.commands: Counter = Counter()
+        self.duration_ms = 0.0
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.duration_ms += event.duration_micros / 1000
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.duration_ms += event.duration_micros / 1000
+
+
+class Route(NamedTuple):
+    """
+    One benchmarked request
+
+    ``path`` and string values of ``body`` are formatted with the fixture ids
+    (see _load_fixtures). ``revalidate`` routes send the ETag of the previous
+    response in ``If-None-Match``, like a browser polling an unchanged page.
+    """
+    method: str
+    path: str
+    role: Optional[str]
+    body: Optional[Dict[str, Any]] = None
+    max_iterations: Optional[int] = None  # cap for bcrypt-bound routes
+    revalidate: bool = False
+
+    @property
+    def name(self) -> str:
+        name = f"{self.method} {self.path}"
+        return f"{name} (If-None-Match)" if self.revalidate else name
+
+
+ROUTES: List[Route] = [
+    # auth.py
+    Route("POST", "/auth/login", None, {"email": "{patient_email}", "password": "{password}"}, max_iterations=5),
+    Route("POST", "/auth/refresh", None),
+    Route("GET", "/auth/me", "patient"),
+    Route("POST", "/auth/forgot-password", None, {"email": "{patient_email}"}),
+    # Conditional GETs, before any route writes to the patient's data (scopes
+    # written in the last USER_CACHE_TTL_SECONDS get no ETag)
+    Route("GET", "/patients/dashboard", "patient", revalidate=True),
+    Route("GET", "/patients/prescriptions", "patient", revalidate=True),
+    Route("GET", "/patients/doctors", "patient", revalidate=True),
+    Route("GET", "/patients/medical-history", "patient", revalidate=True),
+    Route("GET", "/shared/notifications", "patient", revalidate=True),
+    # doctors.py
+    Route("GET", "/doctors/me", "doctor"),
+    Route("GET", "/doctors/patients", "doctor"),
+    Route("GET", "/doctors/patients?scope=all&search=sa", "doctor"),
+    Route("GET", "/doctors/patients/search?q=sa", "doctor"),
+    Route("GET", "/doctors/patients/{doctor_patient_id}", "doctor"),
+    Route("GET", "/doctors/patients/{doctor_patient_id}/prescriptions", "doctor"),
+    Route("GET", "/doctors/patients/{doctor_patient_id}/conditions", "doctor"),
+    Route("GET", "/doctors/patients/{doctor_patient_id}/allergies", "doctor"),
+    Route("POST", "/doctors/prescriptions", "doctor", {
+        "patient_id": "{doctor_patient_id}",
+        "medication": "Lisinopril",
+        "dosage": "10mg",
+        "frequency": "Once daily",
+        "duration": "30 days",
+    }),
+    Route("GET", "/doctors/prescriptions", "doctor"),
+    Route("GET", "/doctors/prescriptions?status=active&search=met", "doctor"),
+    Route("GET", "/doctors/prescriptions?search=sa&prescribed_from=2024-01-01", "doctor"),
+    Route("GET", "/doctors/prescriptions/{doctor_prescription_id}", "doctor"),
+    Route("PATCH", "/doctors/prescriptions/{doctor_prescription_id}", "doctor", {"instructions": "Take as directed"}),
+    # patients.py
+    Route("GET", "/patients/me", "patient"),
+    Route("GET", "/patients/dashboard", "patient"),
+    Route("GET", "/patients/prescriptions", "patient"),
+    Route("GET", "/patients/prescriptions/{patient_prescription_id}", "patient"),
+    Route("GET", "/patients/doctors", "patient"),
+    Route("GET", "/patients/doctors?search=card", "patient"),
+    Route("GET", "/patients/doctors?search=cardoilogy&specialty=Cardiology", "patient"),
+    Route("GET", "/patients/medical-history", "patient"),
+    # shared.py
+    Route("GET", "/shared/notifications", "patient"),
+    Route("PATCH", "/shared/notifications/{patient_notification_id}", "patient", {"read": True}),
+    Route("POST", "/shared/notifications/mark-all-read", "patient"),
+    Route("GET", "/shared/profile", "doctor"),
+    Route("PATCH", "/shared/profile", "doctor", {"full_name": "{doctor_full_name}"}),
+    Route("GET", "/shared/settings", "patient"),
+    Route("PATCH", "/shared/settings", "patient", {"phone": "+1 (555) 010-0000"}),
+]
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _format(value: Any, ids: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _format(item, ids) for key, item in value.items()}
+    return value
+
+
+async def _reset_database(name: str) -> None:
+    client = AsyncMongoClient(settings.mongodb_url)
+    try:
+        await client.drop_database(name)
+    finally:
+        await client.close()
+
+
+async def _load_fixtures(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Ids, credentials and auth headers of the generator's busiest doctor and patient"""
+    doctor_user = await User.find_one(User.email == "gen-doctor-0@example.com")
+    patient_user = await User.find_one(User.email == "gen-patient-0@example.com")
+    doctor = await Doctor.find_one(Doctor.user.id == doctor_user.id)
+    patient = await Patient.find_one(Patient.user.id == patient_user.id)
+
+    # The doctor's patient with the most prescriptions
+    busiest = await Prescription.aggregate([
+        {"$match": {"doctor.$id": doctor.id}},
+        {"$group": {"_id": "$patient.$id", "count": {"$sum": 1}, "prescription_id": {"$max": "$_id"}}},
+        {"$sort": {"count": -1}},
+        {"$limit": 1},
+    ]).to_list()
+    patient_prescription = await Prescription.find_one(Prescription.patient.id == patient.id)
+    notification = await Notification.find_one(Notification.user.id == patient_user.id)
+
+    ids = {
+        "password": settings.seeder_password,
+        "patient_email": patient_user.email,
+        "doctor_full_name": doctor_user.full_name,
+        "doctor_patient_id": str(busiest[0]["_id"]) if busiest else None,
+        "doctor_prescription_id": str(busiest[0]["prescription_id"]) if busiest else None,
+        "patient_prescription_id": str(patient_prescription.id) if patient_prescription else None,
+        "patient_notification_id": str(notification.id) if notification else None,
+    }
+
+    headers: Dict[Optional[str], Dict[str, str]] = {None: {}}
+    for role, user in (("doctor", doctor_user), ("patient", patient_user)):
+        response = await client.post(
+            f"{settings.api_v1_prefix}/auth/login",
+            json={"email": user.email, "password": settings.seeder_password},
+        )
+        response.raise_for_status()
+        headers[role] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return {"ids": ids, "headers": headers}
+
+
+async def _measure(
+    client: httpx.AsyncClient,
+    counter: CommandCounter,
+    route: Route,
+    fixtures: Dict[str, Any],
+    warmup: int,
+    iterations: int,
+) -> Dict[str, Any]:
+    """Time one route; returns its latency, command and status statistics"""
+    ids = fixtures["ids"]
+    template = route.path + json.dumps(route.body)
+    missing = [key for key, value in ids.items() if value is None and "{%s}" % key in template]
+    if missing:
+        return {"skipped": f"no fixture for {', '.join(missing)}"}
+
+    url = settings.api_v1_prefix + _format(route.path, ids)
+    body = _format(route.body, ids)
+    headers = fixtures["headers"][route.role]
+    if route.max_iterations is not None:
+        iterations = min(iterations, route.max_iterations)
+        warmup = min(warmup, 1)
+
+    latencies: List[float] = []
+    db_commands: List[int] = []
+    db_time: List[float] = []
+    response_bytes: List[int] = []
+    by_command: Counter = Counter()
+    statuses: Counter = Counter()
+    etag: Optional[str] = None
+    for i in range(warmup + iterations):
+        request_headers = {**headers, "If-None-Match": etag} if etag else headers
+        counter.reset()
+        started = time.perf_counter()
+        response = await client.request(route.method, url, json=body, headers=request_headers)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if route.revalidate:
+            etag = response.headers.get("etag", etag)
+        if i < warmup:
+            continue
+        latencies.append(elapsed_ms)
+        db_commands.append(sum(counter.commands.values()))
+        db_time.append(counter.duration_ms)
+        response_bytes.append(len(response.content))
+        by_command.update(counter.commands)
+        statuses[str(response.status_code)] += 1
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "status": dict(statuses),
+        "latency_ms": {
+            "mean": round(sum(latencies) / iterations, 3),
+            "min": round(latencies[0], 3),
+            "p50": round(_percentile(latencies, 0.50), 3),
+            "p90": round(_percentile(latencies, 0.90), 3),
+            "p99": round(_percentile(latencies, 0.99), 3),
+            "max": round(latencies[-1], 3),
+        },
+        "db_commands": {
+            "mean": round(sum(db_commands) / iterations, 2),
+            "max": max(db_commands),
+            "by_command": {name: round(count / iterations, 2) for name, count in sorted(by_command.items())},
+        },
+        "db_time_ms": round(sum(db_time) / iterations, 3),
+        "response_bytes": round(sum(response_bytes) / iterations),
+    }
+
+
+async def run_size(scale: float, args: argparse.Namespace, counter: CommandCounter) -> Dict[str, Any]:
+    """Load a dataset of the given scale and benchmark every route against it"""
+    counts = scaled_counts(scale)
+    settings.mongodb_database = f"{args.database_prefix}_{scale:g}".replace(".", "_")
+
+    await _reset_database(settings.mongodb_database)
+    await init_beanie(event_listeners=[counter])
+    try:
+        started = time.monotonic()
+        await DatasetGenerator(counts, seed=args.seed).run()
+        await sync_care_relationships_from_prescriptions(full=True)
+        await load_doctor_directory()
+        load_seconds = time.monotonic() - started
+
+        # Start every size with cold caches
+        user_cache.clear()
+        access_token_cache.clear()
+        care_access.clear()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url=BASE_URL) as client:
+            fixtures = await _load_fixtures(client)
+            routes = {}
+            for route in ROUTES:
+                routes[route.name] = await _measure(client, counter, route, fixtures, args.warmup, args.iterations)
+                _print_route(route.name, routes[route.name])
+        return {"counts": counts, "load_seconds": round(load_seconds, 1), "routes": routes}
+    finally:
+        await close_database()
+
+
+def _print_route(name: str, result: Dict[str, Any]) -> None:
+    if "skipped" in result:
+        print(f"  {name:<60} skipped ({result['skipped']})")
+        return
+    latency = result["latency_ms"]
+    print(
+        f"  {name:<60} p50 {latency['p50']:>8.2f}ms  p90 {latency['p90']:>8.2f}ms  "
+        f"p99 {latency['p99']:>8.2f}ms  db {result['db_commands']['mean']:>6.1f}  {result['status']}"
+    )
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Regressions of current against baseline results
+
+    A route regresses when its p50 latency grows by more than ``threshold``
+    (and by at least 1 ms) or when it sends more MongoDB commands on average.
+
+    Returns:
+        One message per regression
+    """
+    regressions = []
+    for size, result in current["results"].items():
+        baseline_routes = baseline.get("results", {}).get(size, {}).get("routes", {})
+        for name, stats in result["routes"].items():
+            before = baseline_routes.get(name)
+            if not before or "skipped" in before or "skipped" in stats:
+                continue
+            p50_before, p50_after = before["latency_ms"]["p50"], stats["latency_ms"]["p50"]
+            if p50_after > p50_before * (1 + threshold) and p50_after - p50_before >= 1:
+                regressions.append(f"[{size}] {name}: p50 {p50_before:.2f}ms -> {p50_after:.2f}ms")
+            commands_before, commands_after = before["db_commands"]["mean"], stats["db_commands"]["mean"]
+            if commands_after > commands_before:
+                regressions.append(f"[{size}] {name}: db commands {commands_before} -> {commands_after}")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _main(args: argparse.Namespace) -> int:
+    # Benchmarks log in far more often than the credential rate limits allow
+    settings.auth_rate_limit_enabled = False
+    if args.mongodb_url:
+        settings.mongodb_url = args.mongodb_url
+
+    sizes = [float(size) for size in args.sizes.split(",")]
+    counter = CommandCounter()
+    output = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+        },
+        "results": {},
+    }
+    for scale in sizes:
+        print(f"🌱 Benchmarking scale {scale:g}")
+        output["results"][f"{scale:g}"] = await run_size(scale, args, counter)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), output, args.threshold)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            return 1
+        print(f"✅ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API routes against a local mongod")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated dataset scales (default {DEFAULT_SIZES})")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help=f"measured requests per route (default {DEFAULT_ITERATIONS})")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help=f"unmeasured requests per route first (default {DEFAULT_WARMUP})")
+    parser.add_argument("--seed", type=int, default=42, help="dataset seed (default 42)")
+    parser.add_argument("--mongodb-url", help="MongoDB URL (default: MONGODB_URL)")
+    parser.add_argument("--database-prefix", default="prescribeme_bench", help="databases are named <prefix>_<scale> and dropped first")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"allowed p50 slowdown ratio (default {DEFAULT_THRESHOLD})")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,11 @@
+"""
+Shared test setup
+
+The unit tests cover in-memory code only; no MongoDB is needed. Settings
+still require the secrets below, so placeholders are set before any
+``app`` module is imported.
+"""
+import os
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+os.environ.setdefault("SEEDER_PASSWORD", "test-seeder-password")
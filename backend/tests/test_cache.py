@@ -0,0 +1,84 @@
+"""Tests for the per-worker TTL cache (app/utils/cache.py)"""
+import pytest
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_and_set(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    clock[0] += 10
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_ttl_is_capped_by_cache_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("short", 1, ttl=2)
+    cache.set("long", 2, ttl=60)
+    clock[0] += 5
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    clock[0] += 5
+    assert cache.get("long") is None
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disabled_cache_stores_nothing(clock):
+    for cache in (TTLCache(maxsize=0, ttl=10), TTLCache(maxsize=4, ttl=0)):
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+
+def test_replace_keeps_expiry(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", frozenset({1}))
+    clock[0] += 6
+    cache.replace("a", frozenset({1, 2}))
+    assert cache.get("a") == frozenset({1, 2})
+    clock[0] += 4
+    assert cache.get("a") is None
+
+
+def test_replace_missing_is_noop(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.replace("a", 1)
+    assert cache.get("a") is None
+
+
+def test_invalidate_and_clear(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None
@@ -0,0 +1,197 @@
+"""Tests for the in-process doctor directory index (app/utils/doctor_index.py)"""
+import pytest
+from bson import ObjectId
+from app.utils.doctor_index import (
+    FIELD_WEIGHTS,
+    PREFIX_QUALITY,
+    DirectoryEntry,
+    DoctorDirectoryIndex,
+)
+
+
+def entry(name, specialty, hospital="General Hospital", languages=("English",), oid=None, user_id=None):
+    oid = oid or ObjectId()
+    return DirectoryEntry(
+        id=oid,
+        user_id=user_id or ObjectId(),
+        name=name,
+        row={
+            "id": str(oid),
+            "name": name,
+            "specialty": specialty,
+            "hospital": hospital,
+            "languages": list(languages),
+        },
+    )
+
+
+@pytest.fixture
+def doctors():
+    return [
+        entry("Dr. Sarah Johnson", "Cardiology", "Heart Center", ("English", "Spanish")),
+        entry("Dr. Michael Chen", "Dermatology", "Skin Clinic", ("English", "Mandarin")),
+        entry("Dr. Emily Cardin", "Pediatrics", "Children's Hospital"),
+        entry("Dr. David Brown", "Cardiology", "General Hospital"),
+    ]
+
+
+@pytest.fixture
+def index(doctors):
+    directory = DoctorDirectoryIndex()
+    directory.replace_all(doctors)
+    return directory
+
+
+def names(hits):
+    return [hit.row["name"] for hit in hits]
+
+
+class TestBrowse:
+    def test_id_order(self, index, doctors):
+        assert [hit.id for hit in index.browse(None, None, 10)] == sorted(d.id for d in doctors)
+
+    def test_specialty_is_case_insensitive(self, index):
+        assert sorted(names(index.browse("cardiology", None, 10))) == ["Dr. David Brown", "Dr. Sarah Johnson"]
+        assert index.browse("Neurology", None, 10) == []
+
+    def test_pages_after_id(self, index):
+        first = index.browse(None, None, 2)
+        second = index.browse(None, first[-1].id, 10)
+        assert [hit.id for hit in first + second] == [hit.id for hit in index.browse(None, None, 10)]
+
+
+class TestRanking:
+    def test_name_outranks_specialty(self, index):
+        # "cardin" is a surname token; "cardiology" only prefix-matches "cardi"
+        hits = index.search("cardi", None, None, 10)
+        assert names(hits)[0] == "Dr. Emily Cardin"
+        assert hits[0].score == pytest.approx(FIELD_WEIGHTS["name"] * PREFIX_QUALITY)
+
+    def test_exact_outranks_prefix(self):
+        directory = DoctorDirectoryIndex()
+        directory.replace_all([entry("Ann Lee", "Surgery"), entry("Anna Lee", "Surgery")])
+        assert names(directory.search("ann", None, None, 10)) == ["Ann Lee", "Anna Lee"]
+
+    def test_every_term_must_match(self, index):
+        assert names(index.search("cardiology spanish", None, None, 10)) == ["Dr. Sarah Johnson"]
+        assert index.search("cardiology mandarin", None, None, 10) == []
+
+    def test_scores_add_up_over_terms(self, index):
+        [hit] = index.search("sarah johnson", None, None, 10)
+        assert hit.score == pytest.approx(2 * FIELD_WEIGHTS["name"])
+
+    def test_title_is_not_indexed(self, index):
+        assert index.search("dr", None, None, 10) == []
+
+    def test_specialty_filter(self, index):
+        assert names(index.search("hospital", "Cardiology", None, 10)) == ["Dr. David Brown"]
+
+    def test_query_without_terms(self, index):
+        assert index.search("  !! ", None, None, 10) == []
+
+
+class TestFuzzy:
+    def test_misspelling_matches(self, index):
+        assert set(names(index.search("cardoilogy", None, None, 10))) == {
+            "Dr. Sarah Johnson",
+            "Dr. David Brown",
+        }
+
+    def test_fuzzy_ranks_below_exact(self, index):
+        exact = index.search("cardiology", None, None, 10)[0].score
+        fuzzy = index.search("cardoilogy", None, None, 10)[0].score
+        assert fuzzy < exact
+
+    def test_short_terms_are_not_fuzzy(self, index):
+        assert index.search("xe", None, None, 10) == []
+
+    def test_unrelated_term(self, index):
+        assert index.search("orthopedics", None, None, 10) == []
+
+
+class TestSearchKeyset:
+    def test_pages_follow_ranking(self):
+        directory = DoctorDirectoryIndex()
+        directory.replace_all(
+            [entry(f"Lee {n}", "Cardiology") for n in range(5)]
+            + [entry("Cardio Smith", "Surgery"), entry("Ann Cardoso", "Pediatrics")]
+        )
+        full = directory.search("cardio", None, None, 50)
+        pages, after = [], None
+        while True:
+            page = directory.search("cardio", None, after, 2)
+            if not page:
+                break
+            pages += page
+            after = (page[-1].score, page[-1].id)
+        assert [hit.id for hit in pages] == [hit.id for hit in full]
+        assert len(full) == 7
+        scores = [hit.score for hit in full]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_ties_are_ordered_by_id(self):
+        directory = DoctorDirectoryIndex()
+        doctors = [entry(f"Lee {n}", "Cardiology") for n in range(4)]
+        directory.replace_all(doctors)
+        hits = directory.search("cardiology", None, None, 10)
+        assert [hit.id for hit in hits] == sorted(d.id for d in doctors)
+
+
+class TestWrites:
+    def test_upsert_and_remove(self, index, doctors):
+        index.upsert(doctors[1]._replace(row={**doctors[1].row, "specialty": "Neurology"}))
+        assert names(index.search("neurology", None, None, 10)) == ["Dr. Michael Chen"]
+        assert index.search("dermatology", None, None, 10) == []
+        index.remove(doctors[1].id)
+        assert index.search("neurology", None, None, 10) == []
+        assert index.browse("Neurology", None, 10) == []
+        assert index.stats()["doctors"] == 3
+
+    def test_rename_user(self, index, doctors):
+        index.rename_user(doctors[0].user_id, "Dr. Sarah Miller")
+        assert index.search("johnson", None, None, 10) == []
+        assert names(index.search("miller", None, None, 10)) == ["Dr. Sarah Miller"]
+        assert index.user_name(doctors[0].user_id) == "Dr. Sarah Miller"
+
+    def test_fingerprint_tracks_rows(self, doctors):
+        first, second = DoctorDirectoryIndex(), DoctorDirectoryIndex()
+        first.replace_all(doctors)
+        second.replace_all(reversed(doctors))
+        assert first.fingerprint == second.fingerprint
+        before = first.fingerprint
+        first.rename_user(doctors[0].user_id, "Dr. Sarah Miller")
+        assert first.fingerprint != before
+
+
+class TestReload:
+    def test_writes_during_reload_are_replayed(self, index, doctors):
+        added = entry("Dr. Nina Patel", "Neurology")
+        index.begin_reload()
+        assert index.tracking
+        index.upsert(added)
+        index.remove(doctors[1].id)
+        index.rename_user(doctors[0].user_id, "Dr. Sarah Miller")
+        # The reload read MongoDB before those writes
+        index.replace_all(doctors)
+        assert names(index.search("patel", None, None, 10)) == ["Dr. Nina Patel"]
+        assert index.search("chen", None, None, 10) == []
+        assert index.user_name(doctors[0].user_id) == "Dr. Sarah Miller"
+        assert len(index) == 4
+
+    def test_replay_stops_after_reload(self, index, doctors):
+        index.begin_reload()
+        index.replace_all(doctors)
+        index.remove(doctors[1].id)
+        index.replace_all(doctors)
+        assert len(index) == 4
+
+    def test_abort_reload(self, doctors):
+        directory = DoctorDirectoryIndex()
+        assert not directory.tracking
+        directory.begin_reload()
+        directory.upsert(doctors[0])
+        directory.abort_reload()
+        assert not directory.tracking
+        assert not directory.loaded
+        directory.replace_all(doctors[1:])
+        assert len(directory) == 3
@@ -0,0 +1,139 @@
+"""Tests for keyset cursors (app/database/pagination.py, app/dependencies/pagination.py)"""
+import base64
+import json
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+from app.database.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+from app.dependencies.pagination import NEXT_CURSOR_HEADER, PageParams
+
+
+DATE_ORDER = [("prescribed_date", -1), ("_id", -1)]
+SCORE_ORDER = [("_score", -1), ("_id", 1)]
+ID_ORDER = [("_id", 1)]
+
+WHEN = datetime(2025, 11, 1, 9, 30)
+OID = ObjectId("65f1c0ffee0000000000abcd")
+
+
+def raw_cursor(payload: str) -> str:
+    """Encode arbitrary JSON the way encode_cursor does"""
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+class TestCursorRoundTrip:
+    def test_date_and_id(self):
+        values = decode_cursor(encode_cursor([WHEN, OID]), DATE_ORDER)
+        assert values[0].replace(tzinfo=None) == WHEN
+        assert values[1] == OID
+
+    def test_score_and_id(self):
+        assert decode_cursor(encode_cursor([2.5, OID]), SCORE_ORDER) == [2.5, OID]
+
+    def test_integer_score(self):
+        assert decode_cursor(encode_cursor([3, OID]), SCORE_ORDER) == [3, OID]
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor([WHEN, OID])
+        assert "=" not in cursor
+        assert "+" not in cursor and "/" not in cursor
+
+
+class TestInvalidCursor:
+    @pytest.mark.parametrize("cursor", ["not base64 !", "%%%", raw_cursor("{not json")])
+    def test_malformed(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, ID_ORDER)
+
+    def test_not_a_list(self):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(raw_cursor(json.dumps({"_id": "x"})), ID_ORDER)
+
+    def test_length_mismatch(self):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor([OID]), DATE_ORDER)
+
+    @pytest.mark.parametrize("payload", [
+        '["abc"]',
+        '[{"$ne": null}]',
+        '[123]',
+        '[null]',
+    ])
+    def test_id_must_be_object_id(self, payload):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(raw_cursor(payload), ID_ORDER)
+
+    def test_operator_injection(self):
+        cursor = raw_cursor('[{"$ne": null}, {"$oid": "%s"}]' % OID)
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, DATE_ORDER)
+
+    def test_date_must_be_datetime(self):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor(["2025-11-01", OID]), DATE_ORDER)
+
+    @pytest.mark.parametrize("score", [True, "1.5", None])
+    def test_score_must_be_number(self, score):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor([score, OID]), SCORE_ORDER)
+
+    def test_score_must_be_finite(self):
+        cursor = raw_cursor('[{"$numberDouble": "NaN"}, {"$oid": "%s"}]' % OID)
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, SCORE_ORDER)
+
+
+class TestKeysetFilter:
+    def test_descending(self):
+        assert keyset_filter(DATE_ORDER, [WHEN, OID]) == {"$or": [
+            {"prescribed_date": {"$lt": WHEN}},
+            {"prescribed_date": WHEN, "_id": {"$lt": OID}},
+        ]}
+
+    def test_mixed_directions(self):
+        assert keyset_filter(SCORE_ORDER, [1.5, OID]) == {"$or": [
+            {"_score": {"$lt": 1.5}},
+            {"_score": 1.5, "_id": {"$gt": OID}},
+        ]}
+
+    def test_single_field(self):
+        assert keyset_filter(ID_ORDER, [OID]) == {"$or": [{"_id": {"$gt": OID}}]}
+
+    def test_rejects_mismatched_values(self):
+        with pytest.raises(InvalidCursor):
+            keyset_filter(DATE_ORDER, ["yesterday", OID])
+        with pytest.raises(InvalidCursor):
+            keyset_filter(DATE_ORDER, [WHEN])
+
+
+class TestPageParams:
+    def params(self, cursor=None, limit=2) -> PageParams:
+        return PageParams(Response(), limit=limit, cursor=cursor)
+
+    def test_first_page(self):
+        assert self.params().after(ID_ORDER) is None
+
+    def test_invalid_cursor_is_bad_request(self):
+        with pytest.raises(HTTPException) as exc:
+            self.params(cursor=raw_cursor('["abc"]')).after(ID_ORDER)
+        assert exc.value.status_code == 400
+
+    def test_page_sets_next_cursor(self):
+        params = self.params(limit=2)
+        ids = [ObjectId() for _ in range(3)]
+        rows = params.page(ids, lambda row: [row])
+        assert rows == ids[:2]
+        cursor = params.response.headers[NEXT_CURSOR_HEADER]
+        assert decode_cursor(cursor, ID_ORDER) == [ids[1]]
+
+    def test_last_page_has_no_cursor(self):
+        params = self.params(limit=2)
+        ids = [ObjectId() for _ in range(2)]
+        assert params.page(ids, lambda row: [row]) == ids
+        assert NEXT_CURSOR_HEADER not in params.response.headers
@@ -0,0 +1,80 @@
+"""Tests for prescription history search (app/database/prescription_search.py)"""
+import asyncio
+import re
+import pytest
+from bson import ObjectId
+from app.config.settings import settings
+from app.database import prescription_search
+from app.models import Prescription
+
+
+DOCTOR = {"doctor.$id": "doctor-1"}
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self):
+        return self.rows
+
+
+@pytest.fixture
+def pipelines(monkeypatch):
+    """Capture the pipelines search_prescriptions runs instead of querying MongoDB"""
+    seen = []
+
+    def aggregate(stages):
+        seen.append(stages)
+        return FakeCursor([])
+
+    monkeypatch.setattr(Prescription, "aggregate", aggregate)
+    return seen
+
+
+def keys_of(medication, generic_name=None, patient_name=None):
+    return Prescription.search_fields(medication, generic_name, patient_name)["search_keys"]
+
+
+def test_default_mode_matches_partial_words(monkeypatch, pipelines):
+    monkeypatch.setattr(settings, "prescription_search_mode", "auto")
+    monkeypatch.setattr(prescription_search, "_text_available", True)
+    asyncio.run(prescription_search.search_prescriptions(DOCTOR, "met", None, 10))
+
+    search = pipelines[0][0]["$match"]
+    assert "$text" not in search
+    assert search["search_keys"] == {"$all": ["met"]}
+    assert "met" in keys_of("Metformin", "metformin hydrochloride", "Sarah Johnson")
+    assert "sar" in keys_of("Metformin", "metformin hydrochloride", "Sarah Johnson")
+
+
+def test_text_mode_uses_text_index(monkeypatch, pipelines):
+    monkeypatch.setattr(settings, "prescription_search_mode", "text")
+    monkeypatch.setattr(prescription_search, "_text_available", True)
+    asyncio.run(prescription_search.search_prescriptions(DOCTOR, "metformin", None, 10))
+
+    assert pipelines[0][0]["$match"]["$text"] == {"$search": '"metformin"'}
+
+
+def test_unsearchable_query_runs_nothing(pipelines):
+    assert asyncio.run(prescription_search.search_prescriptions(DOCTOR, "!!", None, 10)) == []
+    assert pipelines == []
+
+
+def test_whole_words_outrank_prefixes():
+    whole = prescription_search._whole_word("met")
+    prefix = prescription_search._word_prefix("met")
+    assert re.search(prefix, "Metformin", re.I)
+    assert not re.search(whole, "Metformin", re.I)
+    assert re.search(whole, "Met 500", re.I)
+    assert not re.search(prefix, "Sumetriptan", re.I)
+
+
+def test_search_pipeline_joins_list_filters_and_cursor():
+    stages = prescription_search.search_pipeline(
+        {**DOCTOR, "status": "active"}, "met sar", [4, ObjectId()], 20, text=False
+    )
+    assert stages[0]["$match"]["status"] == "active"
+    assert stages[0]["$match"]["search_keys"] == {"$all": ["met", "sar"]}
+    assert stages[-2] == {"$sort": {"_score": -1, "_id": -1}}
+    assert stages[-1] == {"$limit": 20}
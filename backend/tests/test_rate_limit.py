@@ -0,0 +1,110 @@
+"""Tests for token-bucket rate limiting (app/utils/rate_limit.py)"""
+import asyncio
+import pytest
+from app.utils import rate_limit as rate_limit_module
+from app.utils.rate_limit import InMemoryRateLimitStore, TokenBucketLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def limiter(capacity=3, per_minute=60, max_keys=100) -> TokenBucketLimiter:
+    return TokenBucketLimiter("test", InMemoryRateLimitStore(max_keys), capacity, per_minute)
+
+
+def hits(limiter: TokenBucketLimiter, key: str, count: int) -> list:
+    async def run():
+        return [await limiter.hit(key) for _ in range(count)]
+    return asyncio.run(run())
+
+
+def test_burst_then_reject(clock):
+    bucket = limiter(capacity=3, per_minute=60)
+    results = hits(bucket, "ip", 4)
+    assert results[:3] == [0, 0, 0]
+    assert results[3] == pytest.approx(1.0)
+    assert bucket.stats() == {"allowed": 3, "rejected": 1}
+
+
+def test_refill(clock):
+    bucket = limiter(capacity=3, per_minute=60)
+    hits(bucket, "ip", 3)
+    clock[0] += 1
+    assert hits(bucket, "ip", 2) == [0, pytest.approx(1.0)]
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = limiter(capacity=2, per_minute=60)
+    hits(bucket, "ip", 2)
+    clock[0] += 3600
+    assert hits(bucket, "ip", 3)[2] > 0
+
+
+def test_keys_are_independent(clock):
+    bucket = limiter(capacity=1)
+    assert hits(bucket, "a", 2)[1] > 0
+    assert hits(bucket, "b", 1) == [0]
+
+
+def test_check_does_not_take_tokens(clock):
+    bucket = limiter(capacity=2)
+
+    async def run():
+        checks = [await bucket.check("email") for _ in range(5)]
+        await bucket.charge("email")
+        await bucket.charge("email")
+        return checks, await bucket.check("email")
+
+    checks, after_charges = asyncio.run(run())
+    assert checks == [0] * 5
+    assert after_charges > 0
+    assert bucket.stats() == {"allowed": 5, "rejected": 1}
+
+
+def test_least_recently_used_bucket_is_dropped(clock):
+    bucket = limiter(capacity=1, max_keys=2)
+    hits(bucket, "a", 1)
+    hits(bucket, "b", 1)
+    hits(bucket, "c", 1)
+    # "a" was dropped and starts full again; "c" is still empty
+    assert hits(bucket, "a", 1) == [0]
+    assert hits(bucket, "c", 1)[0] > 0
+
+
+
+@pytest.fixture
+def auth_limits(clock, monkeypatch):
+    """Credential endpoint limiters on a fresh store, two failures per email"""
+    store = InMemoryRateLimitStore(100)
+    monkeypatch.setattr(rate_limit_module.settings, "auth_rate_limit_enabled", True)
+    monkeypatch.setattr(rate_limit_module.auth_ip_limiter, "store", store)
+    monkeypatch.setattr(rate_limit_module.auth_email_limiter, "store", store)
+    monkeypatch.setattr(rate_limit_module.auth_email_limiter, "capacity", 2)
+
+
+def test_failed_logins_are_counted_per_client(auth_limits):
+    async def run():
+        for _ in range(2):
+            await rate_limit_module.charge_auth_email("Owner@x.com", "login", "10.0.0.9")
+        return (
+            await rate_limit_module.check_auth_rate_limit("10.0.0.9", "owner@x.com", "login"),
+            await rate_limit_module.check_auth_rate_limit("10.0.0.1", "owner@x.com", "login"),
+        )
+
+    attacker, owner = asyncio.run(run())
+    assert attacker > 0
+    assert owner == 0
+
+
+def test_reset_requests_are_counted_per_email(auth_limits):
+    async def run():
+        for _ in range(2):
+            await rate_limit_module.charge_auth_email("owner@x.com", "reset")
+        return await rate_limit_module.check_auth_rate_limit("10.0.0.1", "owner@x.com", "reset")
+
+    assert asyncio.run(run()) > 0
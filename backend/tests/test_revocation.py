@@ -0,0 +1,70 @@
+"""Tests for the access token revocation filter (app/utils/revocation.py)"""
+from datetime import datetime
+import pytest
+from app.utils import revocation as revocation_module
+from app.utils.revocation import RevocationFilter, to_timestamp
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time"""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(revocation_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_to_timestamp():
+    assert to_timestamp(datetime(1970, 1, 1, 0, 1, 0, 500000)) == 60.5
+
+
+def test_tokens_issued_before_revocation_are_rejected():
+    revoked = RevocationFilter(retention_seconds=900)
+    revoked.revoke("u1", 100.0)
+    assert revoked.is_revoked("u1", 99.0)
+    assert revoked.is_revoked("u1", 100.0)
+    assert not revoked.is_revoked("u1", 101.0)
+    assert not revoked.is_revoked("u2", 50.0)
+    assert revoked.stats()["rejections"] == 2
+
+
+def test_tokens_without_iat_are_rejected():
+    revoked = RevocationFilter(retention_seconds=900)
+    revoked.revoke("u1", 100.0)
+    assert revoked.is_revoked("u1", None)
+
+
+def test_later_revocation_wins():
+    revoked = RevocationFilter(retention_seconds=900)
+    revoked.revoke("u1", 200.0)
+    revoked.revoke("u1", 100.0)
+    assert revoked.is_revoked("u1", 150.0)
+
+
+def test_ids_are_compared_as_strings():
+    class Id:
+        def __str__(self):
+            return "u1"
+
+    revoked = RevocationFilter(retention_seconds=900)
+    revoked.revoke(Id(), 100.0)
+    assert revoked.is_revoked("u1", 50.0)
+
+
+def test_refresh_drops_entries_past_retention(clock):
+    revoked = RevocationFilter(retention_seconds=900)
+    revoked.revoke("old", clock[0] - 901)
+    revoked.revoke("recent", clock[0] - 10)
+    revoked.mark_refreshed()
+    assert not revoked.is_revoked("old", clock[0] - 1000)
+    assert revoked.is_revoked("recent", clock[0] - 20)
+    assert revoked.stats()["size"] == 1
+
+
+def test_freshness(clock):
+    revoked = RevocationFilter(retention_seconds=900)
+    assert not revoked.is_fresh(60)
+    revoked.mark_refreshed()
+    clock[0] += 60
+    assert revoked.is_fresh(60)
+    clock[0] += 1
+    assert not revoked.is_fresh(60)
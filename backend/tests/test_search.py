@@ -0,0 +1,55 @@
+"""Tests for search key normalization (app/utils/search.py)"""
+from app.utils.search import (
+    SEARCH_PREFIX_MAX,
+    normalize_text,
+    phone_terms,
+    prefix_keys,
+    query_prefixes,
+    search_terms,
+    trigrams,
+)
+
+
+def test_normalize_text_strips_accents_and_case():
+    assert normalize_text("José ÁLVAREZ") == "jose alvarez"
+    assert normalize_text(None) == ""
+    assert normalize_text("") == ""
+
+
+def test_search_terms_split_on_punctuation():
+    assert search_terms("Sarah.Johnson@gmail.com") == ["sarah", "johnson", "gmail", "com"]
+    assert search_terms("  ") == []
+
+
+def test_phone_terms_add_digits_and_national_number():
+    terms = phone_terms("+1 (555) 123-4567")
+    assert terms[:4] == ["1", "555", "123", "4567"]
+    assert "15551234567" in terms
+    assert "5551234567" in terms
+    assert phone_terms(None) == []
+
+
+def test_prefix_keys_are_deduplicated():
+    assert prefix_keys(["ann", "anna"]) == ["a", "an", "ann", "anna"]
+
+
+def test_prefix_keys_stop_at_max_length():
+    keys = prefix_keys(["x" * (SEARCH_PREFIX_MAX + 5)])
+    assert len(keys) == SEARCH_PREFIX_MAX
+    assert max(len(key) for key in keys) == SEARCH_PREFIX_MAX
+
+
+def test_query_prefixes_longest_first():
+    assert query_prefixes("jo  SARAH jo") == ["sarah", "jo"]
+    assert query_prefixes("!!") == []
+
+
+def test_query_prefixes_match_stored_keys_when_truncated():
+    term = "a" * (SEARCH_PREFIX_MAX + 3)
+    assert query_prefixes(term) == [term[:SEARCH_PREFIX_MAX]]
+    assert query_prefixes(term)[0] in prefix_keys([term])
+
+
+def test_trigrams_are_padded():
+    assert trigrams("abc") == ["  a", " ab", "abc", "bc "]
+    assert trigrams("a") == ["  a", " a "]
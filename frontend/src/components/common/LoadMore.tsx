@@ -0,0 +1,31 @@
+import React from 'react';
+import Button from './Button';
+
+interface LoadMoreProps {
+  hasMore: boolean;
+  isLoading: boolean;
+  onLoadMore: () => void;
+  className?: string;
+}
+
+/**
+ * "Load more" button for cursor-paginated lists (hidden on the last page)
+ */
+const LoadMore: React.FC<LoadMoreProps> = ({
+  hasMore,
+  isLoading,
+  onLoadMore,
+  className = '',
+}) => {
+  if (!hasMore) return null;
+
+  return (
+    <div className={`flex justify-center ${className}`}>
+      <Button variant="secondary" size="sm" isLoading={isLoading} onClick={onLoadMore}>
+        Load more
+      </Button>
+    </div>
+  );
+};
+
+export default LoadMore;
@@ -6,3 +6,4 @@ export { default as SearchBar } from './SearchBar';
 export { default as Table } from './Table';
 export { default as Modal } from './Modal';
 export { default as Tabs } from './Tabs';
+export { default as LoadMore } from './LoadMore';
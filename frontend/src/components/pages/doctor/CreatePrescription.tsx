@@ -1,10 +1,10 @@
-import React, { useMemo, useState } from "react";
+import React, { useEffect, useMemo, useState } from "react";
 import { useNavigate, useSearchParams } from "react-router-dom";
 import { useForm } from "react-hook-form";
 import { zodResolver } from "@hookform/resolvers/zod";
 import { z } from "zod";
-import { Button, Input, Badge, Modal } from "../../common";
-import { useApiGet, useApiPost } from "../../../hooks/useApi";
+import { Button, Input, Badge, LoadMore, Modal, SearchBar } from "../../common";
+import { useApiGet, useApiGetPaged, useApiPost } from "../../../hooks/useApi";
 
 const prescriptionSchema = z.object({
   patientId: z.string().min(1, "Please select a patient"),
@@ -31,9 +31,50 @@ const CreatePrescription: React.FC = () => {
   const [searchParams] = useSearchParams();
   const preSelectedPatientId = searchParams.get("patientId");
 
-  const { data: patientsData, isLoading: patientsLoading } = useApiGet<
-    ApiPatient[]
-  >(["doctor-patients-all"], "/api/v1/doctors/patients?scope=all");
+  const [patientQuery, setPatientQuery] = useState("");
+  const [debouncedQuery, setDebouncedQuery] = useState("");
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedQuery(patientQuery.trim()), 200);
+    return () => clearTimeout(timer);
+  }, [patientQuery]);
+
+  const {
+    items: patients,
+    isLoading: patientsLoading,
+    hasNextPage: hasMorePatients,
+    isFetchingNextPage: loadingMorePatients,
+    fetchNextPage: fetchMorePatients,
+  } = useApiGetPaged<ApiPatient>(
+    ["doctor-patients-all"],
+    "/api/v1/doctors/patients?scope=all"
+  );
+
+  // A patient preselected from their profile may not be on a loaded page
+  const preselectedMissing =
+    !!preSelectedPatientId &&
+    !patientsLoading &&
+    !patients.some((p) => p.id === preSelectedPatientId);
+  const { data: preselectedProfile } = useApiGet<{
+    id: string;
+    name: string;
+    age?: number | null;
+  }>(
+    ["patient", preSelectedPatientId || ""],
+    `/api/v1/doctors/patients/${preSelectedPatientId}`,
+    { enabled: preselectedMissing }
+  );
+  const { items: preselectedAllergies } = useApiGetPaged<{ allergen: string }>(
+    ["patient-allergies", preSelectedPatientId || ""],
+    `/api/v1/doctors/patients/${preSelectedPatientId}/allergies`,
+    { enabled: preselectedMissing }
+  );
+
+  // Typeahead over the full directory once the doctor starts typing
+  const { data: matchesData, isLoading: matchesLoading } = useApiGet<ApiPatient[]>(
+    ["doctor-patient-search", debouncedQuery],
+    `/api/v1/doctors/patients/search?q=${encodeURIComponent(debouncedQuery)}&limit=20`,
+    { enabled: debouncedQuery.length > 0 }
+  );
 
   const createMutation = useApiPost<{ id: string }>(
     "/api/v1/doctors/prescriptions"
@@ -43,6 +84,7 @@ const CreatePrescription: React.FC = () => {
   const [selectedPatientId, setSelectedPatientId] = useState(
     preSelectedPatientId || ""
   );
+  const [pickedPatient, setPickedPatient] = useState<ApiPatient | null>(null);
   const [showSuccessModal, setShowSuccessModal] = useState(false);
   const [formError, setFormError] = useState<string | null>(null);
 
@@ -60,13 +102,26 @@ const CreatePrescription: React.FC = () => {
     },
   });
 
-  const patients = patientsData || [];
+  const pickerPatients = debouncedQuery ? matchesData || [] : patients;
+  const pickerLoading = debouncedQuery ? matchesLoading : patientsLoading;
   const selectedPatient = useMemo(() => {
     if (!selectedPatientId) return null;
-    return patients.find((p) => p.id === selectedPatientId) || null;
-  }, [patients, selectedPatientId]);
+    if (pickedPatient?.id === selectedPatientId) return pickedPatient;
+    const listed = patients.find((p) => p.id === selectedPatientId);
+    if (listed) return listed;
+    if (preselectedProfile?.id === selectedPatientId) {
+      return {
+        id: preselectedProfile.id,
+        name: preselectedProfile.name,
+        age: preselectedProfile.age ?? null,
+        allergies: preselectedAllergies.map((a) => a.allergen),
+      };
+    }
+    return null;
+  }, [patients, pickedPatient, selectedPatientId, preselectedProfile, preselectedAllergies]);
 
   const handlePatientSelect = (patient: ApiPatient) => {
+    setPickedPatient(patient);
     setSelectedPatientId(patient.id);
     setValue("patientId", patient.id);
     setShowPatientModal(false);
@@ -97,6 +152,7 @@ const CreatePrescription: React.FC = () => {
         notes: "",
       });
       setSelectedPatientId("");
+      setPickedPatient(null);
     } catch (e: unknown) {
       const err = e as { message?: string };
       setFormError(err.message || "Failed to create prescription");
@@ -336,13 +392,19 @@ const CreatePrescription: React.FC = () => {
         title="Select Patient"
         size="md"
       >
-        {patientsLoading ? (
+        <SearchBar
+          placeholder="Search by name, email, or phone..."
+          value={patientQuery}
+          onChange={setPatientQuery}
+          className="mb-4"
+        />
+        {pickerLoading ? (
           <p className="text-gray-500 text-center py-8">Loading patients...</p>
-        ) : patients.length === 0 ? (
+        ) : pickerPatients.length === 0 ? (
           <p className="text-gray-500 text-center py-8">No patients found.</p>
         ) : (
           <div className="space-y-3 max-h-96 overflow-y-auto">
-            {patients.map((patient) => (
+            {pickerPatients.map((patient) => (
               <button
                 key={patient.id}
                 type="button"
@@ -372,6 +434,13 @@ const CreatePrescription: React.FC = () => {
                 </div>
               </button>
             ))}
+            {!debouncedQuery && (
+              <LoadMore
+                hasMore={hasMorePatients}
+                isLoading={loadingMorePatients}
+                onLoadMore={() => fetchMorePatients()}
+              />
+            )}
           </div>
         )}
       </Modal>
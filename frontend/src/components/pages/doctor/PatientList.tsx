@@ -1,8 +1,8 @@
 import React, { useState, useMemo } from "react";
 import { useNavigate } from "react-router-dom";
-import { SearchBar, Table, Badge, Button } from "../../common";
+import { SearchBar, Table, Badge, Button, LoadMore } from "../../common";
 import type { Column } from "../../common/Table";
-import { useApiGet } from "../../../hooks/useApi";
+import { useApiGetPaged } from "../../../hooks/useApi";
 
 interface Patient {
   id: string;
@@ -70,15 +70,19 @@ const PatientList: React.FC = () => {
   const [searchQuery, setSearchQuery] = useState("");
 
   // Fetch patients from API
-  const { data: patientsData, isLoading } = useApiGet<Patient[]>(
+  const {
+    items: patients,
+    isLoading,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  } = useApiGetPaged<Patient>(
     ["patients", searchQuery],
     `/api/v1/doctors/patients${
       searchQuery ? `?search=${encodeURIComponent(searchQuery)}` : ""
     }`
   );
 
-  const patients = patientsData || [];
-
   const filteredPatients = useMemo(() => {
     if (!searchQuery) return patients;
     return patients.filter(
@@ -364,6 +368,11 @@ const PatientList: React.FC = () => {
           }
         />
       </div>
+      <LoadMore
+        hasMore={hasNextPage}
+        isLoading={isFetchingNextPage}
+        onLoadMore={() => fetchNextPage()}
+      />
     </div>
   );
 };
@@ -1,8 +1,8 @@
 import React, { useState } from "react";
 import { useNavigate, useParams } from "react-router-dom";
-import { Button, Badge, Tabs } from "../../common";
+import { Button, Badge, LoadMore, Tabs } from "../../common";
 import type { Tab } from "../../common/Tabs";
-import { useApiGet } from "../../../hooks/useApi";
+import { useApiGet, useApiGetPaged } from "../../../hooks/useApi";
 
 interface Prescription {
   id: string;
@@ -52,19 +52,19 @@ const PatientProfile: React.FC = () => {
   }>(["patient", patientId || ""], `/api/v1/doctors/patients/${patientId}`);
 
   // Fetch patient prescriptions
-  const { data: prescriptionsData } = useApiGet<Prescription[]>(
+  const prescriptionsQuery = useApiGetPaged<Prescription>(
     ["patient-prescriptions", patientId || ""],
     `/api/v1/doctors/patients/${patientId}/prescriptions`
   );
 
   // Fetch patient conditions
-  const { data: conditionsData } = useApiGet<MedicalHistory[]>(
+  const conditionsQuery = useApiGetPaged<MedicalHistory>(
     ["patient-conditions", patientId || ""],
     `/api/v1/doctors/patients/${patientId}/conditions`
   );
 
   // Fetch patient allergies
-  const { data: allergiesData } = useApiGet<Allergy[]>(
+  const allergiesQuery = useApiGetPaged<Allergy>(
     ["patient-allergies", patientId || ""],
     `/api/v1/doctors/patients/${patientId}/allergies`
   );
@@ -141,7 +141,7 @@ const PatientProfile: React.FC = () => {
   //   },
   // ];
 
-  const prescriptions = prescriptionsData || [];
+  const prescriptions = prescriptionsQuery.items;
 
   // const medicalHistory: MedicalHistory[] = [
   //   {
@@ -160,7 +160,7 @@ const PatientProfile: React.FC = () => {
   //   },
   // ];
 
-  const medicalHistory = conditionsData || [];
+  const medicalHistory = conditionsQuery.items;
 
   // const allergies: Allergy[] = [
   //   {
@@ -177,7 +177,7 @@ const PatientProfile: React.FC = () => {
   //   },
   // ];
 
-  const allergies = allergiesData || [];
+  const allergies = allergiesQuery.items;
 
   const tabs: Tab[] = [
     { key: "overview", label: "Overview" },
@@ -445,6 +445,11 @@ const PatientProfile: React.FC = () => {
                   </div>
                 </div>
               ))}
+              <LoadMore
+                hasMore={prescriptionsQuery.hasNextPage}
+                isLoading={prescriptionsQuery.isFetchingNextPage}
+                onLoadMore={() => prescriptionsQuery.fetchNextPage()}
+              />
             </div>
           )}
 
@@ -489,6 +494,11 @@ const PatientProfile: React.FC = () => {
                   </div>
                 </div>
               ))}
+              <LoadMore
+                hasMore={conditionsQuery.hasNextPage}
+                isLoading={conditionsQuery.isFetchingNextPage}
+                onLoadMore={() => conditionsQuery.fetchNextPage()}
+              />
             </div>
           )}
 
@@ -525,6 +535,11 @@ const PatientProfile: React.FC = () => {
                   </div>
                 </div>
               ))}
+              <LoadMore
+                hasMore={allergiesQuery.hasNextPage}
+                isLoading={allergiesQuery.isFetchingNextPage}
+                onLoadMore={() => allergiesQuery.fetchNextPage()}
+              />
             </div>
           )}
 
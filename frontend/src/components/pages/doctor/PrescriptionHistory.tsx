@@ -1,8 +1,8 @@
-import React, { useState, useMemo } from "react";
+import React, { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
-import { SearchBar, Table, Badge, Button } from "../../common";
+import { SearchBar, Table, Badge, Button, LoadMore } from "../../common";
 import type { Column } from "../../common/Table";
-import { useApiGet } from "../../../hooks/useApi";
+import { useApiGetPaged } from "../../../hooks/useApi";
 
 interface Prescription {
   id: string;
@@ -96,39 +96,29 @@ interface Prescription {
 const PrescriptionHistory: React.FC = () => {
   const navigate = useNavigate();
   const [searchQuery, setSearchQuery] = useState("");
+  const [debouncedQuery, setDebouncedQuery] = useState("");
   const [statusFilter, setStatusFilter] = useState<string>("all");
 
-  // Fetch prescriptions from API
-  const { data: prescriptionsData, isLoading } = useApiGet<Prescription[]>(
-    ["prescriptions", statusFilter, searchQuery],
-    `/api/v1/doctors/prescriptions${
-      statusFilter && statusFilter !== "all" ? `?status=${statusFilter}` : ""
-    }${
-      searchQuery
-        ? `${
-            statusFilter && statusFilter !== "all" ? "&" : "?"
-          }search=${encodeURIComponent(searchQuery)}`
-        : ""
-    }`
-  );
-
-  const prescriptions = prescriptionsData || [];
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedQuery(searchQuery.trim()), 200);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
 
-  const filteredPrescriptions = useMemo(() => {
-    if (!searchQuery) return prescriptions;
-    return prescriptions.filter((prescription) => {
-      const matchesSearch =
-        prescription.patientName
-          .toLowerCase()
-          .includes(searchQuery.toLowerCase()) ||
-        prescription.medication
-          .toLowerCase()
-          .includes(searchQuery.toLowerCase());
-      const matchesStatus =
-        statusFilter === "all" || prescription.status === statusFilter;
-      return matchesSearch && matchesStatus;
-    });
-  }, [prescriptions, searchQuery, statusFilter]);
+  // Fetch prescriptions from API (search is ranked server-side)
+  const params = new URLSearchParams();
+  if (statusFilter && statusFilter !== "all") params.set("status", statusFilter);
+  if (debouncedQuery) params.set("search", debouncedQuery);
+  const query = params.toString();
+  const {
+    items: prescriptions,
+    isLoading,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  } = useApiGetPaged<Prescription>(
+    ["prescriptions", statusFilter, debouncedQuery],
+    `/api/v1/doctors/prescriptions${query ? `?${query}` : ""}`
+  );
 
   if (isLoading) {
     return (
@@ -439,7 +429,7 @@ const PrescriptionHistory: React.FC = () => {
       <div className="bg-white rounded-lg shadow-sm border border-gray-200 overflow-hidden">
         <Table
           columns={columns}
-          data={filteredPrescriptions}
+          data={prescriptions}
           onRowClick={(prescription) =>
             navigate(`/dashboard/prescriptions/${prescription.id}`)
           }
@@ -450,6 +440,11 @@ const PrescriptionHistory: React.FC = () => {
           }
         />
       </div>
+      <LoadMore
+        hasMore={hasNextPage}
+        isLoading={isFetchingNextPage}
+        onLoadMore={() => fetchNextPage()}
+      />
     </div>
   );
 };
@@ -1,6 +1,6 @@
-import React, { useState, useMemo } from "react";
-import { SearchBar, Badge, Button } from "../../common";
-import { useApiGet } from "../../../hooks/useApi";
+import React, { useEffect, useState } from "react";
+import { SearchBar, Badge, Button, LoadMore } from "../../common";
+import { useApiGetPaged } from "../../../hooks/useApi";
 
 interface Doctor {
   id: string;
@@ -18,16 +18,28 @@ interface Doctor {
 
 const DoctorList: React.FC = () => {
   const [searchQuery, setSearchQuery] = useState("");
+  const [debouncedQuery, setDebouncedQuery] = useState("");
   const [specialtyFilter, setSpecialtyFilter] = useState<string>("all");
 
-  // Fetch doctors from API
-  const { data: doctorsData, isLoading } = useApiGet<Doctor[]>(
-    ["doctors", specialtyFilter],
-    `/api/v1/patients/doctors${
-      specialtyFilter && specialtyFilter !== "all"
-        ? `?specialty=${specialtyFilter}`
-        : ""
-    }`
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedQuery(searchQuery.trim()), 200);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
+  // Fetch doctors from API (search is ranked server-side, typo tolerant)
+  const params = new URLSearchParams();
+  if (debouncedQuery) params.set("search", debouncedQuery);
+  if (specialtyFilter && specialtyFilter !== "all") params.set("specialty", specialtyFilter);
+  const query = params.toString();
+  const {
+    items: doctors,
+    isLoading,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  } = useApiGetPaged<Doctor>(
+    ["doctors", specialtyFilter, debouncedQuery],
+    `/api/v1/patients/doctors${query ? `?${query}` : ""}`
   );
 
   // Commented out hardcoded data - now using API
@@ -99,22 +111,8 @@ const DoctorList: React.FC = () => {
   //   },
   // ];
 
-  // Use API data or fallback to empty array
-  const doctors = doctorsData || [];
-
-  // Filter doctors (client-side search)
-  const filteredDoctors = useMemo(() => {
-    if (!searchQuery) return doctors;
-    return doctors.filter((doctor) => {
-      const matchesSearch =
-        doctor.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        doctor.specialty.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        doctor.hospital.toLowerCase().includes(searchQuery.toLowerCase());
-      const matchesSpecialty =
-        specialtyFilter === "all" || doctor.specialty === specialtyFilter;
-      return matchesSearch && matchesSpecialty;
-    });
-  }, [doctors, searchQuery, specialtyFilter]);
+  // Already filtered and ranked by the API
+  const filteredDoctors = doctors;
 
   if (isLoading) {
     return (
@@ -314,6 +312,12 @@ const DoctorList: React.FC = () => {
           </div>
         ))}
 
+        <LoadMore
+          hasMore={hasNextPage}
+          isLoading={isFetchingNextPage}
+          onLoadMore={() => fetchNextPage()}
+        />
+
         {filteredDoctors.length === 0 && (
           <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-12 text-center">
             <svg
@@ -1,7 +1,7 @@
 import React, { useState, useMemo } from "react";
 import { useNavigate } from "react-router-dom";
-import { SearchBar, Badge, Button } from "../../common";
-import { useApiGet } from "../../../hooks/useApi";
+import { SearchBar, Badge, Button, LoadMore } from "../../common";
+import { useApiGetPaged } from "../../../hooks/useApi";
 
 interface Prescription {
   id: string;
@@ -22,7 +22,13 @@ const MyPrescriptions: React.FC = () => {
   const [statusFilter, setStatusFilter] = useState<string>("all");
 
   // Fetch prescriptions from API
-  const { data: prescriptionsData, isLoading } = useApiGet<Prescription[]>(
+  const {
+    items: prescriptions,
+    isLoading,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  } = useApiGetPaged<Prescription>(
     ["prescriptions", statusFilter],
     `/api/v1/patients/prescriptions${
       statusFilter && statusFilter !== "all" ? `?status=${statusFilter}` : ""
@@ -93,9 +99,6 @@ const MyPrescriptions: React.FC = () => {
   //   },
   // ];
 
-  // Use API data or fallback to empty array
-  const prescriptions = prescriptionsData || [];
-
   // Filter prescriptions
   const filteredPrescriptions = useMemo(() => {
     return prescriptions.filter((prescription) => {
@@ -416,7 +419,13 @@ const MyPrescriptions: React.FC = () => {
           </div>
         ))}
 
-        {filteredPrescriptions.length === 0 && (
+        <LoadMore
+          hasMore={hasNextPage}
+          isLoading={isFetchingNextPage}
+          onLoadMore={() => fetchNextPage()}
+        />
+
+        {filteredPrescriptions.length === 0 && !hasNextPage && (
           <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-12 text-center">
             <svg
               className="mx-auto h-12 w-12 text-gray-400"
@@ -1,8 +1,8 @@
 import React, { useState, useMemo } from "react";
 import { useQueryClient } from "@tanstack/react-query";
-import { Badge, Tabs } from "../../common";
+import { Badge, LoadMore, Tabs } from "../../common";
 import type { Tab } from "../../common/Tabs";
-import { useApiGet } from "../../../hooks/useApi";
+import { useApiGetPaged } from "../../../hooks/useApi";
 import { httpDelete, httpPatch, httpPost } from "../../../utils/http";
 
 interface Notification {
@@ -29,7 +29,13 @@ const Notifications: React.FC = () => {
     return `/api/v1/shared/notifications${q ? `?${q}` : ""}`;
   }, [activeTab]);
 
-  const { data: notificationsData, isLoading } = useApiGet<Notification[]>(
+  const {
+    items: notifications,
+    isLoading,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  } = useApiGetPaged<Notification>(
     ["notifications", activeTab],
     notificationsUrl
   );
@@ -104,8 +110,6 @@ const Notifications: React.FC = () => {
   //   },
   // ]);
 
-  const notifications = notificationsData || [];
-
   const filteredNotifications = useMemo(() => {
     if (activeTab === "all") return notifications;
     if (activeTab === "unread") return notifications.filter((n) => !n.read);
@@ -473,6 +477,12 @@ const Notifications: React.FC = () => {
             ))
           )}
         </div>
+        <LoadMore
+          className="py-4 border-t border-gray-200"
+          hasMore={hasNextPage}
+          isLoading={isFetchingNextPage}
+          onLoadMore={() => fetchNextPage()}
+        />
       </div>
     </div>
   );
@@ -1,6 +1,7 @@
-import { useMutation, useQuery } from '@tanstack/react-query';
+import { useMemo } from 'react';
+import { useInfiniteQuery, useMutation, useQuery } from '@tanstack/react-query';
 import type { UseQueryOptions, UseMutationOptions } from '@tanstack/react-query';
-import { httpGet, httpPost, httpPut, httpPatch, httpDelete } from '../utils/http';
+import { httpGet, httpGetPage, httpPost, httpPut, httpPatch, httpDelete } from '../utils/http';
 import type { ApiError } from '../types';
 
 /**
@@ -20,6 +21,35 @@ export function useApiGet<TData = unknown>(
   });
 }
 
+/**
+ * Hook for cursor-paginated GET lists
+ *
+ * Loads the first page, follows the X-Next-Cursor header on fetchNextPage()
+ * while hasNextPage, and exposes the loaded rows as one `items` array.
+ */
+export function useApiGetPaged<TItem = unknown>(
+  key: (string | number)[] | string,
+  url: string,
+  options?: { enabled?: boolean }
+) {
+  const queryKey = Array.isArray(key) ? key : [key];
+
+  const query = useInfiniteQuery({
+    queryKey,
+    queryFn: ({ pageParam }: { pageParam: string | null }) => httpGetPage<TItem>(url, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
+    ...options,
+  });
+
+  const items = useMemo(
+    () => query.data?.pages.flatMap((page) => page.items) ?? [],
+    [query.data]
+  );
+
+  return { ...query, items };
+}
+
 /**
  * Hook for POST requests
  */
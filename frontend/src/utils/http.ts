@@ -48,6 +48,39 @@ export const httpGet = async <T>(url: string, config = {}) => {
   return response.data as T;
 };
 
+/**
+ * Response header carrying the cursor of the next page of a list endpoint
+ * (absent on the last page)
+ */
+export const NEXT_CURSOR_HEADER = "x-next-cursor";
+
+/**
+ * One page of a cursor-paginated list
+ */
+export interface CursorPage<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+/**
+ * GET one page of a cursor-paginated list endpoint
+ */
+export const httpGetPage = async <T>(
+  url: string,
+  cursor?: string | null,
+  config = {}
+): Promise<CursorPage<T>> => {
+  const response = await api.get<T[]>(url, {
+    ...config,
+    params: cursor ? { cursor } : undefined,
+  });
+  const nextCursor = response.headers[NEXT_CURSOR_HEADER];
+  return {
+    items: response.data,
+    nextCursor: typeof nextCursor === "string" && nextCursor ? nextCursor : null,
+  };
+};
+
 /**
  * Generic POST request
  */